@@ -29,6 +29,67 @@ class Config:
     # Application settings
     SESSION_PERMANENT = False
     SESSION_TYPE = 'filesystem'
+    
+    # Analytics file loading: "thread" or "process" pool with a bounded worker count
+    ANALYTICS_LOADER_MODE = os.environ.get('EOD_LOADER_MODE', 'thread')
+    ANALYTICS_LOADER_WORKERS = int(os.environ.get('EOD_LOADER_WORKERS', '4'))
+    
+    # Operator documents kept in the process-wide LRU cache
+    DOCUMENT_CACHE_SIZE = int(os.environ.get('EOD_DOCUMENT_CACHE_SIZE', '128'))
+    
+    # Rendered dashboard / EOD report pages kept until their operator document changes
+    PAGE_CACHE_SIZE = int(os.environ.get('EOD_PAGE_CACHE_SIZE', '256'))
+    
+    # Data file writes: fsync "always", "batched" (every WRITE_SYNC_INTERVAL seconds) or "never"
+    WRITE_DURABILITY = os.environ.get('EOD_WRITE_DURABILITY', 'always')
+    WRITE_SYNC_INTERVAL = float(os.environ.get('EOD_WRITE_SYNC_INTERVAL', '1.0'))
+    
+    # Note/ticket/start events are appended to a per-file journal; the snapshot is rewritten
+    # after end/session/clear events or once the journal reaches this many bytes
+    JOURNAL_COMPACT_BYTES = int(os.environ.get('EOD_JOURNAL_COMPACT_BYTES', '65536'))
+    
+    # Snapshot layout written: 1 = pretty-printed strings, 2 = compact epochs and interned categories
+    # (both are always readable; convert existing files with `src/app.py convert-format`)
+    DATA_FORMAT_VERSION = int(os.environ.get('EOD_DATA_FORMAT_VERSION', '1'))
+    
+    # Operator documents: "json" files per operator per day, or one "sqlite" database per data directory
+    STORAGE_BACKEND = os.environ.get('EOD_STORAGE_BACKEND', 'json')
+    
+    # /manager/stream: seconds between checks of today's documents (one detector per process,
+    # shared by every open dashboard) and between keepalive comments on idle streams
+    LIVE_FEED_INTERVAL = float(os.environ.get('EOD_LIVE_FEED_INTERVAL', '2.0'))
+    LIVE_FEED_KEEPALIVE = float(os.environ.get('EOD_LIVE_FEED_KEEPALIVE', '15.0'))
+    
+    # Per-endpoint latency histograms, phase timers and file counters served at /metrics
+    METRICS_ENABLED = os.environ.get('EOD_METRICS_ENABLED', '1') not in ('0', 'false', 'no')
+    
+    # Compiled templates are kept here across restarts ('' compiles in memory only);
+    # `python src/warmup.py` fills it at build time
+    TEMPLATE_CACHE_DIR = os.environ.get('EOD_TEMPLATE_CACHE_DIR', str(BASE_DIR / '.jinja_cache'))
+    
+    # Precompile templates and build the analytics caches of the last WARMUP_ANALYTICS_DAYS days
+    # before scripts/prod.py and src/run_flask.py start serving
+    WARMUP_ON_START = os.environ.get('EOD_WARMUP', '0') not in ('0', 'false', 'no')
+    WARMUP_ANALYTICS_DAYS = int(os.environ.get('EOD_WARMUP_DAYS', '30'))
+    
+    # scripts/prod.py pre-fork server: worker processes (0 = one per CPU), requests before a worker
+    # is recycled (0 = never, plus up to the jitter so workers do not all restart at once) and
+    # seconds in-flight requests get to finish on shutdown or restart
+    SERVER_WORKERS = int(os.environ.get('EOD_WORKERS', '0'))
+    SERVER_MAX_REQUESTS = int(os.environ.get('EOD_MAX_REQUESTS', '1000'))
+    SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('EOD_MAX_REQUESTS_JITTER', '100'))
+    SERVER_GRACEFUL_TIMEOUT = float(os.environ.get('EOD_GRACEFUL_TIMEOUT', '30'))
+    
+    # Coordinator mode: /manager and the manager API merge the partial aggregates of these EOD Generator
+    # instances (comma-separated base URLs, asked concurrently) with this instance's own data unless
+    # FEDERATION_INCLUDE_LOCAL is off. A peer that does not answer within FEDERATION_TIMEOUT seconds
+    # is shown from its last good partial for the range
+    FEDERATION_PEERS = [peer.strip() for peer in os.environ.get('EOD_FEDERATION_PEERS', '').split(',') if peer.strip()]
+    FEDERATION_TIMEOUT = float(os.environ.get('EOD_FEDERATION_TIMEOUT', '5'))
+    FEDERATION_INCLUDE_LOCAL = os.environ.get('EOD_FEDERATION_INCLUDE_LOCAL', '1') not in ('0', 'false', 'no')
+    
+    # Longest date range the manager dashboard accepts
+    MANAGER_MAX_RANGE_DAYS = int(os.environ.get('EOD_MANAGER_MAX_RANGE_DAYS', '731'))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -39,6 +100,7 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     ENV = 'production'
+    WARMUP_ON_START = os.environ.get('EOD_WARMUP', '1') not in ('0', 'false', 'no')
     
     def __init__(self):
         # Check secret key requirement for production at runtime
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of the main routes and storage calls on synthetic fleets of several sizes,
+run through Flask's test client. Results are written as JSON so runs can be compared.
+
+    python scripts/benchmark.py                               # small and medium scales
+    python scripts/benchmark.py --scales small,medium,large --output bench.json
+    python scripts/benchmark.py --baseline bench.json         # also print the change per benchmark
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from generate_fleet import generate_fleet, operator_roster
+
+# name -> (operators, days, blockers per operator per day)
+SCALES = {
+    "small": (10, 7, 8),
+    "medium": (50, 30, 10),
+    "large": (200, 90, 12)
+}
+
+
+def measure(function: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Timings in milliseconds over `repeat` calls (setup runs untimed before each call)"""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "max_ms": round(timings[-1], 3)
+    }
+
+
+def _checked(response) -> None:
+    # Streamed bodies (/export) are only produced as they are read
+    response.get_data()
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.path} returned {response.status_code}")
+
+
+def run_scale(scale: str, repeat: int, format_version: int) -> List[Dict[str, Any]]:
+    operators, days, blockers = SCALES[scale]
+    work_dir = tempfile.mkdtemp(prefix=f"eod_bench_{scale}_")
+    previous_dir = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        paths = generate_fleet("data/production", operators, days, blockers, end_date=date.today(),
+                               format_version=format_version)
+        os.makedirs("data/test", exist_ok=True)
+
+        from flask_app import app
+        import rollups
+        import summary_cache
+        from app import DOCUMENT_CACHE, JsonHandler, WRITE_POLICY
+        from page_cache import PAGE_CACHE
+
+        DOCUMENT_CACHE.clear()
+        PAGE_CACHE.clear()
+        client = app.test_client()
+        operator = operator_roster(1)[0]
+        with client.session_transaction() as flask_session:
+            flask_session['test_mode'] = False
+            # Lower-cased so document_name() matches the generated filenames
+            flask_session['session_info'] = {"pack_operator": operator["pack_operator"].lower(),
+                                             "location": operator["location"].lower(),
+                                             "date": datetime.now().strftime("%Y-%m-%d")}
+
+        start = date.fromordinal(date.today().toordinal() - days + 1).strftime("%Y-%m-%d")
+        full_range = f"/manager?start={start}&end={date.today():%Y-%m-%d}"
+        operator_file = os.path.basename(paths[days - 1])
+
+        def remove_derived() -> None:
+            # Forget the in-process rollups and summaries as well as their files
+            rollups._stores.clear()
+            summary_cache._caches.clear()
+            for name in os.listdir("data"):
+                path = os.path.join("data", name)
+                if name.startswith("production."):
+                    # The rollup store is a directory of monthly shards
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+
+        def fresh_handler() -> JsonHandler:
+            DOCUMENT_CACHE.clear()
+            return JsonHandler(test_mode=False, filename=operator_file)
+
+        handler = JsonHandler(test_mode=False, filename=operator_file)
+        results = {}
+        # The first request builds every rollup and summary from scratch (and compiles the template on the first scale)
+        results["manager_cold"] = measure(lambda: _checked(client.get(full_range)), 1)
+        results["manager_rebuild"] = measure(lambda: _checked(client.get(full_range)), max(repeat // 4, 1),
+                                             setup=remove_derived)
+        results["manager_warm"] = measure(lambda: _checked(client.get(full_range)), repeat)
+        results["manager_default_range"] = measure(lambda: _checked(client.get("/manager")), repeat)
+        summary_url = f"/api/manager/summary?start={start}"
+        etag = client.get(summary_url).headers["ETag"]
+        results["api_summary_304"] = measure(
+            lambda: _checked(client.get(summary_url, headers={"If-None-Match": etag})), repeat)
+        results["dashboard_uncached"] = measure(lambda: _checked(client.get("/")), repeat,
+                                                setup=lambda: (DOCUMENT_CACHE.clear(), PAGE_CACHE.clear()))
+        results["dashboard_cached"] = measure(lambda: _checked(client.get("/")), repeat)
+        results["eod_report_uncached"] = measure(lambda: _checked(client.get("/eod_report")), repeat,
+                                                 setup=PAGE_CACHE.clear)
+        results["export_csv"] = measure(lambda: _checked(client.get(f"/export?start={start}")), max(repeat // 4, 1))
+        results["load_data"] = measure(fresh_handler, repeat)
+        durability = WRITE_POLICY.durability
+        for mode in ("always", "never"):
+            WRITE_POLICY.configure(durability=mode)
+            results[f"save_data_{mode}"] = measure(handler.save_data, repeat)
+        WRITE_POLICY.configure(durability=durability)
+
+        return [{"scale": scale, "operators": operators, "days": days, "blockers": blockers,
+                 "files": len(paths), "benchmark": name, **timing} for name, timing in results.items()]
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Median change of every benchmark also present in the baseline file"""
+    with open(baseline_path, 'r') as f:
+        baseline = {(row["scale"], row["benchmark"]): row for row in json.load(f)["results"]}
+    print(f"\nChange vs {baseline_path} (median):")
+    for row in results:
+        before = baseline.get((row["scale"], row["benchmark"]))
+        if before is None or not before["median_ms"]:
+            continue
+        change = (row["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+        print(f"  {row['scale']:<8} {row['benchmark']:<24} {before['median_ms']:>10.2f} -> {row['median_ms']:>10.2f} ms  {change:+6.1f}%")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time routes and storage calls on synthetic fleets")
+    parser.add_argument("--scales", default="small,medium",
+                        help=f"Comma-separated scales from {', '.join(SCALES)} (default small,medium)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per benchmark")
+    parser.add_argument("--format", type=int, choices=(1, 2), default=1, dest="format_version",
+                        help="On-disk format of the generated files")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"Unknown scale(s): {', '.join(unknown)}")
+
+    results = []
+    for scale in scales:
+        print(f"Running {scale} {SCALES[scale]} ...")
+        rows = run_scale(scale, args.repeat, args.format_version)
+        for row in rows:
+            print(f"  {row['benchmark']:<24} median {row['median_ms']:>10.2f} ms   p95 {row['p95_ms']:>10.2f} ms")
+        results.extend(rows)
+
+    report = {
+        "meta": {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "format_version": args.format_version
+        },
+        "results": results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic fleet data: N operators x D days x B blockers written as
+'<operator>_<location>_eod_data_<date>.json' files, with notes and tickets.
+
+    python scripts/generate_fleet.py --operators 50 --days 30 --blockers 10 --out /tmp/fleet/data/production
+    python scripts/generate_fleet.py --operators 5 --days 7 --seed 7 --end-date 2025-08-26 --format 2
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from doc_format import FORMAT_VERSIONS, dump_document
+from storage import document_name
+
+FIRST_NAMES = ["alice", "bob", "carol", "david", "erin", "frank", "grace", "heidi", "ivan", "judy",
+               "mallory", "niaj", "olivia", "peggy", "rupert", "sybil", "trent", "victor", "walter", "yara"]
+LAST_NAMES = ["smith", "jones", "brown", "garcia", "miller", "davis", "wilson", "moore", "taylor", "clark"]
+LOCATIONS = ["berkeley", "fremont", "oakland", "san-jose", "palo-alto", "hayward", "richmond", "san-mateo"]
+
+CATEGORIES = ["software", "connectivity", "hardware", "other"]
+DESCRIPTIONS = {
+    "software": ["App crash on startup", "System update installation", "License server timeout", "Login loop"],
+    "connectivity": ["Wi-Fi dropped", "VPN disconnect", "Network latency spike", "DNS resolution failure"],
+    "hardware": ["Scanner not responding", "Printer offline error", "Battery swap", "Glove sensor fault"],
+    "other": ["Waiting on supervisor", "Safety check", "Badge access issue", "Unscheduled meeting"]
+}
+NOTES = ["Restarted device", "Escalated to IT", "Temporary workaround implemented", "Waiting for vendor",
+         "Issue reproduced", "Cleared cache", "Replaced cable"]
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+SHIFT_START_HOUR = 8
+SHIFT_MINUTES = 540
+
+
+def operator_roster(count: int) -> List[Dict[str, str]]:
+    """Stable operator names and home locations; the same count always gives the same roster"""
+    roster = []
+    for n in range(count):
+        first = FIRST_NAMES[n % len(FIRST_NAMES)]
+        last = LAST_NAMES[(n // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        name = f"{first} {last}" if n < len(FIRST_NAMES) * len(LAST_NAMES) else f"{first} {last} {n}"
+        roster.append({"pack_operator": name.title(), "location": LOCATIONS[n % len(LOCATIONS)].replace('-', ' ').title()})
+    return roster
+
+
+def _stamp(day: date, minute: int) -> str:
+    return (datetime.combine(day, datetime.min.time()) + timedelta(hours=SHIFT_START_HOUR, minutes=minute)).strftime(TIMESTAMP_FORMAT)
+
+
+def make_document(rng: random.Random, operator: Dict[str, str], day: date, blockers: int) -> Dict[str, Any]:
+    """One operator's day: `blockers` completed blockers spread over the shift in start order"""
+    date_str = day.strftime("%Y-%m-%d")
+    slot = SHIFT_MINUTES // max(blockers, 1)
+    blocker_list = []
+    for i in range(blockers):
+        start = i * slot + rng.randrange(max(slot // 2, 1))
+        duration = rng.randint(1, max(slot - (start - i * slot) - 1, 1))
+        category = rng.choice(CATEGORIES)
+        notes = [{"content": rng.choice(NOTES), "timestamp": _stamp(day, start + rng.randrange(duration + 1))}
+                 for _ in range(rng.randrange(3))]
+        notes.sort(key=lambda note: note["timestamp"])
+        tickets = [{"number": f"TKT-{rng.randrange(1000, 10000)}",
+                    "link": f"LINK: https://support.example.com/ticket/{rng.randrange(1000, 10000)}"}
+                   for _ in range(rng.randrange(3))]
+        blocker_list.append({
+            "description": rng.choice(DESCRIPTIONS[category]),
+            "category": category,
+            "start_time": _stamp(day, start),
+            "end_time": _stamp(day, start + duration),
+            "duration_minutes": duration,
+            "tickets": tickets,
+            "notes": notes
+        })
+
+    return {
+        "blockers": blocker_list,
+        "current_blocker": None,
+        "last_updated": blocker_list[-1]["end_time"] if blocker_list else _stamp(day, 0),
+        "session_info": {
+            "pack_operator": operator["pack_operator"],
+            "support_operator": "Support Team",
+            "location": operator["location"],
+            "pack_number": f"Pack{rng.randrange(100, 1000)}",
+            "key_used": f"Key{rng.randrange(100, 1000)}",
+            "glove_number": f"Glove{rng.randrange(100, 1000)}",
+            "dongle_number": f"Dongle{rng.randrange(100, 1000)}",
+            "phone_id": f"Phone{rng.randrange(100, 1000)}",
+            "date": date_str,
+            "initialized_at": _stamp(day, 0)
+        }
+    }
+
+
+def generate_fleet(out_dir: str, operators: int, days: int, blockers: int, seed: int = 0,
+                   end_date: Optional[date] = None, format_version: int = 1) -> List[str]:
+    """Write the fleet's files into out_dir (days ending at end_date, default today); returns their paths"""
+    end_date = end_date or date.today()
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for operator_index, operator in enumerate(operator_roster(operators)):
+        for day_offset in range(days):
+            day = end_date - timedelta(days=days - 1 - day_offset)
+            # One generator per file, so any subset of the fleet comes out identical
+            rng = random.Random(f"{seed}:{operator_index}:{day.isoformat()}")
+            data = make_document(rng, operator, day, blockers)
+            # Lower-cased like the sample files in data/production
+            path = os.path.join(out_dir, document_name(data["session_info"], day.strftime("%Y-%m-%d")).lower())
+            with open(path, 'w') as f:
+                dump_document(data, f, format_version)
+            paths.append(path)
+    return paths
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write synthetic operator EOD files")
+    parser.add_argument("--out", default=None,
+                        help="Directory to write into (default a new temporary directory, never a live data dir)")
+    parser.add_argument("--operators", type=int, default=20)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--blockers", type=int, default=8, help="Completed blockers per operator per day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None,
+                        help="Last day generated, YYYY-MM-DD (default today)")
+    parser.add_argument("--format", type=int, choices=FORMAT_VERSIONS, default=1, dest="format_version")
+    args = parser.parse_args()
+    if args.out is None:
+        args.out = tempfile.mkdtemp(prefix="eod_fleet_")
+
+    paths = generate_fleet(args.out, args.operators, args.days, args.blockers, seed=args.seed,
+                           end_date=args.end_date, format_version=args.format_version)
+    size = sum(os.path.getsize(path) for path in paths)
+    print(f"Wrote {len(paths)} files ({size / 1024:.0f} KB) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
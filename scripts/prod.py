@@ -1,11 +1,60 @@
 #!/usr/bin/env python3
 """
 Production server script with proper configuration
+
+Runs a pre-forking multi-process server (src/prefork.py) on POSIX systems:
+
+    python3 scripts/prod.py --workers 4
+    kill -HUP <master pid>     # graceful restart with freshly loaded code
+    kill -TERM <master pid>    # graceful shutdown
 """
+import argparse
 import os
 import sys
 from pathlib import Path
 
+# Add parent directory to path (and src/, which flask_app imports its modules from)
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+sys.path.insert(0, str(parent_dir / 'src'))
+
+def load_app():
+    """Import the app (in each worker, after the fork) and compile its templates before it takes requests"""
+    from src.flask_app import app
+    from warmup import warm_process
+    
+    # EOD_WARMUP=0 skips warming up, here and in prepare_shared()
+    if app.config['WARMUP_ON_START']:
+        warm_process(app)
+    return app
+
+def prepare_shared():
+    """Seed the active-blocker registries and build the analytics caches every worker reads from disk"""
+    from src.flask_app import app
+    from warmup import warm_shared
+    
+    if app.config['WARMUP_ON_START']:
+        warm_shared(app)
+
+def close_streams():
+    """End a draining worker's open Live Today streams; the dashboards reconnect to another worker"""
+    from live_feed import close_live_feeds
+    
+    close_live_feeds()
+
+def parse_args(config):
+    parser = argparse.ArgumentParser(description="EOD Generator production server")
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS,
+                        help="Worker processes (default EOD_WORKERS, 0 = one per CPU)")
+    parser.add_argument('--max-requests', type=int, default=config.SERVER_MAX_REQUESTS,
+                        help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument('--max-requests-jitter', type=int, default=config.SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument('--graceful-timeout', type=float, default=config.SERVER_GRACEFUL_TIMEOUT,
+                        help="Seconds in-flight requests get on shutdown or restart")
+    parser.add_argument('--single', action='store_true',
+                        help="Single-process Werkzeug server instead of pre-forked workers")
+    return parser.parse_args()
+
 def main():
     # Set production environment
     os.environ['FLASK_ENV'] = 'production'
@@ -17,29 +66,45 @@ def main():
         print("Example: export SECRET_KEY='your-secure-random-key-here'")
         sys.exit(1)
     
-    # Add parent directory to path
-    parent_dir = Path(__file__).parent.parent
-    sys.path.insert(0, str(parent_dir))
-    
     try:
-        from src.flask_app import app
+        from config.app_config import get_config
+        
+        config = get_config()
+        args = parse_args(config)
+        prefork = not args.single and hasattr(os, 'fork')
         
         print("=" * 60)
         print("EOD Generator - Production Server")
         print("=" * 60)
         print("Environment: Production")
         print("Debug Mode: OFF")
-        print(f"URL: http://{app.config['HOST']}:{app.config['PORT']}")
-        print("=" * 60)
-        print("For production deployment, consider using:")
-        print("  - Gunicorn: gunicorn -w 4 -b 0.0.0.0:5001 src.flask_app:app")
-        print("  - uWSGI: uwsgi --http :5001 --module src.flask_app:app")
+        print(f"URL: http://{config.HOST}:{config.PORT}")
+        if prefork:
+            print(f"Server: pre-fork, {args.workers or os.cpu_count()} workers, "
+                  f"recycled after {args.max_requests or 'unlimited'} requests")
+        else:
+            print("Server: single process")
         print("=" * 60)
         
-        app.run(debug=False, 
-               host=app.config['HOST'], 
-               port=app.config['PORT'],
-               use_reloader=False)
+        if prefork:
+            from prefork import PreforkServer
+            
+            PreforkServer(load_app,
+                          host=config.HOST,
+                          port=config.PORT,
+                          workers=args.workers,
+                          max_requests=args.max_requests,
+                          max_requests_jitter=args.max_requests_jitter,
+                          graceful_timeout=args.graceful_timeout,
+                          prepare=prepare_shared,
+                          on_drain=close_streams).serve_forever()
+        else:
+            app = load_app()
+            prepare_shared()
+            app.run(debug=False, 
+                   host=app.config['HOST'], 
+                   port=app.config['PORT'],
+                   use_reloader=False)
                
     except ImportError as e:
         print(f"Import Error: {e}")
@@ -54,4 +119,4 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
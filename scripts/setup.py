@@ -60,6 +60,10 @@ def main():
         dir_full_path.mkdir(parents=True, exist_ok=True)
         print(f"  ✓ Created directory: {dir_path}")
     
+    # Fill the Jinja bytecode cache so the first request after a deploy skips template compilation
+    if not run_command(f"{sys.executable} src/warmup.py", "Precompiling templates"):
+        success = False
+    
     print("=" * 60)
     if success:
         print("Setup completed successfully!")
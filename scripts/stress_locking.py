@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Stress test for cross-process locking: several processes add notes and tickets
+to the same operator file at once, then the totals are checked for lost updates.
+
+    python scripts/stress_locking.py --processes 8 --events 200
+    python scripts/stress_locking.py --unlocked   # shows the updates lost without the locked reload
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+SESSION_INFO = {"pack_operator": "Stress Op", "location": "Lab"}
+
+
+def unlocked_worker(worker_id: int, events: int) -> None:
+    """Mutations the way they were made before locking: load, change in memory, write the snapshot back"""
+    from app import EODTracker
+    from journal import apply_event, make_event
+
+    tracker = EODTracker(test_mode=True, session_info=SESSION_INFO)
+    handler = tracker.js_handler
+    for i in range(events):
+        data = handler.load_data()
+        note = {"content": f"worker {worker_id} note {i}", "timestamp": tracker.format_timestamp()}
+        apply_event(data, make_event(data.get("journal_seq", 0) + 1, "note", note["timestamp"], note=note))
+        handler.data = data
+        handler.compact()
+
+
+def worker(work_dir: str, worker_id: int, events: int, unlocked: bool, compact_bytes: int) -> None:
+    os.chdir(work_dir)
+    from app import EODTracker, WRITE_POLICY
+
+    WRITE_POLICY.configure(durability="never", journal_compact_bytes=compact_bytes)
+    if unlocked:
+        unlocked_worker(worker_id, events)
+        return
+
+    tracker = EODTracker(test_mode=True, session_info=SESSION_INFO)
+    for i in range(events):
+        if i % 2:
+            tracker.record_ticket(f"W{worker_id}-{i}", "")
+        else:
+            tracker.record_note(f"worker {worker_id} note {i}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent writers against one operator file")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--events", type=int, default=100, help="Events per process")
+    parser.add_argument("--compact-bytes", type=int, default=2048,
+                        help="Small journal threshold so compactions race with appends")
+    parser.add_argument("--unlocked", action="store_true",
+                        help="Read-modify-write without holding the lock across it, to show the lost updates")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="eod_stress_")
+    try:
+        os.chdir(work_dir)
+        from app import EODTracker
+
+        tracker = EODTracker(test_mode=True, session_info=SESSION_INFO)
+        tracker.start_blocker("Shared blocker", category="hardware", prompt_for_ticket=False)
+
+        processes = [
+            multiprocessing.Process(target=worker,
+                                    args=(work_dir, n, args.events, args.unlocked, args.compact_bytes))
+            for n in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        current = EODTracker(test_mode=True, session_info=SESSION_INFO).js_handler.data["current_blocker"]
+        recorded = len(current.get("notes", [])) + len(current.get("tickets", []))
+        expected = args.processes * args.events
+
+        print(f"Locking:  {'off (read-modify-write outside the lock)' if args.unlocked else 'enabled'}")
+        print(f"Expected: {expected} events")
+        print(f"Recorded: {recorded} events ({expected - recorded} lost)")
+        return 0 if recorded == expected else 1
+    finally:
+        os.chdir("/")
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
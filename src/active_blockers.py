@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Registry of the blockers open right now across the fleet, one per data directory.
+
+EODTracker updates it whenever a blocker starts or ends, so listing who is blocked
+costs O(active) and never opens an operator document. The registry is mirrored to a
+small file next to the data directory (e.g. data/production.active_blockers.json):
+other processes (pre-fork workers, the CLI) see a change after one stat and one read
+of that file. It is rebuilt from the operator documents at server start (seed).
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from atomic_file import mkstemp_for
+from data_catalog import get_catalog, parse_filename
+from file_lock import FileLock
+from journal import stat_signature
+from sqlite_store import get_sqlite_store
+
+# Bump when the entry layout changes so stale registry files are discarded
+REGISTRY_VERSION = 1
+
+
+def active_registry_path(base_dir: str) -> str:
+    """Registry kept next to the data directory, e.g. data/production.active_blockers.json"""
+    base_dir = os.path.normpath(base_dir)
+    return os.path.join(os.path.dirname(base_dir), f"{os.path.basename(base_dir)}.active_blockers.json")
+
+
+def make_entry(doc_key: str, blocker: Dict[str, Any],
+               session_info: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Registry entry for the open blocker of one operator document; None for unrecognised file names"""
+    parsed = parse_filename("", doc_key)
+    if parsed is None:
+        return None
+    session_info = session_info or {}
+    return {
+        "operator_location": parsed.operator_location,
+        "operator": session_info.get("pack_operator") or parsed.operator.replace('-', ' ').title(),
+        "location": session_info.get("location") or parsed.location.replace('-', ' ').title(),
+        "document": doc_key,
+        "date": parsed.date,
+        "description": blocker.get("description", ""),
+        "category": blocker.get("category", "other"),
+        "start_time": blocker.get("start_time"),
+        "tickets": len(blocker.get("tickets") or [])
+    }
+
+
+def running_minutes(start_time: Optional[str], now: datetime) -> int:
+    try:
+        return max(int((now - datetime.fromisoformat(start_time)).total_seconds() // 60), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ActiveBlockerRegistry:
+    """Open blockers of one data directory keyed by operator_location"""
+
+    def __init__(self, base_dir: str, registry_file: Optional[str] = None) -> None:
+        self.base_dir = base_dir
+        self.registry_file = registry_file or active_registry_path(base_dir)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # stat_signature() of the registry file as last read or written by this process
+        self._stamp: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Optional[tuple]:
+        return stat_signature(self.registry_file)
+
+    def exists(self) -> bool:
+        return self._file_stamp() is not None
+
+    def _sync(self) -> None:
+        """Pick up changes written by other processes (one stat when there are none)"""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.registry_file, 'r') as f:
+                stored = json.load(f)
+            if isinstance(stored, dict) and stored.get("version") == REGISTRY_VERSION:
+                entries = stored.get("entries", {})
+        except (json.JSONDecodeError, FileNotFoundError):
+            pass
+        self._entries = entries
+        self._stamp = stamp
+
+    def _write(self) -> None:
+        registry_dir = os.path.dirname(self.registry_file) or "."
+        os.makedirs(registry_dir, exist_ok=True)
+        fd, tmp_path = mkstemp_for(self.registry_file, prefix=".active_blockers.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"version": REGISTRY_VERSION, "entries": self._entries}, f)
+            os.replace(tmp_path, self.registry_file)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._stamp = self._file_stamp()
+
+    def update(self, doc_key: str, blocker: Optional[Dict[str, Any]],
+               session_info: Optional[Dict[str, Any]] = None) -> None:
+        """Record the open blocker of doc_key (None: it has none) after it changed"""
+        parsed = parse_filename("", doc_key)
+        if parsed is None:
+            return
+        with self._lock, FileLock(self.registry_file):
+            self._sync()
+            existing = self._entries.get(parsed.operator_location)
+            # An operator's newest document decides; writes to an older day's file do not override it
+            if existing is not None and existing["date"] > parsed.date:
+                return
+            if blocker:
+                self._entries[parsed.operator_location] = make_entry(doc_key, blocker, session_info)
+            elif existing is None:
+                return
+            else:
+                del self._entries[parsed.operator_location]
+            self._write()
+
+    def seed(self, documents: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Replace the registry with the open blockers of (doc_key, document) pairs; returns their count"""
+        with self._lock, FileLock(self.registry_file):
+            entries: Dict[str, Dict[str, Any]] = {}
+            for doc_key, data in documents:
+                current = data.get("current_blocker")
+                entry = make_entry(doc_key, current, data.get("session_info")) if isinstance(current, dict) else None
+                if entry is None:
+                    continue
+                existing = entries.get(entry["operator_location"])
+                if existing is None or existing["date"] <= entry["date"]:
+                    entries[entry["operator_location"]] = entry
+            self._entries = entries
+            self._write()
+            return len(entries)
+
+    def active(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Every open blocker with its running duration, longest-running first"""
+        now = now or datetime.now()
+        with self._lock:
+            self._sync()
+            entries = list(self._entries.values())
+        result = [dict(entry, running_minutes=running_minutes(entry["start_time"], now)) for entry in entries]
+        result.sort(key=lambda entry: entry["start_time"] or "")
+        return result
+
+    def count(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._entries)
+
+
+def latest_documents(base_dir: str, backend: str,
+                     load_document: Callable[[str], Dict[str, Any]]) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    """(doc_key, document) of each operator's newest document; an older day's open blocker is abandoned"""
+    if backend == "sqlite":
+        yield from get_sqlite_store(base_dir).latest_open_blockers()
+        return
+    latest: Dict[str, str] = {}
+    # Catalog entries are sorted by filename, so an operator's newest date comes last
+    for entry in get_catalog(base_dir).entries():
+        latest[entry.operator_location] = entry.filename
+    for doc_key in latest.values():
+        yield doc_key, load_document(doc_key)
+
+
+_registries: Dict[str, ActiveBlockerRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_active_registry(base_dir: str) -> ActiveBlockerRegistry:
+    """Process-wide ActiveBlockerRegistry for a data directory"""
+    key = os.path.abspath(base_dir)
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = ActiveBlockerRegistry(base_dir)
+        return _registries[key]
+
+
+def seed_active_blockers(base_dir: str, backend: str, load_document: Callable[[str], Dict[str, Any]]) -> int:
+    """Rebuild the registry of base_dir from the operator documents (server start, or a missing registry file)"""
+    return get_active_registry(base_dir).seed(latest_documents(base_dir, backend, load_document))
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Manager analytics computed from the day, week and month rollups
+"""
+import hashlib
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from data_catalog import get_catalog
+from metrics import timer
+from parallel_loader import DEFAULT_MODE, load_summaries
+from rollups import cover_range, daily_efficiency, fingerprint, get_rollup_store, operator_day_stats
+from sketches import HyperLogLog, QuantileSketch, merge_quantiles
+from sqlite_store import get_sqlite_store
+from summary_cache import get_summary_cache
+
+
+def date_range_strings(start_date: date, end_date: date) -> List[str]:
+    return [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end_date - start_date).days + 1)]
+
+
+def lookback_start(start_date: date, end_date: date) -> date:
+    """The "active operators" lookback can reach 2 days before the range"""
+    return min(start_date, end_date - timedelta(days=2))
+
+
+def analytics_etag(base_dir: str, start_date: date, end_date: date, backend: str = "json") -> str:
+    """
+    Validator for the analytics of a range, derived from the (filename, mtime, size)
+    of every file it depends on (or the database revision), so it can be checked
+    without aggregating anything
+    """
+    digest = hashlib.sha1()
+    digest.update(f"{backend}|{os.path.abspath(base_dir)}|{start_date}|{end_date}|{date.today()}".encode())
+    if backend == "sqlite":
+        digest.update(f"revision:{get_sqlite_store(base_dir).revision()}".encode())
+        return digest.hexdigest()
+
+    catalog = get_catalog(base_dir)
+    for date_str in date_range_strings(lookback_start(start_date, end_date), end_date):
+        for filename, mtime_ns, size in fingerprint(catalog.entries_for_date(date_str)):
+            digest.update(f"{filename}:{mtime_ns}:{size};".encode())
+    return digest.hexdigest()
+
+
+def to_json_safe(value: Any) -> Any:
+    """Analytics with date objects turned into YYYY-MM-DD strings (datetimes keep the time) for JSON responses"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, dict):
+        return {key: to_json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_safe(item) for item in value]
+    return value
+
+
+def get_day_rollups(base_dir: str, start_date: date, end_date: date,
+                    loader_mode: str = DEFAULT_MODE,
+                    loader_workers: Optional[int] = None,
+                    backend: str = "json") -> Dict[str, Dict[str, Any]]:
+    """Rollups for every day in [start_date, end_date], recomputing only changed days"""
+    if backend == "sqlite":
+        with timer("rollups.sqlite_query"):
+            return get_sqlite_store(base_dir).day_rollups(date_range_strings(start_date, end_date))
+
+    with timer("rollups.catalog"):
+        catalog = get_catalog(base_dir)
+    summary_cache = get_summary_cache(base_dir)
+    store = get_rollup_store(base_dir)
+
+    with timer("rollups.days"):
+        rollups = store.get_days(
+            date_range_strings(start_date, end_date), catalog,
+            lambda paths: load_summaries(summary_cache, paths, mode=loader_mode, workers=loader_workers)
+        )
+    with timer("rollups.save"):
+        summary_cache.save()
+        store.save()
+    return rollups
+
+
+def get_period_rollups(base_dir: str, start_date: date, end_date: date,
+                       backend: str = "json") -> Optional[List[Dict[str, Any]]]:
+    """
+    Month, week and edge-day rollups covering [start_date, end_date] (the days must be
+    current, i.e. get_day_rollups() ran for the range). None for the sqlite backend,
+    whose day rollups are already aggregated by the database per request.
+    """
+    if backend == "sqlite":
+        return None
+    store = get_rollup_store(base_dir)
+    with timer("rollups.periods"):
+        periods = store.get_periods(cover_range(start_date, end_date))
+    store.save()
+    return periods
+
+
+def _percentiles(sketch: Optional[QuantileSketch]) -> Dict[str, Optional[float]]:
+    if sketch is None:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    return sketch.percentiles()
+
+
+def build_manager_analytics(base_dir: str, start_date: date, end_date: date,
+                            loader_mode: str = DEFAULT_MODE,
+                            loader_workers: Optional[int] = None,
+                            backend: str = "json") -> Dict[str, Any]:
+    """Everything manager_dashboard.html renders for the inclusive range start_date..end_date"""
+    # Includes the days the "active operators" lookback may need
+    rollups = get_day_rollups(base_dir, lookback_start(start_date, end_date), end_date,
+                              loader_mode, loader_workers, backend)
+    periods = get_period_rollups(base_dir, start_date, end_date, backend)
+    with timer("analytics.aggregate"):
+        return aggregate_rollups(rollups, start_date, end_date, periods)
+
+
+def aggregate_rollups(rollups: Dict[str, Dict[str, Any]], start_date: date, end_date: date,
+                      periods: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Manager analytics from the day rollups of lookback_start(start_date, end_date)..end_date.
+    Totals, breakdowns and percentiles come from `periods` (rollups covering exactly the
+    range, e.g. a year as 12 months) when given, otherwise from the days themselves;
+    only the per-day series read every day.
+    """
+    dates = date_range_strings(start_date, end_date)
+    total_blockers = 0
+    total_downtime = 0
+    total_files_scanned = 0
+    daily_stats = {}
+    category_analytics = {}
+    operator_analytics = {}
+    operator_daily_performance = {}
+    duration_sketch = QuantileSketch()
+    category_sketches: Dict[str, QuantileSketch] = {}
+    operator_sketches: Dict[str, QuantileSketch] = {}
+    location_sketches: Dict[str, QuantileSketch] = {}
+    distinct_operators = HyperLogLog()
+    distinct_tickets = HyperLogLog()
+
+    # Per-day series: the only part that reads every day of the range
+    for i, date_str in enumerate(dates):
+        current_date = start_date + timedelta(days=i)
+        rollup = rollups[date_str]
+
+        daily_stats[date_str] = {
+            "date": current_date,
+            "blocker_count": rollup["blocker_count"],
+            "total_minutes": rollup["total_minutes"],
+            "session_info": rollup["session_info"],
+            "efficiency": daily_efficiency(rollup["total_minutes"]),
+            "operators_count": rollup["files"]  # Number of operators active this day
+        }
+
+        for operator_location, day in rollup["operators"].items():
+            operator_daily_performance.setdefault(operator_location, {})[date_str] = {
+                "date": current_date,
+                "blockers_count": day["blockers_count"],
+                "total_minutes": day["total_minutes"],
+                "efficiency": round(daily_efficiency(day["total_minutes"]), 1)
+            }
+
+    # Totals, breakdowns and sketches: one pass over the covering months/weeks, or over the days
+    operator_days = {}
+    for rollup in periods if periods is not None else [rollups[date_str] for date_str in dates]:
+        total_blockers += rollup["blocker_count"]
+        total_downtime += rollup["total_minutes"]
+        total_files_scanned += rollup["files"]
+
+        # Percentiles and distinct counts come from merging the rollups' sketches
+        sketches = rollup.get("sketches")
+        if sketches:
+            duration_sketch.merge_json(sketches["durations"])
+            for category, stored in sketches["categories"].items():
+                merge_quantiles(category_sketches, category, stored)
+            for operator_location, stored in sketches["operators"].items():
+                merge_quantiles(operator_sketches, operator_location, stored)
+            for location, stored in sketches["locations"].items():
+                merge_quantiles(location_sketches, location.replace('-', ' ').title(), stored)
+            distinct_operators.merge_json(sketches["distinct_operators"])
+            distinct_tickets.merge_json(sketches["distinct_tickets"])
+
+        for category, stats in rollup["categories"].items():
+            if category not in category_analytics:
+                category_analytics[category] = {"count": 0, "total_minutes": 0, "avg_resolution_time": 0}
+            category_analytics[category]["count"] += stats["count"]
+            category_analytics[category]["total_minutes"] += stats["total_minutes"]
+
+        for operator_location, operator in rollup["operators"].items():
+            if operator_location not in operator_analytics:
+                operator_analytics[operator_location] = {
+                    "operator_name": operator["operator"].replace('-', ' ').title(),
+                    "location": operator["location"].replace('-', ' ').title(),
+                    "total_blockers": 0,
+                    "total_minutes": 0,
+                    "avg_resolution_time": 0,
+                    "efficiency_score": 100,
+                    "categories": {},
+                    "active_days": 0,
+                    "daily_performance": []
+                }
+                operator_days[operator_location] = [0, 0]
+
+            analytics = operator_analytics[operator_location]
+            active_days, days_present, efficiency_tenths = operator_day_stats(operator)
+            analytics["active_days"] += active_days
+            operator_days[operator_location][0] += days_present
+            operator_days[operator_location][1] += efficiency_tenths
+            analytics["total_blockers"] += operator["blockers_count"]
+            analytics["total_minutes"] += operator["total_minutes"]
+            for category, count in operator["categories"].items():
+                analytics["categories"][category] = analytics["categories"].get(category, 0) + count
+
+    # Calculate operator averages and efficiency scores
+    for operator_id, analytics in operator_analytics.items():
+        analytics.update(_percentiles(operator_sketches.get(operator_id)))
+        if analytics["total_blockers"] > 0:
+            analytics["avg_resolution_time"] = round(
+                analytics["total_minutes"] / analytics["total_blockers"], 1
+            )
+
+        # Calculate overall efficiency (average of daily efficiencies)
+        days_present, efficiency_tenths = operator_days[operator_id]
+        daily_perfs = operator_daily_performance.get(operator_id, {})
+        if days_present:
+            analytics["efficiency_score"] = round(efficiency_tenths / days_present / 10, 1)
+
+            # Add daily performance list for charts
+            analytics["daily_performance"] = [
+                daily_perfs.get(date_str,
+                                {"date": start_date + timedelta(days=j), "blockers_count": 0, "total_minutes": 0, "efficiency": 100})
+                for j, date_str in enumerate(dates)
+            ]
+
+    # Calculate category averages
+    for category in category_analytics:
+        category_analytics[category].update(_percentiles(category_sketches.get(category)))
+        if category_analytics[category]["count"] > 0:
+            category_analytics[category]["avg_resolution_time"] = round(
+                category_analytics[category]["total_minutes"] / category_analytics[category]["count"], 1
+            )
+
+    avg_resolution_time = round(total_downtime / total_blockers, 1) if total_blockers > 0 else 0
+
+    # Locations with the longest tail first
+    location_analytics = {
+        location: {"count": sketch.count, **sketch.percentiles()}
+        for location, sketch in sorted(location_sketches.items(),
+                                       key=lambda item: item[1].quantile(0.9) or 0, reverse=True)
+    }
+
+    # Most problematic categories
+    top_categories = sorted(category_analytics.items(),
+                            key=lambda x: x[1]["total_minutes"], reverse=True)[:3]
+
+    # Find operators who worked on the last day, or if no one did, the most recent day up to 2 days back
+    end_str = end_date.strftime("%Y-%m-%d")
+    active_operators_date = end_str
+    active_today_operators = {}
+    for check_days in range(3):
+        check_date = (end_date - timedelta(days=check_days)).strftime("%Y-%m-%d")
+        day_operators = rollups[check_date]["operators"]
+        if day_operators:
+            active_operators_date = check_date
+            for operator_location in day_operators:
+                if operator_location in operator_analytics:
+                    active_today_operators[operator_location] = operator_analytics[operator_location]
+            break
+
+    # If no active operators found, fall back to all operators
+    if not active_today_operators:
+        active_today_operators = operator_analytics
+
+    # Sort active operators by efficiency score for better display
+    sorted_operators = sorted(active_today_operators.items(), key=lambda x: x[1]["efficiency_score"], reverse=True)
+
+    # Performance trends - overall daily efficiency trend
+    daily_trend = [{
+        "date": date_str,
+        "efficiency": daily_stats[date_str]["efficiency"],
+        "blockers": daily_stats[date_str]["blocker_count"],
+        "operators": daily_stats[date_str]["operators_count"]
+    } for date_str in dates]
+
+    return {
+        "daily_stats": daily_stats,
+        "category_analytics": category_analytics,
+        "operator_analytics": dict(sorted_operators),
+        "daily_trend": daily_trend,
+        "total_blockers": total_blockers,
+        "total_downtime": total_downtime,
+        "avg_resolution_time": avg_resolution_time,
+        "duration_percentiles": duration_sketch.percentiles(),
+        "location_analytics": location_analytics,
+        "distinct_operators_estimate": distinct_operators.estimate(),
+        "distinct_tickets_estimate": distinct_tickets.estimate(),
+        "top_categories": top_categories,
+        "date_range": {"start": start_date, "end": end_date},
+        "num_days": len(dates),
+        "period_days": max(1, (end_date - start_date).days),
+        "unique_operators": list(operator_analytics.keys()),
+        "total_files_scanned": total_files_scanned,
+        "active_operators_date": active_operators_date,
+        "showing_today_operators": active_operators_date == date.today().strftime("%Y-%m-%d")
+    }
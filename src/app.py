@@ -1,85 +1,367 @@
 #!/usr/bin/env python3
+import argparse
+import atexit
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import sys
 from typing import Dict, List, Optional, Any, Union
 
+from active_blockers import get_active_registry
+from analytics import get_day_rollups
+from archive import BundleError, find_archived, open_document, pack_month, split_member_path
+from atomic_file import mkstemp_for
+from data_catalog import get_catalog
+from doc_format import FORMAT_VERSIONS, dump_document, load_document
+from file_lock import FileLock
+from journal import (COMPACTING_EVENTS, append_event, apply_event, blockers_on, can_apply, default_document,
+                     journal_path, make_event, read_events, sort_blockers, stat_signature)
+from metrics import record_cache_lookup, record_read, record_write, timer
+from parallel_loader import LOADER_MODES
+from sqlite_store import SqliteHandler, get_sqlite_store
+from storage import STORAGE_BACKENDS, STORAGE_CONFIG, StorageHandler, data_dir, document_name
+
+'''
+deep copy for parsed json documents (much cheaper than copy.deepcopy)
+'''
+def copy_document(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: copy_document(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_document(item) for item in value]
+    return value
+
+
+'''
+process-wide cache of loaded operator documents
+'''
+class DocumentCache:
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, filename: str, version: tuple) -> Optional[Dict[str, Any]]:
+        """Private copy of the cached document, or None if missing or the files changed."""
+        key = os.path.abspath(filename)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached_version, data = entry
+            if cached_version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy_document(data)
+
+    def put(self, filename: str, version: tuple, data: Dict[str, Any]) -> None:
+        key = os.path.abspath(filename)
+        entry = (version, copy_document(data))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(self.max_entries, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+DOCUMENT_CACHE = DocumentCache()
+
+
+def document_version(filename: str) -> tuple:
+    """stat_signature() of the snapshot and of its journal; changes whenever either is written"""
+    snapshot = stat_signature(filename)
+    if snapshot is None:
+        # No loose file: an archived copy, if any, is versioned by the bundle it is read from
+        archived = find_archived(filename)
+        if archived is not None:
+            snapshot = ("archive", stat_signature(split_member_path(archived)[0]))
+    return (snapshot, stat_signature(journal_path(filename)))
+
+
+'''
+durability settings for JsonHandler.save_data
+'''
+class WritePolicy:
+    DURABILITY_MODES = ("always", "batched", "never")
+
+    def __init__(self, durability: str = "always", sync_interval: float = 1.0,
+                 journal_compact_bytes: int = 65536, format_version: int = 1) -> None:
+        self.durability = durability
+        # "batched": fsync written files at most once per sync_interval seconds
+        self.sync_interval = sync_interval
+        # Rewrite the snapshot once the event journal grows past this size
+        self.journal_compact_bytes = journal_compact_bytes
+        # On-disk layout of snapshots (see doc_format); either version is read back
+        self.format_version = format_version
+
+    def configure(self, durability: Optional[str] = None, sync_interval: Optional[float] = None,
+                  journal_compact_bytes: Optional[int] = None, format_version: Optional[int] = None) -> None:
+        if durability is not None:
+            if durability not in self.DURABILITY_MODES:
+                raise ValueError(f"Unknown durability '{durability}', expected one of {', '.join(self.DURABILITY_MODES)}")
+            self.durability = durability
+        if sync_interval is not None:
+            self.sync_interval = sync_interval
+        if journal_compact_bytes is not None:
+            self.journal_compact_bytes = journal_compact_bytes
+        if format_version is not None:
+            if format_version not in FORMAT_VERSIONS:
+                raise ValueError(f"Unknown data format version {format_version}, expected one of {FORMAT_VERSIONS}")
+            self.format_version = format_version
+
+
+WRITE_POLICY = WritePolicy()
+
+
+def _fsync_path(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # directories cannot be fsynced on every platform
+    finally:
+        os.close(fd)
+
+
+'''
+atomic document writer (saves hold the FileLock and go straight to disk, so every process sees them)
+'''
+class DocumentWriter:
+    def __init__(self, policy: WritePolicy) -> None:
+        self.policy = policy
+        self._unsynced: set = set()
+        self._sync_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def write(self, filename: str, data: Dict[str, Any]) -> None:
+        with FileLock(filename):
+            self._write_locked(filename, data)
+
+    def _write_locked(self, filename: str, data: Dict[str, Any]) -> None:
+        directory = os.path.dirname(filename) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        # Write a temp file next to the target and rename it over, so readers see old or new, never half
+        fd, tmp_path = mkstemp_for(filename, prefix=".tmp_", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                dump_document(data, f, self.policy.format_version)
+                f.flush()
+                if self.policy.durability == "always":
+                    os.fsync(f.fileno())
+                record_write("snapshot", os.fstat(f.fileno()).st_size)
+            os.replace(tmp_path, filename)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if self.policy.durability == "always":
+            _fsync_path(directory)
+        elif self.policy.durability == "batched":
+            self.schedule_sync(filename)
+
+        # Keep the shared cache current so the next request skips the re-read
+        DOCUMENT_CACHE.put(filename, document_version(filename), data)
+
+    def schedule_sync(self, filename: str) -> None:
+        with self._lock:
+            self._unsynced.add(filename)
+            if self._sync_timer is None:
+                self._sync_timer = threading.Timer(self.policy.sync_interval, self.sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+    def sync(self) -> None:
+        """fsync every file written since the last batched sync."""
+        with self._lock:
+            filenames = self._unsynced
+            self._unsynced = set()
+            self._sync_timer = None
+        for filename in filenames:
+            _fsync_path(filename)
+        for directory in {os.path.dirname(filename) or "." for filename in filenames}:
+            _fsync_path(directory)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+        self.sync()
+
+
+DOCUMENT_WRITER = DocumentWriter(WRITE_POLICY)
+atexit.register(DOCUMENT_WRITER.close)
+
+
 '''
 json handler
 '''
-class JsonHandler:
+class JsonHandler(StorageHandler):
     def __init__(self, test_mode: bool = False, filename: Optional[str] = None, session_info: Optional[dict] = None) -> None:
-        # Set base directory
-        if test_mode:
-            print("TEST MODE ACTIVATED")
-            base_dir = "data/test/"
-        else:
-            base_dir = "data/production/"
+        # Set base directory (EODTracker announces test mode)
+        base_dir = data_dir(test_mode)
         
-        # Generate filename if not provided
+        # Generate a date-specific filename if not provided
         if filename is None:
-            operators = ""
-            if session_info:
-                pack_op = session_info.get("pack_operator", "").replace(' ', '-').replace('/', '-')
-                location = session_info.get("location", "").replace(' ', '-').replace('/', '-')
-                if pack_op:
-                    operators = pack_op
-                    if location:
-                        operators += f"_{location}"
-            
-            # Create date-specific filename
-            today = datetime.now().strftime("%Y-%m-%d")
-            filename = f"{operators}_eod_data_{today}.json"
+            filename = document_name(session_info)
         
         self.filename = os.path.join(base_dir, filename)
+        self.journal_filename = journal_path(self.filename)
+        # Journal events replayed on top of the snapshot by the last load from disk
+        self.replayed_events = 0
 
         # Load existing data or create new
         self.data = self.load_data()
 
     '''
-    loads the json file
+    loads the snapshot plus its journal tail (served from DOCUMENT_CACHE while neither file changed)
     '''
     def load_data(self) -> Dict[str, Any]:
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return self.get_default_data()
-        return self.get_default_data()
+        with timer("load_data"):
+            version = document_version(self.filename)
+            cached = DOCUMENT_CACHE.get(self.filename, version)
+            record_cache_lookup(cached is not None)
+            if cached is not None:
+                return cached
+            with timer("load_data.read_snapshot"):
+                data = self.read_snapshot()
+
+            with timer("load_data.replay_journal"):
+                events = read_events(self.journal_filename, after_seq=data.get("journal_seq", 0))
+                for event in events:
+                    apply_event(data, event)
+            self.replayed_events = len(events)
+            # Day lookups binary-search the blockers, so files written before they were kept sorted get sorted here
+            sort_blockers(data)
+
+            DOCUMENT_CACHE.put(self.filename, version, data)
+            return data
+
+    def read_snapshot(self) -> Dict[str, Any]:
+        try:
+            with open(self.filename, 'r') as f:
+                record_read("snapshot", os.fstat(f.fileno()).st_size)
+                return load_document(f)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            return self.get_default_data()
+        
+        # Older days may have been packed into a monthly bundle; saving writes a loose file that overrides it
+        archived = find_archived(self.filename)
+        if archived is None:
+            return self.get_default_data()
+        try:
+            with open_document(archived) as f:
+                return load_document(f)
+        except (json.JSONDecodeError, BundleError, FileNotFoundError):
+            return self.get_default_data()
 
     '''
     parser
     '''
     def get_default_data(self) -> Dict[str, Any]:
-        return {
-            "blockers": [],
-            "current_blocker": None,
-            "last_updated": None,
-            "session_info": None
-        }
+        return default_document()
+
+    '''
+    records one mutation as an O(1) journal append and applies it to self.data;
+    returns None when the latest state no longer allows it (e.g. another worker ended the blocker)
+    '''
+    def append_event(self, event_type: str, at: str, **payload: Any) -> Optional[Dict[str, Any]]:
+        with FileLock(self.filename):
+            # Another process may have written since this handler loaded; apply on top of the latest state
+            self.data = self.load_data()
+            if not can_apply(self.data, event_type, payload):
+                return None
+
+            event = make_event(self.data.get("journal_seq", 0) + 1, event_type, at, **payload)
+
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            append_event(self.journal_filename, event, fsync=WRITE_POLICY.durability == "always")
+            if WRITE_POLICY.durability == "batched":
+                DOCUMENT_WRITER.schedule_sync(self.journal_filename)
+
+            apply_event(self.data, event)
+
+            journal_size = os.path.getsize(self.journal_filename)
+            if event_type in COMPACTING_EVENTS or journal_size >= WRITE_POLICY.journal_compact_bytes:
+                self.compact()
+            else:
+                DOCUMENT_CACHE.put(self.filename, document_version(self.filename), self.data)
+        return event
+
     '''
-    writes to file
+    folds the journal into the snapshot file and starts a fresh journal
+    '''
+    def compact(self) -> None:
+        with FileLock(self.filename):
+            # The snapshot records journal_seq, so a crash before the journal is removed cannot replay twice
+            DOCUMENT_WRITER.write(self.filename, self.data)
+            try:
+                os.remove(self.journal_filename)
+            except FileNotFoundError:
+                pass
+            DOCUMENT_CACHE.put(self.filename, document_version(self.filename), self.data)
+
+    '''
+    writes to file (atomic rename; durability follows WRITE_POLICY)
     '''
     def save_data(self) -> None:
-        # Ensure directory exists before saving
-        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
-        with open(self.filename, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        with timer("save_data"), FileLock(self.filename):
+            DOCUMENT_WRITER.write(self.filename, self.data)
 # Removed StatusTracker class - no longer used
 
 
+'''
+storage backend for one operator's document (STORAGE_CONFIG.backend unless given)
+'''
+def open_storage(backend: str, test_mode: bool = False, filename: Optional[str] = None,
+                 session_info: Optional[dict] = None) -> StorageHandler:
+    if backend == "sqlite":
+        # Match the JSON backend's durability: fsync every commit only when writes are "always" durable
+        synchronous = "FULL" if WRITE_POLICY.durability == "always" else "NORMAL"
+        return SqliteHandler(test_mode=test_mode, filename=filename, session_info=session_info, synchronous=synchronous)
+    if backend == "json":
+        return JsonHandler(test_mode=test_mode, filename=filename, session_info=session_info)
+    raise ValueError(f"Unknown storage backend '{backend}', expected one of {', '.join(STORAGE_BACKENDS)}")
+
+
+'''
+path of an operator's document for today, without loading it
+'''
+def document_path(test_mode: bool = False, session_info: Optional[dict] = None) -> str:
+    return os.path.join(data_dir(test_mode), document_name(session_info))
+
+
+'''
+cheap validator that changes whenever the document may have changed
+'''
+def storage_version(backend: str, filename: str) -> tuple:
+    if backend == "sqlite":
+        return ("sqlite", get_sqlite_store(os.path.dirname(filename)).revision())
+    return document_version(filename)
+
+
 '''
 eod runner
 '''
 class EODTracker:
-    def __init__(self, test_mode: bool = False, session_info: Optional[dict] = None) -> None:
+    def __init__(self, test_mode: bool = False, session_info: Optional[dict] = None, backend: Optional[str] = None) -> None:
         if test_mode:
             print("TEST MODE ACTIVATED")
-            self.js_handler = JsonHandler(test_mode=True, session_info=session_info)
-        else:
-            self.js_handler = JsonHandler(test_mode=False, session_info=session_info)
+        self.js_handler = open_storage(backend or STORAGE_CONFIG.backend, test_mode=test_mode, session_info=session_info)
 
         self.check_recovery()
     
@@ -118,11 +400,47 @@ class EODTracker:
             "initialized_at": self.format_timestamp()
         }
         
-        self.js_handler.data["session_info"] = session_info
-        self.js_handler.save_data()
+        self.record_session_info(session_info)
         
         print("\nSession information saved!")
 
+    '''
+    non-interactive mutations (shared by the CLI and the web interface)
+    '''
+    def record_session_info(self, session_info: Dict[str, Any]) -> None:
+        self.js_handler.append_event("session", self.format_timestamp(), session_info=session_info)
+
+    def record_ticket(self, number: str, link: str) -> Optional[Dict[str, str]]:
+        if not self.js_handler.data.get("current_blocker"):
+            return None
+        ticket_obj = {"number": number, "link": link}
+        if self.js_handler.append_event("ticket", self.format_timestamp(), ticket=ticket_obj) is None:
+            return None
+        return ticket_obj
+
+    def record_note(self, content: str) -> Optional[Dict[str, str]]:
+        if not self.js_handler.data.get("current_blocker"):
+            return None
+        note = {
+            "content": content,
+            "timestamp": self.format_timestamp()
+        }
+        if self.js_handler.append_event("note", note["timestamp"], note=note) is None:
+            return None
+        return note
+
+    def reset_data(self) -> None:
+        self.js_handler.append_event("clear", self.format_timestamp())
+        self.publish_active_blocker()
+
+    '''
+    keeps the fleet-wide registry of open blockers (/manager/active) in step with this document
+    '''
+    def publish_active_blocker(self) -> None:
+        data = self.js_handler.data
+        get_active_registry(os.path.dirname(self.js_handler.filename)).update(
+            os.path.basename(self.js_handler.filename), data.get("current_blocker"), data.get("session_info"))
+
 
     '''
     add ticket numbers to current blocker
@@ -150,12 +468,11 @@ class EODTracker:
             ticket_link ="LINK :" +  input("Enter ticket link: ").strip()
             if ticket_link:
                 # Add ticket object to current blocker's tickets
-                ticket_obj = {"number": ticket, "link": ticket_link}
-                current["tickets"].append(ticket_obj)
-
-                self.js_handler.save_data()
+                if self.record_ticket(ticket, ticket_link) is None:
+                    print("No active blocker. Start a blocker first to add tickets.")
+                    return
                 print(f"Ticket {ticket} added to current blocker!")
-                ticket_list = self._format_ticket_list(current["tickets"])
+                ticket_list = self._format_ticket_list(self.js_handler.data["current_blocker"]["tickets"])
                 print(f"All tickets for this blocker: {', '.join(ticket_list)}")
 
             else:
@@ -193,16 +510,10 @@ class EODTracker:
         note_content = "\n".join(lines).strip()
         
         # Add note to current blocker
-        if "notes" not in self.js_handler.data["current_blocker"]:
-            self.js_handler.data["current_blocker"]["notes"] = []
-        
-        note = {
-            "content": note_content,
-            "timestamp": self.format_timestamp()
-        }
-        
-        self.js_handler.data["current_blocker"]["notes"].append(note)
-        self.js_handler.save_data()
+        note = self.record_note(note_content)
+        if note is None:
+            print("No active blocker. Start a blocker first to add notes.")
+            return
         
         print(f"\nNote added to current blocker at {note['timestamp']}")
         print(f"Preview: {note_content[:50]}{'...' if len(note_content) > 50 else ''}")
@@ -222,6 +533,10 @@ class EODTracker:
                 print(f"New day detected. Previous session was {session.get('date')}")
                 # Skip session info prompt for web interface
         
+        # State is the snapshot plus any journal events written after it
+        if self.js_handler.replayed_events:
+            print(f"Replayed {self.js_handler.replayed_events} journal events since the last snapshot")
+        
         # Check for blocker recovery
         if self.js_handler.data.get("current_blocker"):
             print(f"Recovered session with active blocker: '{self.js_handler.data['current_blocker']['description']}'")
@@ -237,7 +552,7 @@ class EODTracker:
         return dt.strftime("%Y-%m-%d %H:%M:%S")
     
     def parse_timestamp(self, ts_string: str) -> datetime:
-        return datetime.strptime(ts_string, "%Y-%m-%d %H:%M:%S")
+        return datetime.fromisoformat(ts_string)
 
 
 
@@ -256,9 +571,10 @@ class EODTracker:
             "start_time": self.format_timestamp(),
             "tickets": []
         }
-        self.js_handler.data["current_blocker"] = current_blocker
-        self.js_handler.data["last_updated"] = self.format_timestamp()
-        self.js_handler.save_data()
+        if self.js_handler.append_event("start", self.format_timestamp(), blocker=current_blocker) is None:
+            print("A blocker is already active. Please end it first.")
+            return False
+        self.publish_active_blocker()
         
         print(f"Started '{category}' blocker: '{description}' at {current_blocker['start_time']}")
         
@@ -283,26 +599,20 @@ class EODTracker:
         end_dt = self.parse_timestamp(end_time)
         duration = end_dt - start_dt
         
-        completed_blocker = {
-            "description": current["description"],
-            "category": current.get("category", "other"),
-            "start_time": current["start_time"],
-            "end_time": end_time,
-            "duration_minutes": int(duration.total_seconds() / 60),
-            "tickets": current.get("tickets", []),
-            "notes": current.get("notes", [])
-        }
-        
-        self.js_handler.data["blockers"].append(completed_blocker)
-        self.js_handler.data["current_blocker"] = None
-        self.js_handler.data["last_updated"] = self.format_timestamp()
-        self.js_handler.save_data()
+        ended = self.js_handler.append_event("end", self.format_timestamp(),
+                                             start_time=current["start_time"],
+                                             end_time=end_time,
+                                             duration_minutes=int(duration.total_seconds() / 60))
+        if ended is None:
+            print("No active blocker to end.")
+            return False
+        self.publish_active_blocker()
         
-        hours = completed_blocker["duration_minutes"] // 60
-        minutes = completed_blocker["duration_minutes"] % 60
+        hours = ended["duration_minutes"] // 60
+        minutes = ended["duration_minutes"] % 60
         
         print(f"Ended blocker: '{current['description']}'")
-        print(f"   Duration: {hours}h {minutes}m ({completed_blocker['duration_minutes']} minutes)")
+        print(f"   Duration: {hours}h {minutes}m ({ended['duration_minutes']} minutes)")
         return True
 
     '''
@@ -310,7 +620,7 @@ class EODTracker:
     '''
     def view_today_summary(self) -> None:
         today = datetime.now().strftime("%Y-%m-%d")
-        today_blockers = [b for b in self.js_handler.data["blockers"] if b["start_time"].startswith(today)]
+        today_blockers = blockers_on(self.js_handler.data["blockers"], today)
         
         print(f"\nToday's Summary ({today})")
         print("=" * 40)
@@ -384,11 +694,7 @@ class EODTracker:
         if not isinstance(blockers_data, list):
             blockers_data = []
         
-        today_blockers = []
-        for b in blockers_data:
-            if b and isinstance(b, dict) and b.get("start_time"):
-                if b["start_time"].startswith(today):
-                    today_blockers.append(b)
+        today_blockers = blockers_on(blockers_data, today)
         
         print(f"\nEnd of Day Report - {today}")
         print("=" * 50)
@@ -453,8 +759,7 @@ class EODTracker:
     def clear_all_data(self) -> None:
         confirm = input("Are you sure you want to clear ALL data? This cannot be undone. (type 'YES' to confirm): ")
         if confirm == "YES":
-            self.js_handler.data = self.js_handler.get_default_data()
-            self.js_handler.save_data()
+            self.reset_data()
             print("All data cleared successfully.")
         else:
             print("Clear operation cancelled.")
@@ -542,8 +847,174 @@ class EODTracker:
                 max_choice = 8 if self.js_handler.data.get("current_blocker") else 6
                 print(f"Invalid choice. Please select 1-{max_choice}.")
 
+
+'''
+fleet-wide summary across every operator file
+'''
+def print_fleet_summary(test_mode: bool = False, days: int = 7, mode: str = "thread", workers: Optional[int] = None,
+                        backend: str = "json") -> None:
+    base_dir = "data/test" if test_mode else "data/production"
+    
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=days)
+    
+    # Per-day rollups: unchanged days are reused, changed files are parsed concurrently
+    rollups = get_day_rollups(base_dir, start_date, end_date, loader_mode=mode, loader_workers=workers, backend=backend)
+    dates = sorted(rollups)
+    
+    print(f"\nFleet Summary ({dates[0]} to {dates[-1]})")
+    print("=" * 50)
+    
+    total_blockers = 0
+    total_minutes = 0
+    category_totals = {}
+    for date_str in dates:
+        rollup = rollups[date_str]
+        day_blockers = rollup["blocker_count"]
+        day_minutes = rollup["total_minutes"]
+        for category, stats in rollup["categories"].items():
+            totals = category_totals.setdefault(category, {"count": 0, "total_minutes": 0})
+            totals["count"] += stats["count"]
+            totals["total_minutes"] += stats["total_minutes"]
+        
+        total_blockers += day_blockers
+        total_minutes += day_minutes
+        print(f"{date_str}: {rollup['files']} operators, {day_blockers} blockers, {day_minutes // 60}h {day_minutes % 60}m")
+    
+    print("-" * 50)
+    print(f"Total: {total_blockers} blockers, {total_minutes // 60}h {total_minutes % 60}m")
+    for category, stats in sorted(category_totals.items(), key=lambda x: x[1]["total_minutes"], reverse=True):
+        print(f"  {category}: {stats['count']} blockers, {stats['total_minutes']} minutes")
+
+
+
+def migrate_to_sqlite(test_mode: Optional[bool] = None) -> None:
+    """Import the JSON data trees (snapshot plus journal) into their SQLite databases"""
+    for env_test_mode in ([False, True] if test_mode is None else [test_mode]):
+        base_dir = data_dir(env_test_mode)
+        store = get_sqlite_store(base_dir)
+        entries = get_catalog(base_dir).entries()
+        blockers = 0
+        for entry in entries:
+            data = JsonHandler(test_mode=env_test_mode, filename=entry.filename).data
+            store.write_document(entry.filename, data)
+            blockers += len(data.get("blockers", []))
+        print(f"{base_dir}: imported {len(entries)} files, {blockers} blockers into {store.db_path}")
+
+
+def convert_data_format(version: int, test_mode: Optional[bool] = None) -> None:
+    """Rewrite every loose data file (snapshot plus journal) in the given on-disk format; archived ones keep theirs"""
+    WRITE_POLICY.configure(format_version=version)
+    for env_test_mode in ([False, True] if test_mode is None else [test_mode]):
+        base_dir = data_dir(env_test_mode)
+        entries = [entry for entry in get_catalog(base_dir).entries() if split_member_path(entry.path) is None]
+        bytes_before = bytes_after = 0
+        for entry in entries:
+            handler = JsonHandler(test_mode=env_test_mode, filename=entry.filename)
+            with FileLock(handler.filename):
+                bytes_before += os.path.getsize(handler.filename)
+                handler.data = handler.load_data()
+                handler.compact()
+                bytes_after += os.path.getsize(handler.filename)
+        print(f"{base_dir}: {len(entries)} files written as v{version}, {bytes_before} -> {bytes_after} bytes")
+
+
+def archive_old_documents(days: int, test_mode: Optional[bool] = None) -> None:
+    """Pack the data files dated more than `days` days ago into monthly bundles and remove the loose files"""
+    if days < 1:
+        raise ValueError("--older-than must be at least 1 day")
+    cutoff = (datetime.now().date() - timedelta(days=days)).strftime("%Y-%m-%d")
+    for env_test_mode in ([False, True] if test_mode is None else [test_mode]):
+        base_dir = data_dir(env_test_mode)
+        months = {}
+        for entry in get_catalog(base_dir).entries():
+            if entry.date < cutoff and split_member_path(entry.path) is None:
+                months.setdefault(entry.date[:7], []).append(entry)
+        
+        packed = bytes_before = 0
+        for month, entries in sorted(months.items()):
+            for entry in entries:
+                # Bundles hold snapshots only, so pending journal events are folded in first
+                if os.path.exists(journal_path(entry.path)):
+                    handler = JsonHandler(test_mode=env_test_mode, filename=entry.filename)
+                    with FileLock(handler.filename):
+                        handler.data = handler.load_data()
+                        handler.compact()
+            result = pack_month(base_dir, month, entries)
+            print(f"  {month}: {result.packed} files ({result.bytes_before} bytes) packed, bundle now {result.bundle_size} bytes"
+                  + (f", {result.skipped} left in place (changed while packing)" if result.skipped else ""))
+            packed += result.packed
+            bytes_before += result.bytes_before
+        print(f"{base_dir}: archived {packed} files ({bytes_before} bytes) dated before {cutoff} "
+              f"into {len(months)} monthly bundles")
+
+
+def non_negative_int(value: str) -> int:
+    """argparse type for counts that may be 0 but not negative"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {number}")
+    return number
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="EOD Generator - End of Day Report Tool")
+    parser.add_argument("--backend", choices=STORAGE_BACKENDS, default="json", help="Storage backend (json or sqlite)")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    summary_parser = subparsers.add_parser("summary", help="Print fleet-wide blocker totals for recent days")
+    summary_parser.add_argument("--test", action="store_true", help="Use the test data directory")
+    summary_parser.add_argument("--days", type=non_negative_int, default=7, help="Number of days before today to include")
+    summary_parser.add_argument("--mode", choices=LOADER_MODES, default="thread", help="Loader pool type")
+    summary_parser.add_argument("--workers", type=int, default=None, help="Maximum loader workers")
+    
+    migrate_parser = subparsers.add_parser("migrate-sqlite", help="Import the JSON data files into SQLite")
+    env_group = migrate_parser.add_mutually_exclusive_group()
+    env_group.add_argument("--test", action="store_true", help="Only the test data directory")
+    env_group.add_argument("--production", action="store_true", help="Only the production data directory")
+    
+    convert_parser = subparsers.add_parser("convert-format", help="Rewrite the data files in another on-disk format")
+    convert_parser.add_argument("--to", type=int, choices=FORMAT_VERSIONS, default=2, help="Target format version")
+    convert_env_group = convert_parser.add_mutually_exclusive_group()
+    convert_env_group.add_argument("--test", action="store_true", help="Only the test data directory")
+    convert_env_group.add_argument("--production", action="store_true", help="Only the production data directory")
+    
+    archive_parser = subparsers.add_parser("archive", help="Pack old data files into monthly compressed bundles")
+    archive_parser.add_argument("--older-than", type=int, default=90, metavar="DAYS",
+                                help="Archive files dated more than this many days ago (default 90)")
+    archive_env_group = archive_parser.add_mutually_exclusive_group()
+    archive_env_group.add_argument("--test", action="store_true", help="Only the test data directory")
+    archive_env_group.add_argument("--production", action="store_true", help="Only the production data directory")
+    
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
     try:
+        args = parse_args(sys.argv[1:])
+        
+        if args.command == "summary":
+            print_fleet_summary(test_mode=args.test, days=args.days, mode=args.mode, workers=args.workers,
+                                backend=args.backend)
+            sys.exit(0)
+        
+        if args.command == "migrate-sqlite":
+            migrate_to_sqlite(test_mode=True if args.test else False if args.production else None)
+            sys.exit(0)
+        
+        if args.command == "convert-format":
+            convert_data_format(args.to, test_mode=True if args.test else False if args.production else None)
+            sys.exit(0)
+        
+        if args.command == "archive":
+            if args.backend != "json":
+                print("Archiving applies to the JSON data files; the SQLite database is not changed.")
+                sys.exit(1)
+            archive_old_documents(args.older_than, test_mode=True if args.test else False if args.production else None)
+            sys.exit(0)
+        
+        STORAGE_CONFIG.configure(backend=args.backend)
+        
         test_input = input('test mode? (y/n): ').strip().lower()
         test_mode = test_input == 'y'
         
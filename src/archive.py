@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Monthly archive bundles of old operator documents.
+
+`python src/app.py archive --older-than N` packs the day files older than N days into one
+bundle per month, data/<env>/archive/<YYYY-MM>.eodbundle, and removes the loose files:
+
+    magic (8 bytes) | record | record | ... | index | footer
+    record  one document's bytes, zlib-compressed on its own
+    index   zlib-compressed JSON: filename -> operator, location, date, offset, length,
+            crc32 and the mtime/size the loose file had
+    footer  index offset (8 bytes), index length (4 bytes), magic (8 bytes)
+
+A reader takes the index from the footer once per bundle version and then decompresses only
+the record it needs. Archived documents are addressed as "<bundle>!<filename>" paths, which
+open_document() and stat_document() accept wherever a data file path is expected; a member
+reports the mtime and size of the file it was packed from, so caches keyed by them stay valid.
+A loose file with the same name (the document was written again) takes precedence.
+"""
+import io
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, IO, Iterable, List, NamedTuple, Optional, Tuple
+
+from atomic_file import mkstemp_for
+from file_lock import FileLock, remove_lock_file
+from journal import journal_path
+from metrics import record_read, record_write
+
+ARCHIVE_DIRNAME = "archive"
+BUNDLE_SUFFIX = ".eodbundle"
+BUNDLE_MAGIC = b"EODBNDL1"
+FOOTER = struct.Struct(">QI8s")
+MEMBER_SEPARATOR = "!"
+
+# Bump when the index layout changes
+INDEX_VERSION = 1
+
+
+class MemberStat(NamedTuple):
+    """The st_mtime_ns/st_size of an archived document, as recorded when it was packed"""
+    st_mtime_ns: int
+    st_size: int
+
+
+def archive_dir(base_dir: str) -> str:
+    return os.path.join(base_dir, ARCHIVE_DIRNAME)
+
+
+def bundle_path(base_dir: str, month: str) -> str:
+    """Bundle of one month, e.g. data/production/archive/2025-08.eodbundle"""
+    return os.path.join(archive_dir(base_dir), f"{month}{BUNDLE_SUFFIX}")
+
+
+def member_path(bundle: str, filename: str) -> str:
+    return f"{bundle}{MEMBER_SEPARATOR}{filename}"
+
+
+def split_member_path(path: str) -> Optional[Tuple[str, str]]:
+    """(bundle, filename) of an archived document path; None for a plain file path"""
+    bundle, separator, filename = path.rpartition(MEMBER_SEPARATOR)
+    if not separator or not bundle.endswith(BUNDLE_SUFFIX):
+        return None
+    return bundle, filename
+
+
+class BundleError(ValueError):
+    """A bundle that is truncated, of another format, or whose record fails its checksum"""
+
+
+def _read_index(f: IO[bytes], size: int) -> Dict[str, Dict[str, Any]]:
+    if size < len(BUNDLE_MAGIC) + FOOTER.size:
+        raise BundleError("bundle too short")
+    f.seek(size - FOOTER.size)
+    index_offset, index_length, magic = FOOTER.unpack(f.read(FOOTER.size))
+    if magic != BUNDLE_MAGIC or index_offset + index_length > size - FOOTER.size:
+        raise BundleError("not an EOD bundle")
+    f.seek(index_offset)
+    index = json.loads(zlib.decompress(f.read(index_length)))
+    record_read("archive_index", index_length)
+    if index.get("version") != INDEX_VERSION:
+        raise BundleError(f"unsupported bundle index version {index.get('version')}")
+    return index["records"]
+
+
+class BundleIndexCache:
+    """Parsed indexes of the bundles read by this process, keyed by path and revalidated by (mtime, size, inode)"""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, bundle: str, f: IO[bytes]) -> Dict[str, Dict[str, Any]]:
+        """Index of the bundle open as f, parsed again only if the file is not the version cached"""
+        stat = os.fstat(f.fileno())
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        key = os.path.abspath(bundle)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        records = _read_index(f, stat.st_size)
+        with self._lock:
+            self._entries[key] = (stamp, records)
+        return records
+
+    def index(self, bundle: str) -> Dict[str, Dict[str, Any]]:
+        """filename -> record entry of a bundle ({} if it does not exist)"""
+        try:
+            stat = os.stat(bundle)
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            cached = self._entries.get(os.path.abspath(bundle))
+        if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size, stat.st_ino):
+            return cached[1]
+        try:
+            with open(bundle, 'rb') as f:
+                return self.lookup(bundle, f)
+        except FileNotFoundError:
+            return {}
+
+    def read(self, bundle: str, filename: str) -> bytes:
+        """One document's bytes; the index comes from the same open file, so a concurrent repack cannot mix versions"""
+        with open(bundle, 'rb') as f:
+            entry = self.lookup(bundle, f).get(filename)
+            if entry is None:
+                raise FileNotFoundError(member_path(bundle, filename))
+            f.seek(entry["offset"])
+            compressed = f.read(entry["length"])
+        record_read("archive_record", len(compressed))
+        try:
+            data = zlib.decompress(compressed)
+        except zlib.error as e:
+            raise BundleError(f"corrupt record {filename} in {bundle}: {e}")
+        if zlib.crc32(data) != entry["crc32"]:
+            raise BundleError(f"checksum mismatch for {filename} in {bundle}")
+        return data
+
+
+BUNDLE_INDEXES = BundleIndexCache()
+
+
+def list_bundles(base_dir: str) -> List[str]:
+    """Bundle paths of a data directory, oldest month first"""
+    try:
+        names = sorted(name for name in os.listdir(archive_dir(base_dir)) if name.endswith(BUNDLE_SUFFIX))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(archive_dir(base_dir), name) for name in names]
+
+
+def archived_documents(base_dir: str) -> Iterable[Tuple[str, str]]:
+    """(bundle, filename) of every archived document of a data directory"""
+    for bundle in list_bundles(base_dir):
+        for filename in BUNDLE_INDEXES.index(bundle):
+            yield bundle, filename
+
+
+def archive_dir_mtime(base_dir: str) -> Optional[int]:
+    try:
+        return os.stat(archive_dir(base_dir)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def find_archived(path: str) -> Optional[str]:
+    """Member path of the archived copy of a data file path (by its date's month bundle), if there is one"""
+    base_dir, filename = os.path.split(path)
+    stem, _, date_part = filename.rpartition("_eod_data_")
+    if not stem or len(date_part) < 7:
+        return None
+    bundle = bundle_path(base_dir, date_part[:7])
+    return member_path(bundle, filename) if filename in BUNDLE_INDEXES.index(bundle) else None
+
+
+def stat_document(path: str):
+    """os.stat() of a data file, or a MemberStat for an archived one; FileNotFoundError if neither exists"""
+    member = split_member_path(path)
+    if member is None:
+        return os.stat(path)
+    entry = BUNDLE_INDEXES.index(member[0]).get(member[1])
+    if entry is None:
+        raise FileNotFoundError(path)
+    return MemberStat(entry["mtime_ns"], entry["size"])
+
+
+def open_document(path: str) -> IO[str]:
+    """Text stream of a data file or of an archived document (only its own record is decompressed)"""
+    member = split_member_path(path)
+    if member is None:
+        return open(path, 'r')
+    return io.StringIO(BUNDLE_INDEXES.read(*member).decode("utf-8"))
+
+
+def write_bundle(bundle: str, documents: Dict[str, Tuple[Dict[str, Any], bytes]]) -> int:
+    """
+    Write a bundle atomically from filename -> (index entry fields, document bytes); entries
+    that already carry a crc32 are records of an earlier pack and are copied still compressed.
+    Returns the bundle size.
+    """
+    os.makedirs(os.path.dirname(bundle), exist_ok=True)
+    fd, tmp_path = mkstemp_for(bundle, prefix=".bundle.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(BUNDLE_MAGIC)
+            records = {}
+            for filename in sorted(documents):
+                fields, payload = documents[filename]
+                if "crc32" in fields:
+                    compressed = payload
+                else:
+                    compressed = zlib.compress(payload, 9)
+                    fields = dict(fields, crc32=zlib.crc32(payload))
+                records[filename] = dict(fields, offset=f.tell(), length=len(compressed))
+                f.write(compressed)
+            index_offset = f.tell()
+            index = zlib.compress(json.dumps({"version": INDEX_VERSION, "records": records},
+                                             separators=(',', ':')).encode("utf-8"), 9)
+            f.write(index)
+            f.write(FOOTER.pack(index_offset, len(index), BUNDLE_MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp_path, bundle)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    record_write("archive_bundle", size)
+    return size
+
+
+def existing_records(bundle: str) -> Dict[str, Tuple[Dict[str, Any], bytes]]:
+    """A bundle's documents as still-compressed records, for repacking it with more documents"""
+    records = {}
+    try:
+        with open(bundle, 'rb') as f:
+            for filename, entry in BUNDLE_INDEXES.lookup(bundle, f).items():
+                f.seek(entry["offset"])
+                fields = {key: value for key, value in entry.items() if key not in ("offset", "length")}
+                records[filename] = (fields, f.read(entry["length"]))
+    except FileNotFoundError:
+        pass
+    return records
+
+
+class PackResult(NamedTuple):
+    month: str
+    packed: int
+    skipped: int
+    bytes_before: int
+    bundle_size: int
+
+
+def pack_month(base_dir: str, month: str, entries: List[Any]) -> PackResult:
+    """
+    Add the loose files of catalog entries (all of one month) to that month's bundle, then
+    remove each file that did not change meanwhile. Files with a journal are left alone (the
+    caller compacts them first); a file written while packing stays loose and keeps overriding
+    its archived copy until the next run.
+    """
+    bundle = bundle_path(base_dir, month)
+    with FileLock(bundle):
+        documents = existing_records(bundle)
+        packed = {}
+        skipped = 0
+        for entry in entries:
+            if os.path.exists(journal_path(entry.path)):
+                skipped += 1
+                continue
+            try:
+                with open(entry.path, 'rb') as f:
+                    stat = os.fstat(f.fileno())
+                    raw = f.read()
+            except FileNotFoundError:
+                continue
+            documents[entry.filename] = ({
+                "operator_location": entry.operator_location,
+                "operator": entry.operator,
+                "location": entry.location,
+                "date": entry.date,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size
+            }, raw)
+            packed[entry.path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if not packed:
+            return PackResult(month, 0, skipped, 0, 0)
+        bundle_size = write_bundle(bundle, documents)
+
+    removed = 0
+    for path, stamp in packed.items():
+        with FileLock(path):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size, stat.st_ino) == stamp and not os.path.exists(journal_path(path)):
+                os.remove(path)
+                remove_lock_file(path)
+                removed += 1
+    return PackResult(month, removed, skipped + len(packed) - removed,
+                      sum(stamp[1] for stamp in packed.values()), bundle_size)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Temp files for atomic rewrites: written next to their target, then os.replace()d over it
+"""
+import os
+import secrets
+import stat
+from typing import Tuple
+
+# Same flags tempfile.mkstemp() uses, but the file is created 0666 so the kernel applies the umask
+_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0)
+_ATTEMPTS = 100
+
+
+def mkstemp_for(target: str, prefix: str, suffix: str) -> Tuple[int, str]:
+    """
+    (fd, path) of a new temp file in the target's directory, with the mode the target will keep:
+    the existing file's, or what open() would give a new file (tempfile.mkstemp() always uses 0600)
+    """
+    directory = os.path.dirname(target) or "."
+    for _ in range(_ATTEMPTS):
+        path = os.path.join(directory, f"{prefix}{secrets.token_hex(6)}{suffix}")
+        try:
+            fd = os.open(path, _FLAGS, 0o666)
+        except FileExistsError:
+            continue
+        try:
+            if hasattr(os, "fchmod"):  # Windows before Python 3.13: no POSIX modes to keep
+                os.fchmod(fd, stat.S_IMODE(os.stat(target).st_mode))
+        except FileNotFoundError:
+            pass
+        except BaseException:
+            os.close(fd)
+            os.remove(path)
+            raise
+        return fd, path
+    raise FileExistsError(f"no unused temp file name in {directory}")
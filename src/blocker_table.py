@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Columnar blocker table with grouped reductions (NumPy when installed, plain Python otherwise)
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the same reductions run as Python loops
+    np = None
+
+HAVE_NUMPY = np is not None
+
+COLUMNS = ("start_epoch", "end_epoch", "duration_minutes", "category_code",
+           "operator_id", "location_id", "date_ordinal")
+
+# Timestamps are naive local times; they are stored as if they were UTC so epochs round-trip exactly
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+
+def timestamp_epoch(timestamp: Optional[str]) -> int:
+    """'YYYY-MM-DD HH:MM:SS' -> seconds since 1970-01-01 00:00 (-1 when missing)"""
+    if not timestamp:
+        return -1
+    return int((datetime.fromisoformat(timestamp) - _EPOCH).total_seconds())
+
+
+def ordinal_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime("%Y-%m-%d")
+
+
+class _Codes:
+    """Dense integer codes for repeated strings (categories, operators, locations)"""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class BlockerTable:
+    """
+    One row per completed blocker, stored column by column. Rows are appended as
+    Python lists and frozen into int64 arrays on first use; timestamps are parsed
+    in bulk at that point.
+    """
+
+    def __init__(self) -> None:
+        self.categories = _Codes()
+        self.operators = _Codes()
+        self.locations = _Codes()
+        self._start_times: List[str] = []
+        self._end_times: List[Optional[str]] = []
+        self._rows: Dict[str, List[int]] = {"duration_minutes": [], "category_code": [],
+                                            "operator_id": [], "location_id": []}
+        self._frozen: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_document(cls, data: Dict[str, Any], operator: str = "unknown", location: str = "unknown") -> "BlockerTable":
+        table = cls()
+        table.extend(data.get("blockers", []), operator, location)
+        return table
+
+    def __len__(self) -> int:
+        return len(self._start_times)
+
+    def extend(self, blockers: Iterable[Dict[str, Any]], operator: str = "unknown", location: str = "unknown") -> None:
+        """Append blockers; ones without a start time are skipped"""
+        rows = self._rows
+        operator_id = self.operators.code(operator)
+        location_id = self.locations.code(location)
+        for blocker in blockers:
+            if not blocker or not isinstance(blocker, dict):
+                continue
+            start_time = blocker.get("start_time")
+            if not start_time:
+                continue
+            self._start_times.append(start_time)
+            self._end_times.append(blocker.get("end_time"))
+            rows["duration_minutes"].append(int(blocker.get("duration_minutes", 0) or 0))
+            rows["category_code"].append(self.categories.code(blocker.get("category", "other")))
+            rows["operator_id"].append(operator_id)
+            rows["location_id"].append(location_id)
+        self._frozen = None
+
+    def columns(self) -> Dict[str, Any]:
+        """Column name -> int64 array (lists without NumPy); ValueError if a timestamp is malformed"""
+        if self._frozen is None:
+            self._frozen = self._freeze_numpy() if HAVE_NUMPY else self._freeze_python()
+        return self._frozen
+
+    def _freeze_numpy(self) -> Dict[str, Any]:
+        columns = {name: np.asarray(values, dtype=np.int64) for name, values in self._rows.items()}
+        starts = np.array(self._start_times, dtype="datetime64[s]")
+        ends = np.array([end or "NaT" for end in self._end_times], dtype="datetime64[s]")
+        columns["start_epoch"] = starts.astype(np.int64)
+        columns["end_epoch"] = np.where(np.isnat(ends), -1, ends.astype(np.int64))
+        columns["date_ordinal"] = starts.astype("datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+        return columns
+
+    def _freeze_python(self) -> Dict[str, Any]:
+        columns = dict(self._rows)
+        columns["start_epoch"] = [timestamp_epoch(start) for start in self._start_times]
+        columns["end_epoch"] = [timestamp_epoch(end) for end in self._end_times]
+        columns["date_ordinal"] = [date.fromisoformat(start[:10]).toordinal() for start in self._start_times]
+        return columns
+
+    def _combined_key(self, keys: Tuple[str, ...]) -> Any:
+        """The key columns folded into one mixed-radix int64 key (NumPy only)"""
+        columns = self.columns()
+        combined = np.zeros(len(self), dtype=np.int64)
+        for name in keys:
+            column = columns[name]
+            low = int(column.min())
+            combined = combined * (int(column.max()) - low + 1) + (column - low)
+        return combined
+
+    def group_by(self, *keys: str) -> List[Tuple[tuple, int, int]]:
+        """
+        (key values, blocker count, total minutes) for every distinct combination of
+        the key columns, in order of first appearance
+        """
+        if not len(self):
+            return []
+        columns = self.columns()
+
+        if not HAVE_NUMPY:
+            groups: Dict[tuple, List[int]] = {}
+            minutes = columns["duration_minutes"]
+            for row, key in enumerate(zip(*(columns[name] for name in keys))):
+                totals = groups.setdefault(key, [0, 0])
+                totals[0] += 1
+                totals[1] += minutes[row]
+            return [(key, count, total) for key, (count, total) in groups.items()]
+
+        _, first_rows, inverse = np.unique(self._combined_key(keys), return_index=True, return_inverse=True)
+        counts = np.bincount(inverse)
+        totals = np.bincount(inverse, weights=columns["duration_minutes"])
+
+        order = np.argsort(first_rows, kind="stable")
+        key_values = [columns[name][first_rows[order]].tolist() for name in keys]
+        return list(zip(zip(*key_values), counts[order].tolist(), totals[order].astype(np.int64).tolist()))
+
+    def group_durations(self, *keys: str) -> Dict[tuple, List[int]]:
+        """Key values -> the durations of every row in that group (inputs for quantile sketches)"""
+        if not len(self):
+            return {}
+        columns = self.columns()
+
+        if not HAVE_NUMPY:
+            groups: Dict[tuple, List[int]] = {}
+            minutes = columns["duration_minutes"]
+            for row, key in enumerate(zip(*(columns[name] for name in keys))):
+                groups.setdefault(key, []).append(minutes[row])
+            return groups
+
+        # Sort rows by group and cut the duration column at every change of key
+        combined = self._combined_key(keys)
+        order = np.argsort(combined, kind="stable")
+        splits = np.flatnonzero(np.diff(combined[order])) + 1
+        first_rows = order[np.concatenate(([0], splits))]
+        key_values = zip(*(columns[name][first_rows].tolist() for name in keys))
+        return {key: values.tolist()
+                for key, values in zip(key_values, np.split(columns["duration_minutes"][order], splits))}
+
+    def day_summaries(self) -> Dict[str, Dict[str, Any]]:
+        """Per start date: blocker count, minutes, per-category totals and durations (summarize_document's "days")"""
+        days: Dict[str, Dict[str, Any]] = {}
+        for (ordinal, category_code), count, minutes in self.group_by("date_ordinal", "category_code"):
+            day = days.setdefault(ordinal_date(ordinal), {"blocker_count": 0, "total_minutes": 0, "categories": {},
+                                                          "durations": {}, "tickets": []})
+            day["blocker_count"] += count
+            day["total_minutes"] += minutes
+            day["categories"][self.categories.values[category_code]] = {"count": count, "total_minutes": minutes}
+        for (ordinal, category_code), durations in self.group_durations("date_ordinal", "category_code").items():
+            days[ordinal_date(ordinal)]["durations"][self.categories.values[category_code]] = durations
+        return days
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+In-process catalog of the EOD data directories, including documents archived into monthly bundles
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from archive import archive_dir_mtime, archived_documents, member_path
+
+FILENAME_PATTERN = re.compile(r"^(?P<operator_location>.*)_eod_data_(?P<date>\d{4}-\d{2}-\d{2})\.json$")
+
+# Directory mtimes this close to "now" may still change within the same tick, so rescan next time
+MTIME_SETTLE_SECONDS = 2.0
+
+
+class CatalogEntry(NamedTuple):
+    path: str
+    filename: str
+    operator_location: str
+    operator: str
+    location: str
+    date: str
+
+
+def parse_filename(base_dir: str, filename: str) -> Optional[CatalogEntry]:
+    """Split '<operator>_<location>_eod_data_<date>.json' into its parts"""
+    if filename.startswith('.'):
+        return None
+    match = FILENAME_PATTERN.match(filename)
+    if not match:
+        return None
+
+    operator_location = filename.split('_eod_data_')[0]
+    operator_parts = operator_location.split('_')
+    operator = operator_parts[0] if operator_parts else "unknown"
+    location = operator_parts[1] if len(operator_parts) > 1 else "unknown"
+    return CatalogEntry(
+        path=os.path.join(base_dir, filename),
+        filename=filename,
+        operator_location=operator_location,
+        operator=operator,
+        location=location,
+        date=match.group("date")
+    )
+
+
+class DataCatalog:
+    """
+    Filename index of one data directory, rescanned only when the directory (or its archive
+    directory) mtime changes. An archived document's entry has the bundle member path;
+    a loose file of the same name wins.
+    """
+
+    def __init__(self, base_dir: str) -> None:
+        self.base_dir = base_dir
+        self._mtimes: Optional[Tuple[Optional[int], Optional[int]]] = None
+        self._entries: List[CatalogEntry] = []
+        self._by_date: Dict[str, List[CatalogEntry]] = {}
+        self._by_operator: Dict[str, List[CatalogEntry]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Rescan the directory if it changed since the last scan"""
+        try:
+            dir_mtime_ns = os.stat(self.base_dir).st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime_ns = None
+        mtimes = (dir_mtime_ns, archive_dir_mtime(self.base_dir))
+
+        with self._lock:
+            if dir_mtime_ns is not None and mtimes == self._mtimes:
+                return
+            self._scan()
+            # A directory modified within the settle window may change again without a new mtime
+            newest = max(mtime for mtime in mtimes if mtime is not None) if dir_mtime_ns is not None else None
+            if newest is not None and time.time() - newest / 1e9 > MTIME_SETTLE_SECONDS:
+                self._mtimes = mtimes
+            else:
+                self._mtimes = None
+
+    def _scan(self) -> None:
+        entries = []
+        try:
+            with os.scandir(self.base_dir) as it:
+                for dir_entry in it:
+                    entry = parse_filename(self.base_dir, dir_entry.name)
+                    if entry and dir_entry.is_file():
+                        entries.append(entry)
+        except FileNotFoundError:
+            pass
+        loose = {entry.filename for entry in entries}
+        for bundle, filename in archived_documents(self.base_dir):
+            entry = parse_filename(self.base_dir, filename)
+            if entry and filename not in loose:
+                entries.append(entry._replace(path=member_path(bundle, filename)))
+        entries.sort(key=lambda e: e.filename)
+
+        by_date: Dict[str, List[CatalogEntry]] = {}
+        by_operator: Dict[str, List[CatalogEntry]] = {}
+        for entry in entries:
+            by_date.setdefault(entry.date, []).append(entry)
+            by_operator.setdefault(entry.operator_location, []).append(entry)
+
+        self._entries = entries
+        self._by_date = by_date
+        self._by_operator = by_operator
+
+    def entries(self) -> List[CatalogEntry]:
+        return list(self._entries)
+
+    def entries_for_date(self, date_str: str) -> List[CatalogEntry]:
+        return list(self._by_date.get(date_str, []))
+
+    def files_for_date(self, date_str: str) -> List[str]:
+        return [entry.path for entry in self._by_date.get(date_str, [])]
+
+    def entries_for_operator(self, operator_location: str) -> List[CatalogEntry]:
+        return list(self._by_operator.get(operator_location, []))
+
+    def files_for_operator(self, operator_location: str) -> List[str]:
+        return [entry.path for entry in self._by_operator.get(operator_location, [])]
+
+    def dates(self) -> List[str]:
+        return sorted(self._by_date)
+
+
+_catalogs: Dict[str, DataCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(base_dir: str) -> DataCatalog:
+    """Process-wide DataCatalog for a data directory, refreshed on every call"""
+    key = os.path.abspath(base_dir)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = DataCatalog(base_dir)
+        catalog = _catalogs[key]
+    catalog.refresh()
+    return catalog
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+On-disk formats of operator documents.
+
+v1: the in-memory shape, pretty-printed, timestamps as "%Y-%m-%d %H:%M:%S" strings.
+v2: {"format": 2, "categories": [...], "blockers": [[start, end, minutes, category, description, tickets, notes], ...]}
+    with integer epochs, categories interned by index, notes as [epoch, content],
+    tickets as [number, link] and no whitespace. Anything that would not round-trip
+    exactly (unknown keys, odd timestamps) is kept in its v1 form.
+
+Documents are always decoded to the v1 shape in memory.
+"""
+import calendar
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, IO, List
+
+FORMAT_VERSIONS = (1, 2)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+BLOCKER_KEYS = ("description", "category", "start_time", "end_time", "duration_minutes", "tickets", "notes")
+
+# Timestamps are naive local times; they are encoded as if they were UTC so epochs round-trip exactly
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_timestamp(timestamp: Any) -> Any:
+    """'YYYY-MM-DD HH:MM:SS' -> epoch seconds; anything else is returned unchanged"""
+    if not isinstance(timestamp, str) or len(timestamp) != 19:
+        return timestamp
+    try:
+        dt = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return timestamp
+    if dt.tzinfo is not None or dt.strftime(TIMESTAMP_FORMAT) != timestamp:
+        return timestamp
+    return calendar.timegm(dt.timetuple())
+
+
+def epoch_date(epoch: int) -> str:
+    return (_EPOCH + timedelta(days=epoch // 86400)).strftime("%Y-%m-%d")
+
+
+def decode_timestamp(value: Any) -> Any:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return (_EPOCH + timedelta(seconds=value)).strftime(TIMESTAMP_FORMAT)
+    return value
+
+
+def _encode_note(note: Any) -> Any:
+    if isinstance(note, dict) and set(note) == {"content", "timestamp"}:
+        timestamp = encode_timestamp(note["timestamp"])
+        if isinstance(timestamp, int):
+            return [timestamp, note["content"]]
+    return note
+
+
+def _decode_note(note: Any) -> Any:
+    if isinstance(note, list):
+        return {"content": note[1], "timestamp": decode_timestamp(note[0])}
+    return note
+
+
+def _encode_ticket(ticket: Any) -> Any:
+    if isinstance(ticket, dict) and set(ticket) == {"number", "link"}:
+        return [ticket["number"], ticket["link"]]
+    return ticket
+
+
+def _decode_ticket(ticket: Any) -> Any:
+    if isinstance(ticket, list):
+        return {"number": ticket[0], "link": ticket[1]}
+    return ticket
+
+
+def _encode_blocker(blocker: Any, category_index: Dict[str, int], categories: List[str]) -> Any:
+    if not isinstance(blocker, dict) or set(blocker) != set(BLOCKER_KEYS):
+        return blocker
+    start, end = encode_timestamp(blocker["start_time"]), encode_timestamp(blocker["end_time"])
+    category = blocker["category"]
+    if (not isinstance(start, int) or not isinstance(end, int) or not isinstance(category, str)
+            or not isinstance(blocker["tickets"], list) or not isinstance(blocker["notes"], list)):
+        return blocker
+
+    if category not in category_index:
+        category_index[category] = len(categories)
+        categories.append(category)
+    return [start, end, blocker["duration_minutes"], category_index[category], blocker["description"],
+            [_encode_ticket(ticket) for ticket in blocker["tickets"]],
+            [_encode_note(note) for note in blocker["notes"]]]
+
+
+def _decode_blocker(blocker: Any, categories: List[str]) -> Any:
+    if not isinstance(blocker, list):
+        return blocker
+    start, end, minutes, category, description, tickets, notes = blocker
+    return {
+        "description": description,
+        "category": categories[category],
+        "start_time": decode_timestamp(start),
+        "end_time": decode_timestamp(end),
+        "duration_minutes": minutes,
+        "tickets": [_decode_ticket(ticket) for ticket in tickets],
+        "notes": [_decode_note(note) for note in notes]
+    }
+
+
+def encode_document(data: Dict[str, Any]) -> Dict[str, Any]:
+    """v1 document -> v2 document"""
+    categories: List[str] = []
+    category_index: Dict[str, int] = {}
+    blockers = data.get("blockers", [])
+    encoded = dict(data)
+    encoded["format"] = 2
+    encoded["categories"] = categories
+    if isinstance(blockers, list):
+        encoded["blockers"] = [_encode_blocker(blocker, category_index, categories) for blocker in blockers]
+    if "last_updated" in data:
+        encoded["last_updated"] = encode_timestamp(data["last_updated"])
+    return encoded
+
+
+def decode_document(data: Dict[str, Any]) -> Dict[str, Any]:
+    """v1 or v2 document -> v1 document"""
+    if not isinstance(data, dict) or data.get("format") != 2:
+        return data
+    categories = data.get("categories", [])
+    decoded = {key: value for key, value in data.items() if key not in ("format", "categories")}
+    decoded["blockers"] = [_decode_blocker(blocker, categories) for blocker in data.get("blockers", [])]
+    if "last_updated" in data:
+        decoded["last_updated"] = decode_timestamp(data["last_updated"])
+    return decoded
+
+
+def format_version(data: Any) -> int:
+    return 2 if isinstance(data, dict) and data.get("format") == 2 else 1
+
+
+def dump_document(data: Dict[str, Any], f: IO[str], version: int = 1) -> None:
+    if version == 2:
+        json.dump(encode_document(data), f, separators=(",", ":"))
+    else:
+        json.dump(data, f, indent=2)
+
+
+def load_document(f: IO[str]) -> Dict[str, Any]:
+    return decode_document(json.load(f))
+
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Streaming export of completed blockers as CSV or NDJSON
+"""
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, Dict, Iterator, Optional
+
+from analytics import date_range_strings
+from archive import BundleError, open_document
+from data_catalog import get_catalog
+from doc_format import load_document
+from sqlite_store import get_sqlite_store
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_FIELDS = ("date", "operator", "location", "category", "description", "start_time", "end_time",
+                 "duration_minutes", "tickets", "notes")
+
+# Rows are written out in chunks of about this many characters
+CHUNK_SIZE = 64 * 1024
+
+
+def normalize_filter(value: Optional[str]) -> Optional[str]:
+    """'Alice Smith' -> 'alice-smith', the spelling used in data filenames"""
+    if not value:
+        return None
+    return value.strip().lower().replace(' ', '-').replace('/', '-')
+
+
+def _row(date_str: str, operator: str, location: str, blocker: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "date": date_str,
+        "operator": operator,
+        "location": location,
+        "category": blocker.get("category", "other"),
+        "description": blocker.get("description", ""),
+        "start_time": blocker.get("start_time"),
+        "end_time": blocker.get("end_time"),
+        "duration_minutes": blocker.get("duration_minutes", 0),
+        "tickets": blocker.get("tickets", []),
+        "notes": blocker.get("notes", [])
+    }
+
+
+def iter_blockers(base_dir: str, start_date: date, end_date: date,
+                  operator: Optional[str] = None, location: Optional[str] = None,
+                  category: Optional[str] = None, backend: str = "json") -> Iterator[Dict[str, Any]]:
+    """
+    Completed blockers of every document dated start_date..end_date, one file at a
+    time. Operator and location filters are applied to filenames before opening anything.
+    """
+    operator, location, category = normalize_filter(operator), normalize_filter(location), normalize_filter(category)
+
+    if backend == "sqlite":
+        store = get_sqlite_store(base_dir)
+        for date_str, row_operator, row_location, blocker in store.iter_blockers(
+                start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"), operator, location, category):
+            yield _row(date_str, row_operator, row_location, blocker)
+        return
+
+    catalog = get_catalog(base_dir)
+    for date_str in date_range_strings(start_date, end_date):
+        for entry in catalog.entries_for_date(date_str):
+            if operator and entry.operator.lower() != operator:
+                continue
+            if location and entry.location.lower() != location:
+                continue
+            # End events rewrite the snapshot, so completed blockers never live only in the journal
+            try:
+                with open_document(entry.path) as f:
+                    data = load_document(f)
+            except (json.JSONDecodeError, BundleError, FileNotFoundError):
+                continue
+
+            blockers = data.get("blockers", [])
+            for blocker in blockers if isinstance(blockers, list) else []:
+                if not blocker or not isinstance(blocker, dict):
+                    continue
+                if category and str(blocker.get("category", "other")).lower() != category:
+                    continue
+                yield _row(date_str, entry.operator, entry.location, blocker)
+
+
+def _ticket_text(ticket: Any) -> str:
+    return ticket.get("number", "") if isinstance(ticket, dict) else str(ticket)
+
+
+def _note_text(note: Any) -> str:
+    return note.get("content", "") if isinstance(note, dict) else str(note)
+
+
+def stream_csv(rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Header plus one line per row; tickets and notes are flattened to '; ' separated text"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    # The header goes out before the first file is read
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        values = dict(row)
+        values["tickets"] = "; ".join(_ticket_text(ticket) for ticket in row["tickets"])
+        values["notes"] = "; ".join(_note_text(note) for note in row["notes"])
+        writer.writerow([values[field] for field in EXPORT_FIELDS])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """One JSON object per line, tickets and notes kept as lists"""
+    chunk = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+            size = 0
+    yield "".join(chunk)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Federated manager view across several EOD Generator instances (one per site).
+
+Every instance serves the partial aggregates of a date range at /api/federation/partial:
+its day rollups (for the per-day series, without sketches) and the rollups covering the
+range (months, weeks and edge days, with sketches). Partials from different sites merge
+exactly: days add up date by date and covering rollups are simply concatenated, since
+aggregate_rollups() sums whatever rollups cover the range.
+
+A coordinator fetches the partials of its configured peers concurrently, each within a
+timeout, and falls back to a peer's last good partial for the range when it does not answer.
+"""
+import gzip
+import http.client
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from analytics import (aggregate_rollups, date_range_strings, get_day_rollups, get_period_rollups,
+                       lookback_start)
+from metrics import timer
+from parallel_loader import DEFAULT_MODE
+from rollups import ROLLUP_VERSION
+
+# Bump when the partial layout changes; a coordinator rejects partials of another version
+PARTIAL_VERSION = 1
+
+# Day rollup fields the per-day series need (sketches travel only with the covering rollups)
+DAY_FIELDS = ("date", "files", "blocker_count", "total_minutes", "session_info", "categories", "operators")
+
+# Last good partials kept per coordinator, one per (peer, range)
+LAST_GOOD_ENTRIES = 64
+
+
+def build_partial(base_dir: str, start_date: date, end_date: date,
+                  loader_mode: str = DEFAULT_MODE,
+                  loader_workers: Optional[int] = None,
+                  backend: str = "json") -> Dict[str, Any]:
+    """This instance's partial aggregates for the inclusive range start_date..end_date"""
+    rollups = get_day_rollups(base_dir, lookback_start(start_date, end_date), end_date,
+                              loader_mode, loader_workers, backend)
+    periods = get_period_rollups(base_dir, start_date, end_date, backend)
+    if periods is None:
+        periods = [rollups[date_str] for date_str in date_range_strings(start_date, end_date)]
+    return {
+        "version": PARTIAL_VERSION,
+        "rollup_version": ROLLUP_VERSION,
+        "start": start_date.strftime("%Y-%m-%d"),
+        "end": end_date.strftime("%Y-%m-%d"),
+        "days": {date_str: {field: rollup[field] for field in DAY_FIELDS} for date_str, rollup in rollups.items()},
+        "segments": periods
+    }
+
+
+def check_partial(partial: Any, start_date: date, end_date: date) -> Dict[str, Any]:
+    """The partial if it is usable for the range; ValueError otherwise"""
+    if not isinstance(partial, dict) or partial.get("version") != PARTIAL_VERSION:
+        raise ValueError("unsupported partial version")
+    if partial.get("rollup_version") != ROLLUP_VERSION:
+        raise ValueError("peer runs a different rollup version")
+    if (partial.get("start"), partial.get("end")) != (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")):
+        raise ValueError("partial is for another date range")
+    if not isinstance(partial.get("days"), dict) or not isinstance(partial.get("segments"), list):
+        raise ValueError("malformed partial")
+    return partial
+
+
+def _add_day(target: Dict[str, Any], day: Dict[str, Any]) -> None:
+    target["files"] += day["files"]
+    target["blocker_count"] += day["blocker_count"]
+    target["total_minutes"] += day["total_minutes"]
+    if target["session_info"] is None and day["session_info"]:
+        target["session_info"] = day["session_info"]
+    for category, stats in day["categories"].items():
+        totals = target["categories"].setdefault(category, {"count": 0, "total_minutes": 0})
+        totals["count"] += stats["count"]
+        totals["total_minutes"] += stats["total_minutes"]
+    for operator_location, operator in day["operators"].items():
+        merged = target["operators"].get(operator_location)
+        if merged is None:
+            target["operators"][operator_location] = dict(operator, categories=dict(operator["categories"]))
+            continue
+        merged["blockers_count"] += operator["blockers_count"]
+        merged["total_minutes"] += operator["total_minutes"]
+        for category, count in operator["categories"].items():
+            merged["categories"][category] = merged["categories"].get(category, 0) + count
+
+
+def merge_partials(partials: List[Dict[str, Any]], start_date: date,
+                   end_date: date) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """(day rollups, covering rollups) of all partials together, ready for aggregate_rollups()"""
+    days = {
+        date_str: {"date": date_str, "files": 0, "blocker_count": 0, "total_minutes": 0,
+                   "session_info": None, "categories": {}, "operators": {}}
+        for date_str in date_range_strings(lookback_start(start_date, end_date), end_date)
+    }
+    segments: List[Dict[str, Any]] = []
+    for partial in partials:
+        for date_str, day in partial["days"].items():
+            if date_str in days:
+                _add_day(days[date_str], day)
+        segments.extend(partial["segments"])
+    return days, segments
+
+
+def peer_name(peer: str) -> str:
+    """host:port of a peer URL, for status displays"""
+    return urllib.parse.urlsplit(peer).netloc or peer
+
+
+class FederationCoordinator:
+    """Fans out partial requests to a fixed list of peers and keeps their last good answers"""
+
+    def __init__(self, peers: List[str], timeout: float) -> None:
+        self.peers = [peer.rstrip("/") for peer in peers]
+        self.timeout = timeout
+        # (peer, start, end) -> (etag, partial, fetched_at)
+        self._last_good: "OrderedDict[Tuple[str, str, str], Tuple[Optional[str], Dict[str, Any], datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Room for a second round of requests while a stuck one is still running into its timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(2 * len(self.peers), 1), thread_name_prefix="federation")
+
+    def _remember(self, key: Tuple[str, str, str], etag: Optional[str], partial: Dict[str, Any]) -> None:
+        with self._lock:
+            self._last_good[key] = (etag, partial, datetime.now())
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > LAST_GOOD_ENTRIES:
+                self._last_good.popitem(last=False)
+
+    def _cached(self, key: Tuple[str, str, str]):
+        with self._lock:
+            return self._last_good.get(key)
+
+    def _fetch(self, peer: str, start_date: date, end_date: date) -> Dict[str, Any]:
+        """One peer's partial; revalidated with its ETag, so an unchanged range costs a 304"""
+        key = (peer, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+        query = urllib.parse.urlencode({"start": key[1], "end": key[2]})
+        request = urllib.request.Request(f"{peer}/api/federation/partial?{query}",
+                                         headers={"Accept": "application/json", "Accept-Encoding": "gzip"})
+        cached = self._cached(key)
+        if cached is not None and cached[0]:
+            request.add_header("If-None-Match", cached[0])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                if response.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                etag = response.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached is not None:
+                self._remember(key, cached[0], cached[1])
+                return cached[1]
+            raise
+        partial = check_partial(json.loads(body), start_date, end_date)
+        self._remember(key, etag, partial)
+        return partial
+
+    def collect(self, start_date: date, end_date: date) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        (partials, peer statuses) for the range. Peers are asked concurrently; one that fails
+        or does not answer within the timeout contributes its last good partial if there is one.
+        """
+        started = time.monotonic()
+        futures = [(peer, self._executor.submit(self._fetch, peer, start_date, end_date)) for peer in self.peers]
+        deadline = started + self.timeout
+        partials = []
+        statuses = []
+        for peer, future in futures:
+            status = {"peer": peer, "name": peer_name(peer), "status": "ok", "error": None, "fetched_at": None}
+            try:
+                partials.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+                status["fetched_at"] = datetime.now()
+            except FutureTimeout:
+                status["error"] = f"no answer within {self.timeout:g}s"
+            except (urllib.error.URLError, http.client.HTTPException, OSError, EOFError, ValueError) as e:
+                # HTTPException: a dropped connection (IncompleteRead, BadStatusLine); EOFError: truncated gzip
+                status["error"] = str(getattr(e, "reason", e))
+            if status["error"] is not None:
+                cached = self._cached((peer, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")))
+                if cached is not None:
+                    partials.append(cached[1])
+                    status.update(status="cached", fetched_at=cached[2])
+                else:
+                    status["status"] = "unavailable"
+            statuses.append(status)
+        return partials, statuses
+
+
+def build_federated_analytics(coordinator: FederationCoordinator, start_date: date, end_date: date,
+                              local_partial: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Manager analytics over every peer (and this instance when local_partial is given), plus a "federation" status list"""
+    with timer("federation.fetch"):
+        partials, statuses = coordinator.collect(start_date, end_date)
+    if local_partial is not None:
+        partials.insert(0, local_partial)
+        statuses.insert(0, {"peer": None, "name": "local", "status": "ok", "error": None, "fetched_at": datetime.now()})
+    with timer("federation.merge"):
+        days, segments = merge_partials(partials, start_date, end_date)
+        analytics = aggregate_rollups(days, start_date, end_date, segments)
+    analytics["federation"] = statuses
+    return analytics
+
+
+_coordinators: Dict[Tuple[Tuple[str, ...], float], FederationCoordinator] = {}
+_coordinators_lock = threading.Lock()
+
+
+def get_coordinator(peers: List[str], timeout: float) -> FederationCoordinator:
+    """Process-wide FederationCoordinator for a peer list, so last good partials survive between requests"""
+    key = (tuple(peers), timeout)
+    with _coordinators_lock:
+        if key not in _coordinators:
+            _coordinators[key] = FederationCoordinator(list(peers), timeout)
+        return _coordinators[key]
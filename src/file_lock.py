@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Advisory locking of operator data files across processes (e.g. gunicorn workers)
+
+Each locked file gets a hidden ".<name>.lock" sibling in its data directory. These are
+expected there and stay after the lock is released; remove_lock_file() deletes one together
+with the file it guards, and a lock taken on a lock file that was deleted meanwhile is retried.
+"""
+import os
+import threading
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only serialize threads of the same process
+    fcntl = None
+
+def lock_path(filename: str) -> str:
+    """Hidden sibling lock file; the data file itself is replaced on every snapshot write"""
+    directory, basename = os.path.split(filename)
+    return os.path.join(directory, f".{basename}.lock")
+
+
+def remove_lock_file(filename: str) -> None:
+    """Delete a file's lock sibling; call it holding FileLock(filename), right after removing the file"""
+    try:
+        os.remove(lock_path(os.path.abspath(filename)))
+    except FileNotFoundError:
+        pass
+
+
+def _same_file(fd: int, path: str) -> bool:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(fd)
+    return (stat.st_dev, stat.st_ino) == (opened.st_dev, opened.st_ino)
+
+
+class _LockState:
+    def __init__(self) -> None:
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+        # Threads holding or waiting for this lock; the state is dropped when it reaches 0
+        self.users = 0
+
+
+_states: Dict[str, _LockState] = {}
+_states_lock = threading.Lock()
+
+
+def _acquire_state(key: str) -> _LockState:
+    with _states_lock:
+        state = _states.get(key)
+        if state is None:
+            state = _states[key] = _LockState()
+        state.users += 1
+        return state
+
+
+def _release_state(key: str, state: _LockState) -> None:
+    with _states_lock:
+        state.users -= 1
+        if state.users == 0:
+            del _states[key]
+
+
+class FileLock:
+    """
+    Exclusive lock on a data file, held for a whole read-modify-write.
+    Re-entrant within a thread; other threads and other processes block until release.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.path = lock_path(os.path.abspath(filename))
+
+    def __enter__(self) -> "FileLock":
+        state = _acquire_state(self.path)
+        state.rlock.acquire()
+        try:
+            while state.depth == 0:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                state.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is None:
+                    break
+                fcntl.flock(state.fd, fcntl.LOCK_EX)
+                # The holder we waited for may have removed the lock file; lock the new one instead
+                if _same_file(state.fd, self.path):
+                    break
+                os.close(state.fd)
+                state.fd = None
+            state.depth += 1
+        except BaseException:
+            if state.depth == 0 and state.fd is not None:
+                os.close(state.fd)
+                state.fd = None
+            state.rlock.release()
+            _release_state(self.path, state)
+            raise
+        # Any thread entering this path meanwhile gets the same state object, since this one is still a user
+        self._state = state
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        state = self._state
+        state.depth -= 1
+        if state.depth == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(state.fd, fcntl.LOCK_UN)
+            finally:
+                os.close(state.fd)
+                state.fd = None
+        state.rlock.release()
+        _release_state(self.path, state)
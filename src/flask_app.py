@@ -6,14 +6,26 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, Response, g, render_template, request, jsonify, redirect, url_for, flash, session, stream_with_context
+import gzip
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
 
 # Import configuration and core classes
 from config.app_config import get_config
-from app import JsonHandler, EODTracker
+from app import JsonHandler, EODTracker, DOCUMENT_CACHE, WRITE_POLICY, document_path, open_storage, storage_version
+from page_cache import PAGE_CACHE, fill_live, live_placeholders
+from active_blockers import get_active_registry, seed_active_blockers
+from storage import STORAGE_CONFIG
+from analytics import analytics_etag, build_manager_analytics, to_json_safe
+from federation import build_federated_analytics, build_partial, get_coordinator
+from export import EXPORT_FORMATS, iter_blockers, stream_csv, stream_ndjson
+from journal import blockers_on
+from live_feed import get_live_feed
+from metrics import METRICS, REQUEST_SECONDS, timer
+from warmup import install_bytecode_cache
 
 # Initialize Flask app with configuration
 config_class = get_config()
@@ -21,6 +33,29 @@ app = Flask(__name__,
            template_folder=str(Path(__file__).parent.parent / 'templates'),
            static_folder=str(Path(__file__).parent.parent / 'static'))
 app.config.from_object(config_class)
+DOCUMENT_CACHE.max_entries = app.config['DOCUMENT_CACHE_SIZE']
+PAGE_CACHE.max_entries = app.config['PAGE_CACHE_SIZE']
+WRITE_POLICY.configure(durability=app.config['WRITE_DURABILITY'],
+                       sync_interval=app.config['WRITE_SYNC_INTERVAL'],
+                       journal_compact_bytes=app.config['JOURNAL_COMPACT_BYTES'],
+                       format_version=app.config['DATA_FORMAT_VERSION'])
+STORAGE_CONFIG.configure(backend=app.config['STORAGE_BACKEND'])
+METRICS.configure(enabled=app.config['METRICS_ENABLED'])
+install_bytecode_cache(app, app.config['TEMPLATE_CACHE_DIR'])
+
+@app.before_request
+def start_request_timer():
+    """Start the clock for eod_request_duration_seconds"""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    """Time until the response is handed to the server (streamed bodies are still being sent)"""
+    started = g.pop('request_started', None)
+    if started is not None and METRICS.enabled:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, request.endpoint or 'unmatched',
+                                request.method, str(response.status_code))
+    return response
 
 def get_tracker():
     """Get or create an EODTracker instance for this session"""
@@ -54,6 +89,34 @@ def check_session_required():
     
     return None
 
+def get_cached_page():
+    """
+    Cache key, version and cached (html, live state) of this operator page. The version covers
+    the document, the day, test mode and pending flash messages; it is None while uncacheable.
+    """
+    test_mode = session.get('test_mode', False)
+    filename = document_path(test_mode, session.get('session_info'))
+    document_version = storage_version(app.config['STORAGE_BACKEND'], filename)
+    key = (request.endpoint, filename)
+    if document_version is None:
+        return key, None, None
+    
+    flashes = tuple(tuple(message) for message in session.get('_flashes', []))
+    version = (document_version, datetime.now().strftime("%Y-%m-%d"), test_mode, flashes)
+    cached = PAGE_CACHE.get(key, version)
+    if cached is not None:
+        # The cached html already shows these messages; consume them as rendering would have
+        session.pop('_flashes', None)
+    return key, version, cached
+
+def dashboard_live_values(state):
+    """The only parts of the dashboard that change without a write: the running blocker's duration"""
+    current_duration = 0
+    if state["current_start"]:
+        current_duration = int((datetime.now() - datetime.fromisoformat(state["current_start"])).total_seconds() / 60)
+    total_minutes = state["completed_minutes"] + current_duration
+    return {"current_duration": current_duration, "total_time": f"{total_minutes // 60}h {total_minutes % 60}m"}
+
 @app.route('/')
 def dashboard():
     """Main dashboard showing current status and today's summary"""
@@ -62,34 +125,36 @@ def dashboard():
     if session_check:
         return session_check
     
+    key, version, cached = get_cached_page()
+    if cached is not None:
+        html, state = cached
+        return fill_live(html, dashboard_live_values(state))
+    
     tracker = get_tracker()
     
     # Get today's data
     today = datetime.now().strftime("%Y-%m-%d")
-    today_blockers = [b for b in tracker.js_handler.data["blockers"] if b["start_time"].startswith(today)]
+    today_blockers = blockers_on(tracker.js_handler.data["blockers"], today)
 
     
     current_blocker = tracker.js_handler.data.get("current_blocker")
     session_info = tracker.js_handler.data.get("session_info")
     
-    # Calculate current blocker duration if active
-    current_duration = 0
-    if current_blocker:
-        start_dt = tracker.parse_timestamp(current_blocker["start_time"])
-        current_duration = int((datetime.now() - start_dt).total_seconds() / 60)
-    
-    # Calculate total time
-    total_minutes = sum(b["duration_minutes"] for b in today_blockers)
-    if current_blocker:
-        total_minutes += current_duration
+    # Current blocker duration and total time are filled in per request
+    state = {
+        "current_start": current_blocker["start_time"] if current_blocker else None,
+        "completed_minutes": sum(b["duration_minutes"] for b in today_blockers)
+    }
     
-    return render_template('dashboard.html', 
+    html = render_template('dashboard.html', 
                          current_blocker=current_blocker,
-                         current_duration=current_duration,
+                         live=live_placeholders("current_duration", "total_time"),
                          today_blockers=today_blockers,
                          session_info=session_info,
-                         total_minutes=total_minutes,
                          today=today)
+    if version is not None:
+        PAGE_CACHE.put(key, version, html, state)
+    return fill_live(html, dashboard_live_values(state))
 
 @app.route('/session', methods=['GET', 'POST'])
 def session_setup():
@@ -117,8 +182,7 @@ def session_setup():
         
         # Create tracker with session info and save
         tracker = EODTracker(test_mode=session['test_mode'], session_info=session_info)
-        tracker.js_handler.data["session_info"] = session_info
-        tracker.js_handler.save_data()
+        tracker.record_session_info(session_info)
         
         flash('Session information saved successfully!', 'success')
         return redirect(url_for('dashboard'))
@@ -188,13 +252,10 @@ def add_ticket():
         flash('Ticket number cannot be empty.', 'error')
         return redirect(url_for('dashboard'))
     
-    current = tracker.js_handler.data["current_blocker"]
-    if "tickets" not in current:
-        current["tickets"] = []
-    
-    ticket_obj = {"number": ticket_number, "link": f"LINK: {ticket_link}" if ticket_link else ""}
-    current["tickets"].append(ticket_obj)
-    tracker.js_handler.save_data()
+    if tracker.record_ticket(ticket_number, f"LINK: {ticket_link}" if ticket_link else "") is None:
+        # Ended by another worker since this request loaded the file
+        flash('No active blocker. Start a blocker first.', 'error')
+        return redirect(url_for('dashboard'))
     
     flash(f'Ticket {ticket_number} added to current blocker!', 'success')
     return redirect(url_for('dashboard'))
@@ -213,16 +274,10 @@ def add_note():
         flash('Note cannot be empty.', 'error')
         return redirect(url_for('dashboard'))
     
-    if "notes" not in tracker.js_handler.data["current_blocker"]:
-        tracker.js_handler.data["current_blocker"]["notes"] = []
-    
-    note = {
-        "content": note_content,
-        "timestamp": tracker.format_timestamp()
-    }
-    
-    tracker.js_handler.data["current_blocker"]["notes"].append(note)
-    tracker.js_handler.save_data()
+    if tracker.record_note(note_content) is None:
+        # Ended by another worker since this request loaded the file
+        flash('No active blocker. Start a blocker first.', 'error')
+        return redirect(url_for('dashboard'))
     
     flash('Note added to current blocker!', 'success')
     return redirect(url_for('dashboard'))
@@ -235,6 +290,10 @@ def eod_report():
     if session_check:
         return session_check
     
+    key, version, cached = get_cached_page()
+    if cached is not None:
+        return cached[0]
+    
     tracker = get_tracker()
     
     today = datetime.now().strftime("%Y-%m-%d")
@@ -243,11 +302,7 @@ def eod_report():
     if not isinstance(blockers_data, list):
         blockers_data = []
     
-    today_blockers = []
-    for b in blockers_data:
-        if b and isinstance(b, dict) and b.get("start_time"):
-            if b["start_time"].startswith(today):
-                today_blockers.append(b)
+    today_blockers = blockers_on(blockers_data, today)
     
     session_info = tracker.js_handler.data.get("session_info")
     current_blocker = tracker.js_handler.data.get("current_blocker")
@@ -263,13 +318,16 @@ def eod_report():
         category_stats[category]["count"] += 1
         category_stats[category]["total_minutes"] += blocker.get("duration_minutes", 0)
     
-    return render_template('eod_report.html',
+    html = render_template('eod_report.html',
                          today_blockers=today_blockers,
                          session_info=session_info,
                          current_blocker=current_blocker,
                          total_minutes=total_minutes,
                          today=today,
                          category_stats=category_stats)
+    if version is not None:
+        PAGE_CACHE.put(key, version, html, {})
+    return html
 
 @app.route('/clear_data', methods=['POST'])
 def clear_data():
@@ -278,262 +336,297 @@ def clear_data():
     confirm = request.form.get('confirm', '').strip()
     
     if confirm == "YES":
-        tracker.js_handler.data = tracker.js_handler.get_default_data()
-        tracker.js_handler.save_data()
+        tracker.reset_data()
         flash('All data cleared successfully.', 'success')
     else:
         flash('Clear operation cancelled.', 'info')
     
     return redirect(url_for('dashboard'))
 
+def parse_manager_date_range(args):
+    """Inclusive date range from ?start=&end= (YYYY-MM-DD), defaulting to the last 7 days"""
+    from datetime import date
+    
+    try:
+        end_date = datetime.strptime(args['end'], "%Y-%m-%d").date() if args.get('end') else date.today()
+        start_date = datetime.strptime(args['start'], "%Y-%m-%d").date() if args.get('start') else end_date - timedelta(days=7)
+    except ValueError:
+        raise ValueError('Invalid date range. Use YYYY-MM-DD dates.')
+    
+    if start_date > end_date:
+        raise ValueError('Start date must be on or before end date.')
+    
+    if (end_date - start_date).days + 1 > app.config['MANAGER_MAX_RANGE_DAYS']:
+        raise ValueError(f"Date range is limited to {app.config['MANAGER_MAX_RANGE_DAYS']} days.")
+    
+    return start_date, end_date
+
+def get_manager_date_range():
+    """Requested manager date range, falling back to the last 7 days with a flash message"""
+    try:
+        return parse_manager_date_range(request.args)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return parse_manager_date_range({})
+
+def get_manager_base_dir():
+    """Data directory the manager views read from"""
+    return "data/test" if session.get('test_mode', False) else "data/production"
+
+def get_manager_range_presets():
+    """Quick links for the manager date range picker"""
+    from datetime import date
+    
+    today = date.today()
+    return [
+        {"label": "7 days", "start": today - timedelta(days=7), "end": today},
+        {"label": "30 days", "start": today - timedelta(days=30), "end": today},
+        {"label": "Quarter", "start": today - timedelta(days=90), "end": today},
+        {"label": "Year to date", "start": today.replace(month=1, day=1), "end": today}
+    ]
+
+def is_coordinator():
+    """Whether the manager views merge the partials of other instances (EOD_FEDERATION_PEERS)"""
+    return bool(app.config['FEDERATION_PEERS'])
+
+def get_manager_analytics(base_dir, start_date, end_date):
+    """Analytics of this instance, or of every peer merged when running as a coordinator"""
+    if not is_coordinator():
+        return build_manager_analytics(base_dir, start_date, end_date,
+                                       loader_mode=app.config['ANALYTICS_LOADER_MODE'],
+                                       loader_workers=app.config['ANALYTICS_LOADER_WORKERS'],
+                                       backend=app.config['STORAGE_BACKEND'])
+    
+    local_partial = None
+    if app.config['FEDERATION_INCLUDE_LOCAL']:
+        local_partial = build_partial(base_dir, start_date, end_date,
+                                      loader_mode=app.config['ANALYTICS_LOADER_MODE'],
+                                      loader_workers=app.config['ANALYTICS_LOADER_WORKERS'],
+                                      backend=app.config['STORAGE_BACKEND'])
+    coordinator = get_coordinator(app.config['FEDERATION_PEERS'], app.config['FEDERATION_TIMEOUT'])
+    return build_federated_analytics(coordinator, start_date, end_date, local_partial)
+
 @app.route('/manager')
 def manager_dashboard():
     """Manager dashboard with analytics and performance metrics"""
-    import glob
-    from datetime import date, timedelta
-    
-    # Get data for the last 7 days
-    end_date = date.today()
-    start_date = end_date - timedelta(days=7)
+    start_date, end_date = get_manager_date_range()
     
     # Determine base directory for file search
-    base_dir = "data/test" if session.get('test_mode', False) else "data/production"
-    
-    # Collect all blockers from the last week
-    all_blockers = []
-    daily_stats = {}
-    
-    for i in range(8):  # Include today
-        current_date = start_date + timedelta(days=i)
-        date_str = current_date.strftime("%Y-%m-%d")
-        
-        # Find all JSON files for this date using glob pattern
-        pattern = os.path.join(base_dir, f"*_eod_data_{date_str}.json")
-        matching_files = glob.glob(pattern)
-        
-        day_blockers = []
-        session_info_list = []
-        
-        # Load data from all matching files for this date
-        for file_path in matching_files:
-            try:
-                with open(file_path, 'r') as f:
-                    file_data = json.load(f)
-                    file_blockers = file_data.get("blockers", [])
-                    file_session = file_data.get("session_info")
-                    
-                    # Filter blockers for this specific date
-                    date_blockers = [b for b in file_blockers if b.get("start_time", "").startswith(date_str)]
-                    day_blockers.extend(date_blockers)
-                    
-                    if file_session:
-                        session_info_list.append(file_session)
-                        
-            except (json.JSONDecodeError, FileNotFoundError):
-                continue
-        
-        # Extend all blockers with today's findings
-        all_blockers.extend(day_blockers)
-        
-        # Use the first session info found, or None
-        session_info = session_info_list[0] if session_info_list else None
-        
-        # Calculate daily stats
-        total_minutes = sum(b.get("duration_minutes", 0) for b in day_blockers)
-        daily_stats[date_str] = {
-            "date": current_date,
-            "blocker_count": len(day_blockers),
-            "total_minutes": total_minutes,
-            "session_info": session_info,
-            "efficiency": max(0, min(100, ((480 - total_minutes) / 480) * 100)) if total_minutes <= 480 else 0,  # Assuming 8-hour shifts
-            "operators_count": len(matching_files)  # Number of operators active this day
-        }
+    base_dir = get_manager_base_dir()
+    
+    # Numbers come from per-day rollups; only days whose files changed are recomputed
+    with timer("manager.analytics"):
+        analytics = get_manager_analytics(base_dir, start_date, end_date)
+    
+    # Live updates and the open-blocker registry cover this instance only, so a coordinator leaves them out
+    federated = "federation" in analytics
+    with timer("manager.render"):
+        return render_template('manager_dashboard.html',
+                             range_presets=get_manager_range_presets(),
+                             active_count=None if federated else get_manager_active_registry().count(),
+                             live_date=None if federated else datetime.now().strftime("%Y-%m-%d"),
+                             **analytics)
+
+def get_manager_live_feed():
+    """The process-wide change detector for the data directory the manager is viewing"""
+    test_mode = session.get('test_mode', False)
+    backend = app.config['STORAGE_BACKEND']
+    base_dir = get_manager_base_dir()
+    return get_live_feed(base_dir, backend,
+                         load_document=lambda doc_key: open_storage(backend, test_mode, filename=doc_key).data,
+                         document_version=lambda doc_key: storage_version(backend, os.path.join(base_dir, doc_key)),
+                         interval=app.config['LIVE_FEED_INTERVAL'])
+
+@app.route('/manager/stream')
+def manager_stream():
+    """Server-Sent Events: blocker_started, blocker_ended and today's totals as they change"""
+    feed = get_manager_live_feed()
+    subscription = feed.subscribe()
+    keepalive = app.config['LIVE_FEED_KEEPALIVE']
+    
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                message = subscription.next(timeout=keepalive)
+                if message is not None:
+                    yield message
+                elif subscription.closed:
+                    # Dropped for falling behind; the browser reconnects and gets fresh totals
+                    return
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            feed.unsubscribe(subscription)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def get_manager_active_registry():
+    """Open-blocker registry of the data directory the manager is viewing, seeded if it has no file yet"""
+    base_dir = get_manager_base_dir()
+    registry = get_active_registry(base_dir)
+    if not registry.exists():
+        backend = app.config['STORAGE_BACKEND']
+        test_mode = session.get('test_mode', False)
+        seed_active_blockers(base_dir, backend,
+                             load_document=lambda doc_key: open_storage(backend, test_mode, filename=doc_key).data)
+    return registry
+
+@app.route('/manager/active')
+def manager_active():
+    """Everyone blocked right now, longest-running first (no operator documents are read)"""
+    now = datetime.now()
+    active = get_manager_active_registry().active(now)
+    return render_template('manager_active.html', active_blockers=active, now=now)
+
+@app.route('/api/manager/active')
+def api_manager_active():
+    """Open blockers with their running duration in minutes"""
+    now = datetime.now()
+    active = get_manager_active_registry().active(now)
+    response = jsonify({"as_of": now.strftime("%Y-%m-%d %H:%M:%S"), "count": len(active), "active_blockers": active})
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def manager_api_response(build_payload):
+    """
+    JSON response for a manager API endpoint. The ETag comes from the mtimes of the
+    underlying files, so an unchanged range is answered with 304 before any aggregation.
+    """
+    try:
+        start_date, end_date = parse_manager_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    base_dir = get_manager_base_dir()
+    if is_coordinator():
+        # Peers change independently, so there is no local validator; each answer lists the peers' status
+        analytics = get_manager_analytics(base_dir, start_date, end_date)
+        response = jsonify(to_json_safe(dict(build_payload(analytics), peers=analytics["federation"])))
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    etag = analytics_etag(base_dir, start_date, end_date, backend=app.config['STORAGE_BACKEND'])
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        analytics = get_manager_analytics(base_dir, start_date, end_date)
+        response = jsonify(to_json_safe(build_payload(analytics)))
     
-    # Category analytics
-    category_analytics = {}
-    operator_analytics = {}
-    operator_daily_performance = {}
-    
-    # Process all files again for detailed operator analytics
-    for i in range(8):  # Re-scan for detailed analytics
-        current_date = start_date + timedelta(days=i)
-        date_str = current_date.strftime("%Y-%m-%d")
-        pattern = os.path.join(base_dir, f"*_eod_data_{date_str}.json")
-        matching_files = glob.glob(pattern)
-        
-        for file_path in matching_files:
-            try:
-                with open(file_path, 'r') as f:
-                    file_data = json.load(f)
-                    file_blockers = file_data.get("blockers", [])
-                    file_session = file_data.get("session_info")
-                    
-                    # Extract operator info from filename
-                    filename = os.path.basename(file_path)
-                    operator_location = filename.split('_eod_data_')[0]
-                    operator_parts = operator_location.split('_')
-                    operator_name = operator_parts[0] if operator_parts else "unknown"
-                    location = operator_parts[1] if len(operator_parts) > 1 else "unknown"
-                    
-                    # Filter blockers for this specific date
-                    date_blockers = [b for b in file_blockers if b.get("start_time", "").startswith(date_str)]
-                    
-                    # Initialize operator analytics if not exists
-                    if operator_location not in operator_analytics:
-                        operator_analytics[operator_location] = {
-                            "operator_name": operator_name.replace('-', ' ').title(),
-                            "location": location.replace('-', ' ').title(),
-                            "total_blockers": 0,
-                            "total_minutes": 0,
-                            "avg_resolution_time": 0,
-                            "efficiency_score": 100,
-                            "categories": {},
-                            "active_days": 0,
-                            "daily_performance": []
-                        }
-                    
-                    # Initialize daily performance tracking
-                    if operator_location not in operator_daily_performance:
-                        operator_daily_performance[operator_location] = {}
-                    
-                    # Calculate daily metrics for this operator
-                    day_minutes = sum(b.get("duration_minutes", 0) for b in date_blockers)
-                    day_blockers_count = len(date_blockers)
-                    day_efficiency = max(0, min(100, ((480 - day_minutes) / 480) * 100)) if day_minutes <= 480 else 0
-                    
-                    # Store daily performance
-                    operator_daily_performance[operator_location][date_str] = {
-                        "date": current_date,
-                        "blockers_count": day_blockers_count,
-                        "total_minutes": day_minutes,
-                        "efficiency": round(day_efficiency, 1)
-                    }
-                    
-                    # Update operator totals
-                    if day_blockers_count > 0:
-                        operator_analytics[operator_location]["active_days"] += 1
-                    
-                    operator_analytics[operator_location]["total_blockers"] += day_blockers_count
-                    operator_analytics[operator_location]["total_minutes"] += day_minutes
-                    
-                    # Track categories for this operator
-                    for blocker in date_blockers:
-                        category = blocker.get("category", "other")
-                        if category not in operator_analytics[operator_location]["categories"]:
-                            operator_analytics[operator_location]["categories"][category] = 0
-                        operator_analytics[operator_location]["categories"][category] += 1
-                        
-            except (json.JSONDecodeError, FileNotFoundError):
-                continue
-    
-    # Calculate operator averages and efficiency scores
-    for operator_id, analytics in operator_analytics.items():
-        if analytics["total_blockers"] > 0:
-            analytics["avg_resolution_time"] = round(
-                analytics["total_minutes"] / analytics["total_blockers"], 1
-            )
-        
-        # Calculate overall efficiency (average of daily efficiencies)
-        daily_perfs = operator_daily_performance.get(operator_id, {})
-        if daily_perfs:
-            total_efficiency = sum(day["efficiency"] for day in daily_perfs.values())
-            analytics["efficiency_score"] = round(total_efficiency / len(daily_perfs), 1)
-            
-            # Add daily performance list for charts
-            analytics["daily_performance"] = [
-                daily_perfs.get(f"{(start_date + timedelta(days=j)).strftime('%Y-%m-%d')}", 
-                               {"date": start_date + timedelta(days=j), "blockers_count": 0, "total_minutes": 0, "efficiency": 100})
-                for j in range(8)
-            ]
-    
-    # Category analytics (existing logic)
-    for blocker in all_blockers:
-        category = blocker.get("category", "other")
-        if category not in category_analytics:
-            category_analytics[category] = {"count": 0, "total_minutes": 0, "avg_resolution_time": 0}
-        category_analytics[category]["count"] += 1
-        category_analytics[category]["total_minutes"] += blocker.get("duration_minutes", 0)
-    
-    # Calculate category averages
-    for category in category_analytics:
-        if category_analytics[category]["count"] > 0:
-            category_analytics[category]["avg_resolution_time"] = round(
-                category_analytics[category]["total_minutes"] / category_analytics[category]["count"], 1
-            )
-    
-    # Get unique operators and total files
-    unique_operators = set(operator_analytics.keys())
-    total_files_scanned = sum(len(glob.glob(os.path.join(base_dir, f"*_eod_data_{(start_date + timedelta(days=j)).strftime('%Y-%m-%d')}.json"))) for j in range(8))
-    
-    # Overall metrics
-    total_blockers = len(all_blockers)
-    total_downtime = sum(b.get("duration_minutes", 0) for b in all_blockers)
-    avg_resolution_time = round(total_downtime / total_blockers, 1) if total_blockers > 0 else 0
-    
-    # Most problematic categories
-    top_categories = sorted(category_analytics.items(), 
-                          key=lambda x: x[1]["total_minutes"], reverse=True)[:3]
-    
-    # Filter operators who worked today (or most recent day with data)
-    today_str = end_date.strftime("%Y-%m-%d")
-    active_today_operators = {}
-    
-    # Find operators who worked today, or if no one worked today, find the most recent day
-    for check_days in range(3):  # Check today and up to 2 days back
-        check_date = (end_date - timedelta(days=check_days)).strftime("%Y-%m-%d")
-        pattern = os.path.join(base_dir, f"*_eod_data_{check_date}.json")
-        matching_files = glob.glob(pattern)
-        
-        if matching_files:  # Found operators for this day
-            for file_path in matching_files:
-                filename = os.path.basename(file_path)
-                operator_location = filename.split('_eod_data_')[0]
-                if operator_location in operator_analytics:
-                    active_today_operators[operator_location] = operator_analytics[operator_location]
-            break  # Use this day's operators
-    
-    # If no active operators found, fall back to all operators
-    if not active_today_operators:
-        active_today_operators = operator_analytics
-    
-    # Sort active operators by efficiency score for better display
-    sorted_operators = sorted(active_today_operators.items(), key=lambda x: x[1]["efficiency_score"], reverse=True)
-    
-    # Performance trends - overall daily efficiency trend
-    daily_trend = []
-    for i in range(8):
-        date_str = (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        daily_data = daily_stats.get(date_str, {})
-        daily_trend.append({
-            "date": date_str,
-            "efficiency": daily_data.get("efficiency", 100),
-            "blockers": daily_data.get("blocker_count", 0),
-            "operators": daily_data.get("operators_count", 0)
-        })
-    
-    # Determine which day's operators we're showing
-    active_operators_date = end_date.strftime("%Y-%m-%d")
-    for check_days in range(3):
-        check_date = (end_date - timedelta(days=check_days)).strftime("%Y-%m-%d")
-        pattern = os.path.join(base_dir, f"*_eod_data_{check_date}.json")
-        if glob.glob(pattern):
-            active_operators_date = check_date
-            break
-    
-    return render_template('manager_dashboard.html',
-                         daily_stats=daily_stats,
-                         category_analytics=category_analytics,
-                         operator_analytics=dict(sorted_operators),
-                         daily_trend=daily_trend,
-                         total_blockers=total_blockers,
-                         total_downtime=total_downtime,
-                         avg_resolution_time=avg_resolution_time,
-                         top_categories=top_categories,
-                         date_range={"start": start_date, "end": end_date},
-                         unique_operators=list(unique_operators),
-                         total_files_scanned=total_files_scanned,
-                         active_operators_date=active_operators_date,
-                         showing_today_operators=active_operators_date == today_str)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/manager/summary')
+def api_manager_summary():
+    """Fleet totals and daily trend for the requested range"""
+    return manager_api_response(lambda analytics: {
+        "date_range": analytics["date_range"],
+        "total_blockers": analytics["total_blockers"],
+        "total_downtime": analytics["total_downtime"],
+        "avg_resolution_time": analytics["avg_resolution_time"],
+        "duration_percentiles": analytics["duration_percentiles"],
+        "distinct_operators_estimate": analytics["distinct_operators_estimate"],
+        "distinct_tickets_estimate": analytics["distinct_tickets_estimate"],
+        "total_files_scanned": analytics["total_files_scanned"],
+        "unique_operators": analytics["unique_operators"],
+        "daily_stats": analytics["daily_stats"],
+        "daily_trend": analytics["daily_trend"]
+    })
+
+@app.route('/api/manager/operators')
+def api_manager_operators():
+    """Per-operator analytics for the requested range"""
+    return manager_api_response(lambda analytics: {
+        "date_range": analytics["date_range"],
+        "active_operators_date": analytics["active_operators_date"],
+        "showing_today_operators": analytics["showing_today_operators"],
+        "operators": analytics["operator_analytics"]
+    })
+
+@app.route('/api/manager/categories')
+def api_manager_categories():
+    """Per-category analytics for the requested range"""
+    return manager_api_response(lambda analytics: {
+        "date_range": analytics["date_range"],
+        "categories": analytics["category_analytics"],
+        "top_categories": [category for category, _ in analytics["top_categories"]]
+    })
+
+@app.route('/api/manager/locations')
+def api_manager_locations():
+    """Blocker duration percentiles per location for the requested range"""
+    return manager_api_response(lambda analytics: {
+        "date_range": analytics["date_range"],
+        "locations": analytics["location_analytics"]
+    })
+
+@app.route('/api/federation/partial')
+def api_federation_partial():
+    """
+    This instance's partial aggregates for a coordinator: compact JSON, gzipped when accepted,
+    with the same file-based ETag as the manager API so an unchanged range is a 304
+    """
+    try:
+        start_date, end_date = parse_manager_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    base_dir = get_manager_base_dir()
+    backend = app.config['STORAGE_BACKEND']
+    etag = analytics_etag(base_dir, start_date, end_date, backend=backend)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        partial = build_partial(base_dir, start_date, end_date,
+                                loader_mode=app.config['ANALYTICS_LOADER_MODE'],
+                                loader_workers=app.config['ANALYTICS_LOADER_WORKERS'],
+                                backend=backend)
+        body = json.dumps(partial, separators=(',', ':')).encode('utf-8')
+        response = app.response_class(body, mimetype='application/json')
+        if 'gzip' in request.accept_encodings:
+            response.set_data(gzip.compress(body, compresslevel=6))
+            response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/export')
+def export_blockers():
+    """Stream completed blockers for ?start=&end= as CSV or NDJSON, optionally filtered"""
+    try:
+        start_date, end_date = parse_manager_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unknown format '{export_format}', expected one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    rows = iter_blockers(get_manager_base_dir(), start_date, end_date,
+                         operator=request.args.get('operator'),
+                         location=request.args.get('location'),
+                         category=request.args.get('category'),
+                         backend=app.config['STORAGE_BACKEND'])
+    
+    # Files are read one at a time while the response is being sent
+    if export_format == 'csv':
+        body, mimetype = stream_csv(rows), 'text/csv'
+    else:
+        body, mimetype = stream_ndjson(rows), 'application/x-ndjson'
+    filename = f"eod_export_{start_date}_{end_date}.{export_format}"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/metrics')
+def metrics():
+    """Request latencies, phase timers and file counters of this process (Prometheus text format)"""
+    if not METRICS.enabled:
+        return Response("metrics are disabled\n", status=404, mimetype='text/plain')
+    return Response(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/toggle_test_mode')
 def toggle_test_mode():
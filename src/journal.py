@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Append-only event journal for operator data files
+"""
+import json
+import os
+from typing import Any, Dict, IO, List, Optional
+
+from metrics import record_read
+
+EVENT_TYPES = ("start", "end", "note", "ticket", "session", "clear")
+
+# Events that change completed history or session info; the snapshot is rewritten right after
+# them so analytics that read snapshots directly never miss a finished blocker
+COMPACTING_EVENTS = ("end", "session", "clear")
+
+
+def journal_path(filename: str) -> str:
+    """data/production/x_eod_data_D.json -> data/production/x_eod_data_D.journal.jsonl"""
+    root, ext = os.path.splitext(filename)
+    return f"{root}.journal.jsonl" if ext == ".json" else f"{filename}.journal.jsonl"
+
+
+def default_document() -> Dict[str, Any]:
+    return {
+        "blockers": [],
+        "current_blocker": None,
+        "last_updated": None,
+        "session_info": None
+    }
+
+
+def blocker_start(blocker: Any) -> str:
+    """Sort key of a completed blocker: its 'YYYY-MM-DD HH:MM:SS' start (sorts chronologically)"""
+    return (blocker.get("start_time") or "") if isinstance(blocker, dict) else ""
+
+
+def sort_blockers(data: Dict[str, Any]) -> None:
+    """Order a document's blockers by start time in place (older files were written in end order)"""
+    blockers = data.get("blockers")
+    if not isinstance(blockers, list):
+        return
+    if any(blocker_start(blockers[i]) > blocker_start(blockers[i + 1]) for i in range(len(blockers) - 1)):
+        blockers.sort(key=blocker_start)
+
+
+def insert_blocker(blockers: List[Any], blocker: Dict[str, Any]) -> int:
+    """Insert keeping start-time order; scans from the end since blockers usually end in order"""
+    position = len(blockers)
+    start = blocker_start(blocker)
+    while position > 0 and blocker_start(blockers[position - 1]) > start:
+        position -= 1
+    blockers.insert(position, blocker)
+    return position
+
+
+def _lower_bound(blockers: List[Any], start: str) -> int:
+    low, high = 0, len(blockers)
+    while low < high:
+        middle = (low + high) // 2
+        if blocker_start(blockers[middle]) < start:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def blockers_between(blockers: List[Any], first_date: str, last_date: str) -> List[Dict[str, Any]]:
+    """Blockers that started on first_date..last_date (inclusive), by binary search over the sorted list"""
+    if not isinstance(blockers, list):
+        return []
+    # '~' sorts after any time of day, so this is the first blocker after last_date
+    return blockers[_lower_bound(blockers, first_date):_lower_bound(blockers, last_date + "~")]
+
+
+def blockers_on(blockers: List[Any], date_str: str) -> List[Dict[str, Any]]:
+    return blockers_between(blockers, date_str, date_str)
+
+
+def make_event(seq: int, event_type: str, at: str, **payload: Any) -> Dict[str, Any]:
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Unknown journal event '{event_type}'")
+    event = {"seq": seq, "type": event_type, "at": at}
+    event.update(payload)
+    return event
+
+
+def can_apply(data: Dict[str, Any], event_type: str, payload: Dict[str, Any]) -> bool:
+    """Whether an event still makes sense against the latest state (checked under the file lock)"""
+    current = data.get("current_blocker")
+    if event_type == "start":
+        return not current
+    if event_type == "end":
+        # Refuse to end a different blocker than the one the caller saw
+        return bool(current) and payload.get("start_time", current["start_time"]) == current["start_time"]
+    if event_type in ("note", "ticket"):
+        return bool(current)
+    return True
+
+
+def apply_event(data: Dict[str, Any], event: Dict[str, Any]) -> Optional[int]:
+    """
+    Apply one journal event to a document in place (same effect as the original direct edits).
+    Returns the position of the completed blocker for an end event.
+    """
+    event_type = event["type"]
+    position = None
+
+    if event_type == "start":
+        data["current_blocker"] = event["blocker"]
+        data["last_updated"] = event["at"]
+
+    elif event_type == "end":
+        current = data.get("current_blocker")
+        if current:
+            position = insert_blocker(data.setdefault("blockers", []), {
+                "description": current["description"],
+                "category": current.get("category", "other"),
+                "start_time": current["start_time"],
+                "end_time": event["end_time"],
+                "duration_minutes": event["duration_minutes"],
+                "tickets": current.get("tickets", []),
+                "notes": current.get("notes", [])
+            })
+        data["current_blocker"] = None
+        data["last_updated"] = event["at"]
+
+    elif event_type == "note":
+        current = data.get("current_blocker")
+        if current:
+            current.setdefault("notes", []).append(event["note"])
+
+    elif event_type == "ticket":
+        current = data.get("current_blocker")
+        if current:
+            current.setdefault("tickets", []).append(event["ticket"])
+
+    elif event_type == "session":
+        data["session_info"] = event["session_info"]
+
+    elif event_type == "clear":
+        data.clear()
+        data.update(default_document())
+
+    data["journal_seq"] = event["seq"]
+    return position
+
+
+def read_events(path: str, after_seq: int = 0) -> List[Dict[str, Any]]:
+    """Events with seq > after_seq; a torn line from a crash mid-append is skipped"""
+    events = []
+    try:
+        with open(path, 'r') as f:
+            record_read("journal", os.fstat(f.fileno()).st_size)
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # One undecodable record must not hide the events after it
+                    continue
+                if not isinstance(event, dict):
+                    continue
+                if event.get("seq", 0) > after_seq:
+                    events.append(event)
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def _truncate_torn_tail(f: IO[bytes]) -> None:
+    """Cut a journal opened for appending back to its last newline (a crash can leave half a line)"""
+    size = f.seek(0, os.SEEK_END)
+    end = size
+    while end > 0:
+        start = max(end - 4096, 0)
+        f.seek(start)
+        chunk = f.read(end - start)
+        newline = chunk.rfind(b"\n")
+        if newline != -1:
+            end = start + newline + 1
+            break
+        end = start
+    if end != size:
+        f.truncate(end)
+    f.seek(end)
+
+
+def append_event(path: str, event: Dict[str, Any], fsync: bool = False) -> None:
+    """Append one event as a single line write (callers hold the file lock)"""
+    line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+    with open(path, 'ab+') as f:
+        # A torn last line would otherwise swallow this event into an undecodable line
+        _truncate_torn_tail(f)
+        f.write(line)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+
+
+def stat_signature(path: str) -> Optional[tuple]:
+    """(mtime, size, inode, device) of a file, or None if it does not exist"""
+    # A snapshot swapped in by os.replace() has a new inode even when its size and coarse mtime match
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino, stat.st_dev)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Live manager feed: one background detector per data directory pushes blocker
+started/ended deltas and today's totals to every subscribed dashboard (Server-Sent Events)
+"""
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from data_catalog import get_catalog
+from journal import blockers_on
+from sqlite_store import get_sqlite_store
+
+# A dashboard that stops reading is dropped once this many events are waiting for it
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def format_event(event_id: int, event_type: str, payload: Dict[str, Any]) -> str:
+    """One Server-Sent Events message"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(payload)}\n\n"
+
+
+def _operator_state(entry_operator: str, entry_location: str, data: Dict[str, Any], day: str) -> Dict[str, Any]:
+    """An operator's running blocker and the completed blockers that started on day (as the day's rollup counts them)"""
+    completed = [b for b in blockers_on(data.get("blockers", []), day) if isinstance(b, dict)]
+    current = data.get("current_blocker")
+    return {
+        "operator": entry_operator,
+        "location": entry_location,
+        "current": current if isinstance(current, dict) else None,
+        "completed": completed
+    }
+
+
+def _blocker_key(blocker: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    return (blocker.get("start_time"), blocker.get("end_time"), blocker.get("description"))
+
+
+def _blocker_payload(operator_location: str, state: Dict[str, Any], blocker: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "operator_location": operator_location,
+        "operator": state["operator"],
+        "location": state["location"],
+        "description": blocker.get("description", ""),
+        "category": blocker.get("category", "other"),
+        "start_time": blocker.get("start_time"),
+        "end_time": blocker.get("end_time"),
+        "duration_minutes": blocker.get("duration_minutes")
+    }
+
+
+def day_totals(day: str, states: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Today's fleet, operator and category totals (the same numbers as the day's rollup)"""
+    operators = {}
+    categories: Dict[str, Dict[str, int]] = {}
+    total_blockers = 0
+    total_downtime = 0
+    for operator_location, state in sorted(states.items()):
+        minutes = 0
+        for blocker in state["completed"]:
+            duration = blocker.get("duration_minutes", 0) or 0
+            minutes += duration
+            category = categories.setdefault(blocker.get("category", "other"), {"count": 0, "total_minutes": 0})
+            category["count"] += 1
+            category["total_minutes"] += duration
+        total_blockers += len(state["completed"])
+        total_downtime += minutes
+        current = state["current"]
+        operators[operator_location] = {
+            "operator_name": state["operator"].replace('-', ' ').title(),
+            "location": state["location"].replace('-', ' ').title(),
+            "blockers_count": len(state["completed"]),
+            "total_minutes": minutes,
+            "active_blocker": _blocker_payload(operator_location, state, current) if current else None
+        }
+    return {
+        "date": day,
+        "total_blockers": total_blockers,
+        "total_downtime": total_downtime,
+        "operators": operators,
+        "categories": categories
+    }
+
+
+class Subscription:
+    """Messages queued for one connected dashboard"""
+
+    def __init__(self) -> None:
+        # None only ever follows close(), to wake a reader waiting for the next message
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+    def put(self, message: str) -> bool:
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self) -> None:
+        """End the stream: its reader returns once the messages already queued are sent"""
+        self.closed = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # the reader still has messages to send and sees closed after them
+
+    def next(self, timeout: float) -> Optional[str]:
+        """Next message, or None after timeout seconds with nothing queued (time for a keepalive)"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LiveFeed:
+    """
+    Polls today's operator documents every `interval` seconds while at least one
+    dashboard is subscribed, so any number of dashboards open on one process cost one
+    detector; a pre-fork server runs one per worker that holds a stream. Only documents
+    whose version changed are reloaded.
+    """
+
+    def __init__(self, base_dir: str, backend: str, load_document: Callable[[str], Dict[str, Any]],
+                 document_version: Callable[[str], Optional[tuple]], interval: float = 2.0) -> None:
+        self.base_dir = base_dir
+        self.backend = backend
+        self.interval = interval
+        self._load_document = load_document
+        self._document_version = document_version
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._day: Optional[str] = None
+        self._versions: Dict[str, Optional[tuple]] = {}
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._totals: Optional[Dict[str, Any]] = None
+        self._event_id = 0
+
+    def subscribe(self) -> Subscription:
+        """New subscription, primed with the current totals; starts the detector if it is idle"""
+        subscription = Subscription()
+        with self._lock:
+            if self._totals is not None:
+                subscription.put(format_event(self._event_id, "totals", self._totals))
+            self._subscribers.append(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+        subscription.closed = True
+
+    def close_subscriptions(self) -> None:
+        """End every open stream (a worker draining for shutdown must not wait for dashboards)"""
+        with self._lock:
+            subscriptions = self._subscribers
+            self._subscribers = []
+        for subscription in subscriptions:
+            subscription.close()
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception as e:  # A bad file must not stop the feed for everyone
+                print(f"Live feed poll failed: {e}")
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+
+    def _documents(self, day: str) -> List[Tuple[str, str, str, str]]:
+        """(document key, operator_location, operator, location) of every document dated day"""
+        if self.backend == "sqlite":
+            return get_sqlite_store(self.base_dir).documents_for_date(day)
+        return [(entry.filename, entry.operator_location, entry.operator, entry.location)
+                for entry in get_catalog(self.base_dir).entries_for_date(day)]
+
+    def poll(self) -> None:
+        """Detect changes since the last poll and publish them"""
+        day = datetime.now().strftime("%Y-%m-%d")
+        # The first poll only records where things stand; there is nothing to compare it with
+        baseline = self._day is None
+        if self._day != day:
+            self._day = day
+            self._versions = {}
+            self._states = {}
+
+        events: List[Tuple[str, Dict[str, Any]]] = []
+        documents = self._documents(day)
+        seen = set()
+        changed = self._totals is None or self._totals["date"] != day
+        for doc_key, operator_location, operator, location in documents:
+            seen.add(operator_location)
+            version = self._document_version(doc_key)
+            # A None version means "unknown", so it is always reloaded
+            if version is not None and self._versions.get(operator_location) == version:
+                continue
+            self._versions[operator_location] = version
+            state = _operator_state(operator, location, self._load_document(doc_key), day)
+            previous = self._states.get(operator_location)
+            self._states[operator_location] = state
+            changed = True
+            if not baseline:
+                events.extend(self._diff(operator_location, previous, state))
+
+        for operator_location in set(self._states) - seen:
+            del self._states[operator_location]
+            self._versions.pop(operator_location, None)
+            changed = True
+
+        if changed:
+            totals = day_totals(day, self._states)
+            if totals != self._totals:
+                events.append(("totals", totals))
+            self._totals = totals
+        self._publish(events)
+
+    def _diff(self, operator_location: str, previous: Optional[Dict[str, Any]],
+              state: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        events = []
+        known = {_blocker_key(b) for b in previous["completed"]} if previous else set()
+        for blocker in state["completed"]:
+            if _blocker_key(blocker) not in known:
+                events.append(("blocker_ended", _blocker_payload(operator_location, state, blocker)))
+
+        previous_current = previous["current"] if previous else None
+        current = state["current"]
+        if current and (not previous_current or previous_current.get("start_time") != current.get("start_time")):
+            events.append(("blocker_started", _blocker_payload(operator_location, state, current)))
+        return events
+
+    def _publish(self, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not events:
+            return
+        with self._lock:
+            messages = []
+            for event_type, payload in events:
+                self._event_id += 1
+                messages.append(format_event(self._event_id, event_type, payload))
+            for subscription in list(self._subscribers):
+                for message in messages:
+                    if not subscription.put(message):
+                        # Too far behind: close it and let the browser reconnect for fresh totals
+                        self._subscribers.remove(subscription)
+                        subscription.closed = True
+                        break
+
+
+_feeds: Dict[Tuple[str, str], LiveFeed] = {}
+_feeds_lock = threading.Lock()
+
+
+def get_live_feed(base_dir: str, backend: str, load_document: Callable[[str], Dict[str, Any]],
+                  document_version: Callable[[str], Optional[tuple]], interval: float = 2.0) -> LiveFeed:
+    """Process-wide LiveFeed for a data directory and backend"""
+    key = (base_dir, backend)
+    with _feeds_lock:
+        if key not in _feeds:
+            _feeds[key] = LiveFeed(base_dir, backend, load_document, document_version, interval)
+        return _feeds[key]
+
+
+def close_live_feeds() -> None:
+    """End the open streams of every LiveFeed of this process"""
+    with _feeds_lock:
+        feeds = list(_feeds.values())
+    for feed in feeds:
+        feed.close_subscriptions()
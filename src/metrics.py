@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+In-process metrics (counters and latency histograms) rendered in the Prometheus text format.
+
+Each process keeps its own registry, so under several gunicorn workers every worker
+reports its own numbers.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """Monotonic total per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}"
+                for labels, value in values]
+
+
+class Histogram:
+    """Bucketed observations (cumulative on output, like Prometheus) with sum and count per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series_list = sorted((labels, [list(series[0]), series[1], series[2]])
+                                 for labels, series in self._series.items())
+        lines = []
+        for labels, (bucket_counts, total, count) in series_list:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {repr(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.enabled = True
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: Optional[bool] = None) -> None:
+        if enabled is not None:
+            self.enabled = enabled
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+REQUEST_SECONDS = METRICS.histogram("eod_request_duration_seconds", "Time to produce a response, per endpoint",
+                                    ("endpoint", "method", "status"))
+PHASE_SECONDS = METRICS.histogram("eod_phase_duration_seconds", "Time spent in named phases of a request",
+                                  ("phase",))
+FILE_READS = METRICS.counter("eod_file_reads_total", "Data files read", ("kind",))
+FILE_READ_BYTES = METRICS.counter("eod_file_read_bytes_total", "Bytes of data files read", ("kind",))
+FILE_WRITES = METRICS.counter("eod_file_writes_total", "Data files written", ("kind",))
+FILE_WRITE_BYTES = METRICS.counter("eod_file_write_bytes_total", "Bytes of data files written", ("kind",))
+DOCUMENT_CACHE_LOOKUPS = METRICS.counter("eod_document_cache_lookups_total", "Operator document cache lookups",
+                                         ("result",))
+
+
+@contextmanager
+def timer(phase: str) -> Iterator[None]:
+    """Record the time spent in the block under eod_phase_duration_seconds{phase=...}"""
+    if not METRICS.enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_SECONDS.observe(time.perf_counter() - started, phase)
+
+
+def record_read(kind: str, size: int) -> None:
+    if METRICS.enabled:
+        FILE_READS.inc(1, kind)
+        FILE_READ_BYTES.inc(size, kind)
+
+
+def record_write(kind: str, size: int) -> None:
+    if METRICS.enabled:
+        FILE_WRITES.inc(1, kind)
+        FILE_WRITE_BYTES.inc(size, kind)
+
+
+def record_cache_lookup(hit: bool) -> None:
+    if METRICS.enabled:
+        DOCUMENT_CACHE_LOOKUPS.inc(1, "hit" if hit else "miss")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Rendered-page cache for the operator views
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+LIVE_MARKER = "@@live:{}@@"
+
+
+def live_placeholders(*names: str) -> Dict[str, str]:
+    """Template values that render as markers, filled in per request by fill_live"""
+    return {name: LIVE_MARKER.format(name) for name in names}
+
+
+def fill_live(html: str, values: Dict[str, Any]) -> str:
+    for name, value in values.items():
+        html = html.replace(LIVE_MARKER.format(name), str(value))
+    return html
+
+
+class PageCache:
+    """
+    LRU of rendered pages. An entry is served only while its version (document
+    version, day, flashed messages, ...) is unchanged.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[tuple, str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, version: tuple) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(html with live markers, state needed to fill them) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached_version, html, state = entry
+            if cached_version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return html, state
+
+    def put(self, key: tuple, version: tuple, html: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (version, html, state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(self.max_entries, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+PAGE_CACHE = PageCache()
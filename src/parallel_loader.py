@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Concurrent loading of EOD data files for fleet-wide analytics
+"""
+import atexit
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from summary_cache import SummaryCache, summarize_file
+
+LOADER_MODES = ("thread", "process")
+DEFAULT_MODE = "thread"
+DEFAULT_WORKERS = 4
+MAX_WORKERS = 32
+
+# Below this many files the pool overhead outweighs the parallelism
+MIN_PARALLEL_FILES = 2
+
+_executors: Dict[tuple, Executor] = {}
+_executors_lock = threading.Lock()
+
+
+def _bounded_workers(workers: Optional[int]) -> int:
+    if not workers or workers < 1:
+        workers = DEFAULT_WORKERS
+    return min(workers, MAX_WORKERS, (os.cpu_count() or 1) * 4)
+
+
+def get_executor(mode: str = DEFAULT_MODE, workers: Optional[int] = None) -> Executor:
+    """Shared pool for the given mode and size, created on first use"""
+    if mode not in LOADER_MODES:
+        raise ValueError(f"Unknown loader mode '{mode}', expected one of {', '.join(LOADER_MODES)}")
+    key = (mode, _bounded_workers(workers))
+    with _executors_lock:
+        if key not in _executors:
+            pool_class = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+            _executors[key] = pool_class(max_workers=key[1])
+        return _executors[key]
+
+
+def load_files(paths: Iterable[str],
+               loader: Callable[[str], Any] = summarize_file,
+               mode: str = DEFAULT_MODE,
+               workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run loader over every path concurrently and return {path: result}.
+    The loader must be a module-level function when mode is "process".
+    """
+    paths = list(dict.fromkeys(paths))
+    if len(paths) < MIN_PARALLEL_FILES:
+        return {path: loader(path) for path in paths}
+
+    executor = get_executor(mode, workers)
+    return dict(zip(paths, executor.map(loader, paths)))
+
+
+def load_summaries(cache: SummaryCache, paths: Iterable[str],
+                   mode: str = DEFAULT_MODE,
+                   workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Cached summaries for paths, parsing only the changed files concurrently"""
+    return cache.get_many(paths, load_many=lambda stale: load_files(stale, mode=mode, workers=workers))
+
+
+def shutdown_executors() -> None:
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False)
+        _executors.clear()
+
+
+atexit.register(shutdown_executors)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Pre-forking WSGI server built on Werkzeug and the standard library (POSIX only).
+
+The master binds one listening socket and forks N workers that accept on it.
+Each worker loads the app itself after the fork, so a graceful restart (SIGHUP)
+picks up new code, and serves requests with Werkzeug's threaded server. Work the
+workers share through files (an optional prepare callable) runs once per generation,
+in a short-lived child, before that generation's workers are forked.
+
+    SIGTERM / SIGINT   graceful shutdown: workers finish in-flight requests, then exit
+    SIGHUP             graceful restart: a new set of workers is started, the old set drains
+    SIGQUIT            immediate shutdown
+
+Workers are recycled after max_requests (plus up to max_requests_jitter) requests.
+"""
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from werkzeug.serving import make_server
+from werkzeug.wsgi import ClosingIterator
+
+# A worker that exits this soon after starting is treated as crashing, and respawns are slowed down
+MIN_WORKER_LIFETIME = 2.0
+RESPAWN_BACKOFF = 1.0
+
+
+class RequestTracker:
+    """WSGI middleware counting served and in-flight requests (a response is in flight until closed)"""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+        self.served = 0
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Any:
+        with self._lock:
+            self.served += 1
+            self.active += 1
+        try:
+            body = self.app(environ, start_response)
+        except BaseException:
+            self._finished()
+            raise
+        return ClosingIterator(body, self._finished)
+
+    def _finished(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+
+class Worker:
+    """One forked process accepting on the shared socket until told to stop or recycled"""
+
+    def __init__(self, listener: socket.socket, host: str, load_app: Callable[[], Callable],
+                 max_requests: int, graceful_timeout: float,
+                 on_drain: Optional[Callable[[], None]] = None) -> None:
+        self.listener = listener
+        self.host = host
+        self.load_app = load_app
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        # Called when draining starts, to end long-lived responses (event streams) that would hold it up
+        self.on_drain = on_drain
+        self.stopping = False
+
+    def _stop(self, signum: int, frame: Any) -> None:
+        self.stopping = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        # Ctrl+C reaches the whole process group; the master decides what happens to workers
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGQUIT, signal.SIG_DFL)
+
+        tracker = RequestTracker(self.load_app())
+        server = make_server(self.host, 0, tracker, threaded=True, fd=self.listener.fileno())
+        # Every worker wakes for each connection but only one wins accept(); the rest must not block in it
+        server.socket.setblocking(False)
+        # handle_request() returns after this long without a connection, so stop flags are noticed
+        server.timeout = 0.5
+
+        while not self.stopping and not (self.max_requests and tracker.served >= self.max_requests):
+            server.handle_request()
+
+        # Drain: requests already accepted get graceful_timeout seconds to finish
+        if self.on_drain is not None:
+            try:
+                self.on_drain()
+            except Exception as e:
+                print(f"[prefork {os.getpid()}] on_drain failed: {e}", file=sys.stderr, flush=True)
+        deadline = time.monotonic() + self.graceful_timeout
+        while tracker.active > 0 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        server.socket.close()
+        return 0
+
+
+class PreforkServer:
+    def __init__(self, load_app: Callable[[], Callable], host: str = "0.0.0.0", port: int = 5001,
+                 workers: int = 0, max_requests: int = 1000, max_requests_jitter: int = 100,
+                 graceful_timeout: float = 30.0, backlog: int = 2048,
+                 prepare: Optional[Callable[[], None]] = None,
+                 on_drain: Optional[Callable[[], None]] = None) -> None:
+        self.load_app = load_app
+        self.prepare = prepare
+        self.on_drain = on_drain
+        self.host = host
+        self.port = port
+        self.num_workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.listener: Optional[socket.socket] = None
+        # pid -> (generation, start time)
+        self.workers: Dict[int, tuple] = {}
+        self.generation = 0
+        self.master_pid = os.getpid()
+        self._signals: List[int] = []
+        self._stopping_since: Optional[float] = None
+
+    def _log(self, message: str) -> None:
+        print(f"[prefork {os.getpid()}] {message}", flush=True)
+
+    def _on_signal(self, signum: int, frame: Any) -> None:
+        self._signals.append(signum)
+
+    def bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        listener = socket.create_server((self.host, self.port), family=family, backlog=self.backlog)
+        listener.set_inheritable(True)
+        self.port = listener.getsockname()[1]
+        return listener
+
+    def spawn_worker(self) -> None:
+        jitter = random.randint(0, self.max_requests_jitter) if self.max_requests and self.max_requests_jitter else 0
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = (self.generation, time.monotonic())
+            return
+
+        # Child: serve, then exit through SystemExit so atexit handlers (pending writes) still run
+        code = 1
+        try:
+            random.seed()
+            code = Worker(self.listener, self.host, self.load_app, self.max_requests + jitter,
+                          self.graceful_timeout, self.on_drain).run()
+        except Exception as e:
+            print(f"[prefork {os.getpid()}] worker failed: {e}", file=sys.stderr, flush=True)
+        finally:
+            sys.exit(code)
+
+    def run_prepare(self) -> None:
+        """Run prepare in a child and wait for it, so the master itself never imports the app"""
+        if self.prepare is None:
+            return
+        started = time.monotonic()
+        pid = os.fork()
+        if pid:
+            _, status = os.waitpid(pid, 0)
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0:
+                self._log(f"prepare exited with {code}; workers start without it")
+            else:
+                self._log(f"prepared generation {self.generation} in {time.monotonic() - started:.1f}s")
+            return
+
+        code = 1
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT):
+                signal.signal(signum, signal.SIG_DFL)
+            self.listener.close()
+            self.prepare()
+            code = 0
+        except Exception as e:
+            print(f"[prefork {os.getpid()}] prepare failed: {e}", file=sys.stderr, flush=True)
+        finally:
+            sys.exit(code)
+
+    def signal_workers(self, signum: int, generation: Optional[int] = None) -> None:
+        for pid, (worker_generation, _) in list(self.workers.items()):
+            if generation is None or worker_generation == generation:
+                try:
+                    os.kill(pid, signum)
+                except ProcessLookupError:
+                    pass
+
+    def reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation, started = self.workers.pop(pid, (None, time.monotonic()))
+            lifetime = time.monotonic() - started
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and generation == self.generation and self._stopping_since is None:
+                self._log(f"worker {pid} exited with {code} after {lifetime:.1f}s")
+                if lifetime < MIN_WORKER_LIFETIME:
+                    time.sleep(RESPAWN_BACKOFF)
+
+    def handle_signals(self) -> None:
+        while self._signals:
+            signum = self._signals.pop(0)
+            if signum in (signal.SIGTERM, signal.SIGINT) and self._stopping_since is None:
+                self._log("graceful shutdown")
+                self._stopping_since = time.monotonic()
+                self.signal_workers(signal.SIGTERM)
+            elif signum == signal.SIGQUIT:
+                self._log("immediate shutdown")
+                self.signal_workers(signal.SIGKILL)
+                self._stopping_since = time.monotonic() - self.graceful_timeout
+            elif signum == signal.SIGHUP and self._stopping_since is None:
+                self._log("graceful restart")
+                old_generation = self.generation
+                self.generation += 1
+                self.run_prepare()
+                self.maintain_workers()
+                self.signal_workers(signal.SIGTERM, generation=old_generation)
+
+    def maintain_workers(self) -> None:
+        current = sum(1 for generation, _ in self.workers.values() if generation == self.generation)
+        for _ in range(self.num_workers - current):
+            self.spawn_worker()
+
+    def serve_forever(self) -> None:
+        self.master_pid = os.getpid()
+        self.listener = self.bind()
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT):
+            signal.signal(signum, self._on_signal)
+        self._log(f"listening on http://{self.host}:{self.port} with {self.num_workers} workers")
+        self.run_prepare()
+
+        try:
+            while True:
+                self.handle_signals()
+                self.reap()
+                if self._stopping_since is None:
+                    # Replaces crashed and recycled workers
+                    self.maintain_workers()
+                elif not self.workers:
+                    break
+                elif time.monotonic() - self._stopping_since > self.graceful_timeout:
+                    self.signal_workers(signal.SIGKILL)
+                time.sleep(0.2)
+        finally:
+            # Forked workers leave through sys.exit() and must not tear down the master's state
+            if os.getpid() == self.master_pid:
+                self.signal_workers(signal.SIGKILL)
+                self.listener.close()
+                self._log("stopped")
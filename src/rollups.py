@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Materialized rollups of the EOD data files: one per day, folded into one per ISO
+week and calendar month. A period is refolded only when one of its days changed.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from archive import stat_document
+from atomic_file import mkstemp_for
+from data_catalog import CatalogEntry, DataCatalog
+from sketches import build_day_sketches, merge_sketches
+
+# Bump when the rollup layout changes so stale rollup files are discarded
+ROLLUP_VERSION = 4
+
+# Assuming 8-hour shifts
+SHIFT_MINUTES = 480
+
+PERIOD_TIERS = ("week", "month")
+
+
+def daily_efficiency(total_minutes: int) -> float:
+    return max(0, min(100, ((SHIFT_MINUTES - total_minutes) / SHIFT_MINUTES) * 100)) if total_minutes <= SHIFT_MINUTES else 0
+
+
+def rollup_store_path(base_dir: str) -> str:
+    """Directory of the monthly rollup shards next to the data directory, e.g. data/production.rollups/"""
+    base_dir = os.path.normpath(base_dir)
+    return os.path.join(os.path.dirname(base_dir), f"{os.path.basename(base_dir)}.rollups")
+
+
+def fingerprint(entries: Iterable[CatalogEntry]) -> List[list]:
+    """(filename, mtime, size) of every source file of a day, in catalog order (archived files keep theirs)"""
+    result = []
+    for entry in entries:
+        try:
+            stat = stat_document(entry.path)
+        except FileNotFoundError:
+            continue
+        result.append([entry.filename, stat.st_mtime_ns, stat.st_size])
+    return result
+
+
+def fingerprint_token(day_fingerprint: List[list]) -> str:
+    """Short digest of a day's fingerprint, recorded by the weeks and months built from that day"""
+    return hashlib.sha1(json.dumps(day_fingerprint).encode()).hexdigest()[:16]
+
+
+def build_day_rollup(date_str: str, entries: List[CatalogEntry], summaries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Fold the per-file summaries of one day into day, category and operator totals and duration/distinct sketches"""
+    rollup: Dict[str, Any] = {
+        "date": date_str,
+        "files": len(entries),
+        "blocker_count": 0,
+        "total_minutes": 0,
+        "session_info": None,
+        "categories": {},
+        "operators": {}
+    }
+
+    durations = []
+    tickets: List[str] = []
+    for entry in entries:
+        summary = summaries.get(entry.path)
+        if summary is None:
+            continue
+
+        # Only blockers that started on this specific date
+        day = summary["days"].get(date_str, {"blocker_count": 0, "total_minutes": 0, "categories": {}})
+        rollup["blocker_count"] += day["blocker_count"]
+        rollup["total_minutes"] += day["total_minutes"]
+
+        for category, stats in day["categories"].items():
+            totals = rollup["categories"].setdefault(category, {"count": 0, "total_minutes": 0})
+            totals["count"] += stats["count"]
+            totals["total_minutes"] += stats["total_minutes"]
+
+        # Use the first session info found
+        if rollup["session_info"] is None and summary["session_info"]:
+            rollup["session_info"] = summary["session_info"]
+
+        operator = rollup["operators"].setdefault(entry.operator_location, {
+            "operator": entry.operator,
+            "location": entry.location,
+            "blockers_count": 0,
+            "total_minutes": 0,
+            "categories": {}
+        })
+        operator["blockers_count"] += day["blocker_count"]
+        operator["total_minutes"] += day["total_minutes"]
+        for category, stats in day["categories"].items():
+            operator["categories"][category] = operator["categories"].get(category, 0) + stats["count"]
+        for category, minutes_list in day.get("durations", {}).items():
+            durations.extend((entry.operator_location, entry.location, category, minutes, 1) for minutes in minutes_list)
+        tickets.extend(day.get("tickets", []))
+
+    names = (operator["operator"] for operator in rollup["operators"].values())
+    rollup["sketches"] = build_day_sketches(durations, names, tickets)
+    return rollup
+
+
+def operator_day_stats(operator: Dict[str, Any]) -> Tuple[int, int, int]:
+    """
+    (days with blockers, days with a file, sum of daily efficiencies) of a day or period
+    operator entry. Daily efficiencies are shown to a tenth, so the sum is kept in integer
+    tenths: adding days in any grouping (days, weeks, months) gives the same average.
+    """
+    if "days_present" in operator:
+        return operator["active_days"], operator["days_present"], operator["efficiency_tenths"]
+    return (1 if operator["blockers_count"] > 0 else 0), 1, round(daily_efficiency(operator["total_minutes"]) * 10)
+
+
+def fold_rollups(first: str, last: str, rollups: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    One period rollup from the day rollups first..last: the same totals, breakdowns and
+    sketches as a day, with per-operator day counts so averages over days stay exact
+    """
+    folded: Dict[str, Any] = {
+        "start": first,
+        "end": last,
+        "days": len(rollups),
+        "files": 0,
+        "blocker_count": 0,
+        "total_minutes": 0,
+        "session_info": None,
+        "categories": {},
+        "operators": {}
+    }
+    for rollup in rollups:
+        folded["files"] += rollup["files"]
+        folded["blocker_count"] += rollup["blocker_count"]
+        folded["total_minutes"] += rollup["total_minutes"]
+        if folded["session_info"] is None and rollup["session_info"]:
+            folded["session_info"] = rollup["session_info"]
+
+        for category, stats in rollup["categories"].items():
+            totals = folded["categories"].setdefault(category, {"count": 0, "total_minutes": 0})
+            totals["count"] += stats["count"]
+            totals["total_minutes"] += stats["total_minutes"]
+
+        for operator_location, day in rollup["operators"].items():
+            operator = folded["operators"].setdefault(operator_location, {
+                "operator": day["operator"],
+                "location": day["location"],
+                "blockers_count": 0,
+                "total_minutes": 0,
+                "categories": {},
+                "active_days": 0,
+                "days_present": 0,
+                "efficiency_tenths": 0
+            })
+            operator["blockers_count"] += day["blockers_count"]
+            operator["total_minutes"] += day["total_minutes"]
+            for category, count in day["categories"].items():
+                operator["categories"][category] = operator["categories"].get(category, 0) + count
+            active_days, days_present, efficiency_tenths = operator_day_stats(day)
+            operator["active_days"] += active_days
+            operator["days_present"] += days_present
+            operator["efficiency_tenths"] += efficiency_tenths
+
+    folded["sketches"] = merge_sketches(rollup["sketches"] for rollup in rollups if rollup.get("sketches"))
+    return folded
+
+
+def _month_end(day: date) -> date:
+    next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def _cover_edge(first: date, last: date) -> List[Tuple[str, str, date, date]]:
+    """Whole ISO weeks (Monday keys) inside first..last, single days around them"""
+    segments = []
+    day = first
+    while day <= last:
+        if day.weekday() == 0 and day + timedelta(days=6) <= last:
+            segments.append(("week", day.strftime("%Y-%m-%d"), day, day + timedelta(days=6)))
+            day += timedelta(days=7)
+        else:
+            segments.append(("day", day.strftime("%Y-%m-%d"), day, day))
+            day += timedelta(days=1)
+    return segments
+
+
+def cover_range(start_date: date, end_date: date) -> List[Tuple[str, str, List[str]]]:
+    """
+    (tier, key, dates) segments covering start_date..end_date with few rollups: every whole
+    calendar month, and whole ISO weeks or single days for the partial months at the edges
+    """
+    first_month = start_date if start_date.day == 1 else _month_end(start_date) + timedelta(days=1)
+    months = []
+    month = first_month
+    while _month_end(month) <= end_date:
+        months.append(("month", month.strftime("%Y-%m"), month, _month_end(month)))
+        month = _month_end(month) + timedelta(days=1)
+
+    if months:
+        spans = (_cover_edge(start_date, months[0][2] - timedelta(days=1)) + months
+                 + _cover_edge(months[-1][3] + timedelta(days=1), end_date))
+    else:
+        spans = _cover_edge(start_date, end_date)
+    return [(tier, key, [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((last - first).days + 1)])
+            for tier, key, first, last in spans]
+
+
+class RollupStore:
+    """
+    Per-day rollups for one data directory, recomputed only when a day's source files
+    change, and week/month rollups folded from them, refolded only when a day changed.
+    Stored as one shard per month (its days, the weeks starting in it and the month
+    itself), loaded when first needed and rewritten only when something in it changed.
+    """
+
+    def __init__(self, base_dir: str, store_dir: Optional[str] = None) -> None:
+        self.base_dir = base_dir
+        self.store_dir = store_dir or rollup_store_path(base_dir)
+        # month -> {"days": {date: ...}, "weeks": {monday: ...}, "months": {month: ...}}; periods are
+        # {"children": {date: fingerprint token}, "rollup": folded rollup}
+        self._shards: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        # The single-file store this layout replaced is only a stale cache now
+        try:
+            os.remove(f"{self.store_dir}.json")
+        except FileNotFoundError:
+            pass
+
+    def shard_path(self, month: str) -> str:
+        return os.path.join(self.store_dir, f"{month}.json")
+
+    def _shard(self, month: str) -> Dict[str, Dict[str, Any]]:
+        """A month's shard, read from disk the first time it is needed (empty if missing or stale)"""
+        with self._lock:
+            shard = self._shards.get(month)
+        if shard is not None:
+            return shard
+        shard = {"days": {}}
+        shard.update({f"{tier}s": {} for tier in PERIOD_TIERS})
+        try:
+            with open(self.shard_path(month), 'r') as f:
+                stored = json.load(f)
+            if isinstance(stored, dict) and stored.get("version") == ROLLUP_VERSION:
+                shard = {name: stored.get(name, {}) for name in shard}
+        except (json.JSONDecodeError, FileNotFoundError):
+            pass
+        with self._lock:
+            # Another thread may have loaded (and already changed) it meanwhile; that copy wins
+            return self._shards.setdefault(month, shard)
+
+    def _day(self, date_str: str) -> Optional[Dict[str, Any]]:
+        return self._shard(date_str[:7])["days"].get(date_str)
+
+    def get_days(self, dates: List[str], catalog: DataCatalog,
+                 load_summaries: Callable[[List[str]], Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Rollups for every date in dates. Days whose files are unchanged come straight
+        from the store; the files of all stale days are summarized in one batch.
+        """
+        rollups: Dict[str, Dict[str, Any]] = {}
+        stale: Dict[str, list] = {}
+        for date_str in dates:
+            entries = catalog.entries_for_date(date_str)
+            day_fingerprint = fingerprint(entries)
+            stored = self._day(date_str)
+            if stored is not None and stored["fingerprint"] == day_fingerprint:
+                rollups[date_str] = stored["rollup"]
+            else:
+                stale[date_str] = day_fingerprint
+
+        if stale:
+            paths = [entry.path for date_str in stale for entry in catalog.entries_for_date(date_str)]
+            summaries = load_summaries(paths)
+            for date_str, day_fingerprint in stale.items():
+                rollup = build_day_rollup(date_str, catalog.entries_for_date(date_str), summaries)
+                shard = self._shard(date_str[:7])
+                with self._lock:
+                    shard["days"][date_str] = {"fingerprint": day_fingerprint, "token": fingerprint_token(day_fingerprint),
+                                               "rollup": rollup}
+                    self._dirty.add(date_str[:7])
+                rollups[date_str] = rollup
+        return rollups
+
+    def get_periods(self, segments: List[Tuple[str, str, List[str]]]) -> List[Dict[str, Any]]:
+        """
+        The rollup of every (tier, key, dates) segment from cover_range(). Its days must
+        have been brought up to date by get_days(); a week or month is refolded only when
+        the fingerprint token of one of its days differs from the one it was built from.
+        """
+        rollups = []
+        for tier, key, dates in segments:
+            if tier == "day":
+                rollups.append(self._day(key)["rollup"])
+                continue
+            days = {date_str: self._day(date_str) for date_str in dates}
+            children = {date_str: day["token"] for date_str, day in days.items()}
+            # A week lives in the shard of its Monday's month
+            month = key[:7]
+            shard = self._shard(month)
+            stored = shard[f"{tier}s"].get(key)
+            if stored is not None and stored["children"] == children:
+                rollups.append(stored["rollup"])
+                continue
+            rollup = fold_rollups(dates[0], dates[-1], [day["rollup"] for day in days.values()])
+            with self._lock:
+                shard[f"{tier}s"][key] = {"children": children, "rollup": rollup}
+                self._dirty.add(month)
+            rollups.append(rollup)
+        return rollups
+
+    def save(self) -> None:
+        """Rewrite the shards of the months in which a day, week or month was recomputed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            # Copies: other threads keep adding rollups while the payloads are serialized below
+            payloads = {}
+            for month in self._dirty:
+                payload = {"version": ROLLUP_VERSION}
+                payload.update({name: dict(rollups) for name, rollups in self._shards[month].items()})
+                payloads[month] = payload
+            self._dirty = set()
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        for month, payload in payloads.items():
+            shard_file = self.shard_path(month)
+            fd, tmp_path = mkstemp_for(shard_file, prefix=".rollups.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(payload, f)
+                os.replace(tmp_path, shard_file)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+
+_stores: Dict[str, RollupStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_rollup_store(base_dir: str) -> RollupStore:
+    """Process-wide RollupStore for a data directory"""
+    key = os.path.abspath(base_dir)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = RollupStore(base_dir)
+        return _stores[key]
@@ -13,10 +13,15 @@ if __name__ == '__main__':
     
     try:
         from src.flask_app import app
+        from warmup import warm_up
 
         # there is prod and dev
         config = app.config
         
+        # Optional warm start (EOD_WARMUP=1): templates compiled and analytics built before serving
+        if config['WARMUP_ON_START']:
+            warm_up(app)
+        
         print("Starting EOD Generator Flask Application...")
         # running dev
         print(f"Environment: {config.get('ENV', 'development')}")
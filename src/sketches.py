@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Compact mergeable summaries kept per day in the rollups: a log-bucketed quantile
+sketch for blocker durations and HyperLogLog for distinct operators and tickets.
+A range is answered by merging the days' sketches, never by re-reading blockers.
+"""
+import base64
+import hashlib
+import math
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Estimated quantiles are within 1% of a duration that really occurs at that rank
+RELATIVE_ACCURACY = 0.01
+
+# 2^10 registers: about 3% standard error on distinct counts
+HLL_PRECISION = 10
+
+PERCENTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+
+class QuantileSketch:
+    """
+    Counts per logarithmic bucket (the DDSketch layout): bucket i holds values in
+    (gamma^(i-1), gamma^i]. Merging adds counts, so day sketches combine exactly.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, count: int = 1) -> None:
+        if count <= 0:
+            return
+        if value <= 0:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if not other.count:
+            return
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def merge_json(self, value: Dict[str, Any]) -> None:
+        """Merge a to_json() form directly, without building an intermediate sketch"""
+        count = value.get("n", 0)
+        if not count:
+            return
+        buckets = self.buckets
+        for index, bucket_count in value.get("b", {}).items():
+            index = int(index)
+            buckets[index] = buckets.get(index, 0) + bucket_count
+        self.zero_count += value.get("z", 0)
+        self.count += count
+        self.min = value["min"] if self.min is None else min(self.min, value["min"])
+        self.max = value["max"] if self.max is None else max(self.max, value["max"])
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0..1); None when empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms, clamped to what was actually seen
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        """p50/p90/p99 rounded to a tenth of a minute, plus the exact maximum"""
+        result = {name: (None if value is None else round(value, 1))
+                  for name, value in ((name, self.quantile(q)) for name, q in PERCENTILES)}
+        result["max"] = self.max
+        return result
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"a": self.relative_accuracy, "z": self.zero_count, "n": self.count,
+                "min": self.min, "max": self.max,
+                "b": {str(index): count for index, count in self.buckets.items()}}
+
+    @classmethod
+    def from_json(cls, value: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(value.get("a", RELATIVE_ACCURACY))
+        sketch.buckets = {int(index): count for index, count in value.get("b", {}).items()}
+        sketch.zero_count = value.get("z", 0)
+        sketch.count = value.get("n", 0)
+        sketch.min = value.get("min")
+        sketch.max = value.get("max")
+        return sketch
+
+
+def _hash64(value: str) -> int:
+    # Stable across processes and restarts, unlike hash()
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Distinct-count estimate in 2^precision one-byte registers; merging takes the register-wise maximum"""
+
+    def __init__(self, precision: int = HLL_PRECISION) -> None:
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str) -> None:
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        rest = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def merge_json(self, value: Dict[str, Any]) -> None:
+        """Merge a to_json() form directly; a sparse day sketch costs only its set registers"""
+        if "d" in value:
+            self.merge(HyperLogLog.from_json(value))
+            return
+        if value.get("p", HLL_PRECISION) != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        registers = self.registers
+        for index, rank in value.get("s", {}).items():
+            index = int(index)
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        # Small cardinalities: linear counting over the empty registers is far more accurate
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Sparse {register: rank} while few registers are set (a day's worth), base64 bytes otherwise"""
+        used = {index: rank for index, rank in enumerate(self.registers) if rank}
+        if len(used) * 8 < len(self.registers):
+            return {"p": self.precision, "s": {str(index): rank for index, rank in used.items()}}
+        return {"p": self.precision, "d": base64.b64encode(bytes(self.registers)).decode("ascii")}
+
+    @classmethod
+    def from_json(cls, value: Dict[str, Any]) -> "HyperLogLog":
+        hll = cls(value.get("p", HLL_PRECISION))
+        if "d" in value:
+            hll.registers = bytearray(base64.b64decode(value["d"]))
+        for index, rank in value.get("s", {}).items():
+            hll.registers[int(index)] = rank
+        return hll
+
+
+def build_day_sketches(durations: Iterable[Tuple[str, str, str, int, int]],
+                       operators: Iterable[str], tickets: Iterable[str]) -> Dict[str, Any]:
+    """
+    A day rollup's "sketches" from (operator_location, location, category, minutes, count)
+    rows, the names of the operators with a file that day (one per operator, whatever the
+    number of sites) and the ticket numbers of its blockers
+    """
+    overall = QuantileSketch()
+    by_category: Dict[str, QuantileSketch] = {}
+    by_operator: Dict[str, QuantileSketch] = {}
+    by_location: Dict[str, QuantileSketch] = {}
+    for operator_location, location, category, minutes, count in durations:
+        overall.add(minutes, count)
+        for group, key in ((by_category, category), (by_operator, operator_location), (by_location, location)):
+            sketch = group.get(key)
+            if sketch is None:
+                sketch = group[key] = QuantileSketch()
+            sketch.add(minutes, count)
+
+    operator_hll = HyperLogLog()
+    for operator in operators:
+        operator_hll.add(operator.lower())
+    ticket_hll = HyperLogLog()
+    for ticket in tickets:
+        ticket_hll.add(ticket)
+
+    return {
+        "durations": overall.to_json(),
+        "categories": {key: sketch.to_json() for key, sketch in by_category.items()},
+        "operators": {key: sketch.to_json() for key, sketch in by_operator.items()},
+        "locations": {key: sketch.to_json() for key, sketch in by_location.items()},
+        "distinct_operators": operator_hll.to_json(),
+        "distinct_tickets": ticket_hll.to_json()
+    }
+
+
+def merge_sketches(stored: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Several rollups' "sketches" folded into one of the same shape (for week and month rollups)"""
+    overall = QuantileSketch()
+    groups: Dict[str, Dict[str, QuantileSketch]] = {"categories": {}, "operators": {}, "locations": {}}
+    operator_hll = HyperLogLog()
+    ticket_hll = HyperLogLog()
+    for sketches in stored:
+        overall.merge_json(sketches["durations"])
+        for name, group in groups.items():
+            for key, value in sketches[name].items():
+                merge_quantiles(group, key, value)
+        operator_hll.merge_json(sketches["distinct_operators"])
+        ticket_hll.merge_json(sketches["distinct_tickets"])
+
+    merged = {"durations": overall.to_json()}
+    for name, group in groups.items():
+        merged[name] = {key: sketch.to_json() for key, sketch in group.items()}
+    merged["distinct_operators"] = operator_hll.to_json()
+    merged["distinct_tickets"] = ticket_hll.to_json()
+    return merged
+
+
+def merge_quantiles(target: Dict[str, QuantileSketch], key: str, stored: Dict[str, Any]) -> None:
+    """Merge a stored sketch into target[key], creating it on first use"""
+    sketch = target.get(key)
+    if sketch is None:
+        sketch = target[key] = QuantileSketch(stored.get("a", RELATIVE_ACCURACY))
+    sketch.merge_json(stored)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+SQLite storage backend: one database per data directory, blockers indexed for fleet-wide queries
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from data_catalog import parse_filename
+from journal import apply_event, can_apply, default_document, make_event
+from sketches import build_day_sketches
+from storage import StorageHandler, data_dir, document_name
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    doc_key TEXT PRIMARY KEY,
+    operator_location TEXT NOT NULL,
+    operator TEXT NOT NULL,
+    location TEXT NOT NULL,
+    date TEXT NOT NULL,
+    session_info TEXT,
+    current_blocker TEXT,
+    last_updated TEXT,
+    journal_seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS blockers (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT NOT NULL REFERENCES documents(doc_key) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    doc_date TEXT NOT NULL,
+    operator TEXT NOT NULL,
+    location TEXT NOT NULL,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    start_time TEXT,
+    end_time TEXT,
+    duration_minutes INTEGER NOT NULL DEFAULT 0,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_date ON documents(date);
+CREATE INDEX IF NOT EXISTS documents_operator ON documents(operator, location);
+CREATE INDEX IF NOT EXISTS blockers_doc ON blockers(doc_key, position);
+CREATE INDEX IF NOT EXISTS blockers_doc_date ON blockers(doc_date, doc_key, position);
+CREATE INDEX IF NOT EXISTS blockers_date ON blockers(date);
+CREATE INDEX IF NOT EXISTS blockers_operator ON blockers(operator);
+CREATE INDEX IF NOT EXISTS blockers_location ON blockers(location);
+CREATE INDEX IF NOT EXISTS blockers_category ON blockers(category);
+"""
+
+
+def database_path(base_dir: str) -> str:
+    """Database kept next to the data directory, e.g. data/production.sqlite3"""
+    base_dir = os.path.normpath(base_dir)
+    return os.path.join(os.path.dirname(base_dir), f"{os.path.basename(base_dir)}.sqlite3")
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value)
+
+
+def _loads(value: Optional[str]) -> Any:
+    return None if value is None else json.loads(value)
+
+
+def _doc_fields(doc_key: str) -> Tuple[str, str, str, str]:
+    entry = parse_filename("", doc_key)
+    if entry is None:
+        return doc_key, "unknown", "unknown", ""
+    return entry.operator_location, entry.operator, entry.location, entry.date
+
+
+class SqliteStore:
+    """
+    One SQLite database in WAL mode, so readers never block the single writer.
+    Every write runs in a BEGIN IMMEDIATE transaction, which also serializes
+    writers from other processes.
+    """
+
+    def __init__(self, db_path: str, synchronous: str = "NORMAL") -> None:
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections must not be shared across threads)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.execute("PRAGMA foreign_keys=ON")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        changes = conn.total_changes
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if conn.total_changes == changes:
+            # Nothing written (e.g. a rejected event): keep the revision so cached analytics stay valid
+            conn.execute("ROLLBACK")
+            return
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 1)")
+        conn.execute("COMMIT")
+
+    def revision(self) -> int:
+        """Bumped by every write transaction; cheap validator for cached analytics"""
+        row = self.connection().execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return row[0] if row else 0
+
+    def load_document(self, doc_key: str, conn: Optional[sqlite3.Connection] = None) -> Optional[Dict[str, Any]]:
+        conn = conn or self.connection()
+        row = conn.execute(
+            "SELECT session_info, current_blocker, last_updated, journal_seq FROM documents WHERE doc_key = ?",
+            (doc_key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        blockers = [json.loads(body) for (body,) in conn.execute(
+            "SELECT body FROM blockers WHERE doc_key = ? ORDER BY start_time, position", (doc_key,)
+        )]
+        return {
+            "blockers": blockers,
+            "current_blocker": _loads(row[1]),
+            "last_updated": row[2],
+            "session_info": _loads(row[0]),
+            "journal_seq": row[3]
+        }
+
+    def documents_for_date(self, date_str: str) -> List[Tuple[str, str, str, str]]:
+        """(doc_key, operator_location, operator, location) of the documents dated date_str"""
+        return [tuple(row) for row in self.connection().execute(
+            "SELECT doc_key, operator_location, operator, location FROM documents WHERE date = ? ORDER BY doc_key",
+            (date_str,)
+        )]
+
+    def latest_open_blockers(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(doc_key, {current_blocker, session_info}) of each operator's newest document, if a blocker is open in it"""
+        return [(doc_key, {"current_blocker": _loads(current), "session_info": _loads(session_info)})
+                for doc_key, current, session_info in self.connection().execute(
+                    "SELECT d.doc_key, d.current_blocker, d.session_info FROM documents d"
+                    " WHERE d.current_blocker IS NOT NULL"
+                    " AND d.date = (SELECT MAX(date) FROM documents WHERE operator_location = d.operator_location)"
+                    " ORDER BY d.doc_key")]
+
+    def _write_header(self, conn: sqlite3.Connection, doc_key: str, data: Dict[str, Any]) -> None:
+        operator_location, operator, location, date_str = _doc_fields(doc_key)
+        conn.execute(
+            "INSERT INTO documents (doc_key, operator_location, operator, location, date,"
+            " session_info, current_blocker, last_updated, journal_seq)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(doc_key) DO UPDATE SET session_info = excluded.session_info,"
+            " current_blocker = excluded.current_blocker, last_updated = excluded.last_updated,"
+            " journal_seq = excluded.journal_seq",
+            (doc_key, operator_location, operator, location, date_str,
+             _dumps(data.get("session_info")), _dumps(data.get("current_blocker")),
+             data.get("last_updated"), data.get("journal_seq", 0))
+        )
+
+    def _insert_blocker(self, conn: sqlite3.Connection, doc_key: str, position: int, blocker: Dict[str, Any]) -> None:
+        _, operator, location, doc_date = _doc_fields(doc_key)
+        start_time = blocker.get("start_time") or ""
+        conn.execute(
+            "INSERT INTO blockers (doc_key, position, doc_date, operator, location, date, category,"
+            " start_time, end_time, duration_minutes, body) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (doc_key, position, doc_date, operator, location, start_time[:10],
+             blocker.get("category", "other"), blocker.get("start_time"), blocker.get("end_time"),
+             blocker.get("duration_minutes", 0) or 0, json.dumps(blocker))
+        )
+
+    def write_document(self, doc_key: str, data: Dict[str, Any]) -> None:
+        """Replace a whole document (save_data and migrations)"""
+        with self.transaction() as conn:
+            self._write_header(conn, doc_key, data)
+            conn.execute("DELETE FROM blockers WHERE doc_key = ?", (doc_key,))
+            blockers = data.get("blockers", [])
+            for position, blocker in enumerate(blockers if isinstance(blockers, list) else []):
+                if blocker and isinstance(blocker, dict):
+                    self._insert_blocker(conn, doc_key, position, blocker)
+
+    def append_event(self, doc_key: str, event_type: str, at: str,
+                     payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Apply one event to the latest stored document; returns (event or None, document)"""
+        with self.transaction() as conn:
+            data = self.load_document(doc_key, conn) or default_document()
+            if not can_apply(data, event_type, payload):
+                return None, data
+
+            event = make_event(data.get("journal_seq", 0) + 1, event_type, at, **payload)
+            blocker_count = len(data.get("blockers", []))
+            position = apply_event(data, event)
+
+            # Only the rows the event touched are written; rows load in (start_time, position) order,
+            # which matches where apply_event inserted the completed blocker
+            if event_type == "clear":
+                conn.execute("DELETE FROM blockers WHERE doc_key = ?", (doc_key,))
+            elif position is not None:
+                self._insert_blocker(conn, doc_key, blocker_count, data["blockers"][position])
+            self._write_header(conn, doc_key, data)
+        return event, data
+
+    def day_rollups(self, dates: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Same per-day rollups (and sketches) as rollups.build_day_rollup, aggregated by indexed queries"""
+        rollups: Dict[str, Dict[str, Any]] = {
+            date_str: {"date": date_str, "files": 0, "blocker_count": 0, "total_minutes": 0,
+                       "session_info": None, "categories": {}, "operators": {}}
+            for date_str in dates
+        }
+        if not dates:
+            return rollups
+
+        conn = self.connection()
+        first, last = min(dates), max(dates)
+        for doc_key, operator_location, operator, location, date_str, session_info in conn.execute(
+            "SELECT doc_key, operator_location, operator, location, date, session_info"
+            " FROM documents WHERE date BETWEEN ? AND ? ORDER BY date, doc_key", (first, last)
+        ):
+            rollup = rollups.get(date_str)
+            if rollup is None:
+                continue
+            rollup["files"] += 1
+            session_info = _loads(session_info)
+            if rollup["session_info"] is None and session_info:
+                rollup["session_info"] = session_info
+            rollup["operators"].setdefault(operator_location, {
+                "operator": operator,
+                "location": location,
+                "blockers_count": 0,
+                "total_minutes": 0,
+                "categories": {}
+            })
+
+        # Only blockers that started on their document's date, as in the per-file summaries
+        for date_str, operator_location, category, count, minutes in conn.execute(
+            "SELECT b.date, d.operator_location, b.category, COUNT(*), SUM(b.duration_minutes)"
+            " FROM blockers b JOIN documents d ON d.doc_key = b.doc_key"
+            " WHERE b.date BETWEEN ? AND ? AND b.date = b.doc_date"
+            " GROUP BY b.date, b.doc_key, b.category ORDER BY b.date, b.doc_key, MIN(b.position)",
+            (first, last)
+        ):
+            rollup = rollups.get(date_str)
+            if rollup is None:
+                continue
+            rollup["blocker_count"] += count
+            rollup["total_minutes"] += minutes
+            totals = rollup["categories"].setdefault(category, {"count": 0, "total_minutes": 0})
+            totals["count"] += count
+            totals["total_minutes"] += minutes
+
+            operator = rollup["operators"][operator_location]
+            operator["blockers_count"] += count
+            operator["total_minutes"] += minutes
+            operator["categories"][category] = operator["categories"].get(category, 0) + count
+
+        durations: Dict[str, list] = {date_str: [] for date_str in dates}
+        for date_str, operator_location, location, category, minutes, count in conn.execute(
+            "SELECT b.date, d.operator_location, d.location, b.category, b.duration_minutes, COUNT(*)"
+            " FROM blockers b JOIN documents d ON d.doc_key = b.doc_key"
+            " WHERE b.date BETWEEN ? AND ? AND b.date = b.doc_date"
+            " GROUP BY b.date, d.operator_location, b.category, b.duration_minutes", (first, last)
+        ):
+            if date_str in durations:
+                durations[date_str].append((operator_location, location, category, minutes, count))
+        tickets: Dict[str, list] = {date_str: [] for date_str in dates}
+        for date_str, number in conn.execute(
+            "SELECT b.date, CASE t.type WHEN 'object' THEN json_extract(t.value, '$.number') ELSE t.value END"
+            " FROM blockers b, json_each(b.body, '$.tickets') t"
+            " WHERE b.date BETWEEN ? AND ? AND b.date = b.doc_date", (first, last)
+        ):
+            if date_str in tickets and number:
+                tickets[date_str].append(str(number))
+        for date_str, rollup in rollups.items():
+            names = (operator["operator"] for operator in rollup["operators"].values())
+            rollup["sketches"] = build_day_sketches(durations[date_str], names, tickets[date_str])
+        return rollups
+
+    def iter_blockers(self, first: str, last: str, operator: Optional[str] = None, location: Optional[str] = None,
+                      category: Optional[str] = None) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """(document date, operator, location, blocker) for documents dated first..last, streamed from a cursor"""
+        query = ("SELECT doc_date, operator, location, body FROM blockers WHERE doc_date BETWEEN ? AND ?")
+        params: List[Any] = [first, last]
+        for column, value in (("operator", operator), ("location", location), ("category", category)):
+            if value:
+                query += f" AND lower({column}) = ?"
+                params.append(value)
+        query += " ORDER BY doc_date, doc_key, position"
+        for doc_date, row_operator, row_location, body in self.connection().execute(query, params):
+            yield doc_date, row_operator, row_location, json.loads(body)
+
+
+_stores: Dict[str, SqliteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(base_dir: str, synchronous: str = "NORMAL") -> SqliteStore:
+    """Process-wide SqliteStore for a data directory (synchronous applies on first use)"""
+    key = os.path.abspath(database_path(base_dir))
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SqliteStore(key, synchronous=synchronous)
+        return _stores[key]
+
+
+class SqliteHandler(StorageHandler):
+    """One operator's document for a day, stored as rows of the data directory's database"""
+
+    def __init__(self, test_mode: bool = False, filename: Optional[str] = None, session_info: Optional[dict] = None,
+                 synchronous: str = "NORMAL") -> None:
+        base_dir = data_dir(test_mode)
+        self.doc_key = filename or document_name(session_info)
+        self.filename = os.path.join(base_dir, self.doc_key)
+        self.store = get_sqlite_store(base_dir, synchronous=synchronous)
+        self.replayed_events = 0
+        self.data = self.load_data()
+
+    def load_data(self) -> Dict[str, Any]:
+        return self.store.load_document(self.doc_key) or default_document()
+
+    def append_event(self, event_type: str, at: str, **payload: Any) -> Optional[Dict[str, Any]]:
+        event, self.data = self.store.append_event(self.doc_key, event_type, at, payload)
+        return event
+
+    def save_data(self) -> None:
+        self.store.write_document(self.doc_key, self.data)
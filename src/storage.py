@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Storage interface between EODTracker and the operator documents
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+STORAGE_BACKENDS = ("json", "sqlite")
+
+
+def data_dir(test_mode: bool) -> str:
+    return "data/test/" if test_mode else "data/production/"
+
+
+def document_name(session_info: Optional[dict] = None, day: Optional[str] = None) -> str:
+    """'<operator>_<location>_eod_data_<date>.json', the key of one operator's document for a day"""
+    operators = ""
+    if session_info:
+        pack_op = session_info.get("pack_operator", "").replace(' ', '-').replace('/', '-')
+        location = session_info.get("location", "").replace(' ', '-').replace('/', '-')
+        if pack_op:
+            operators = pack_op
+            if location:
+                operators += f"_{location}"
+
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    return f"{operators}_eod_data_{day}.json"
+
+
+class StorageHandler(ABC):
+    """
+    What EODTracker needs from a backend: the current document in self.data and
+    atomic event appends. Mutations go through append_event so every backend can
+    re-check them against the latest state written by other workers.
+    """
+    filename: str
+    data: Dict[str, Any]
+    # Events replayed on top of the last snapshot during the last load (journal backends only)
+    replayed_events: int = 0
+
+    @abstractmethod
+    def load_data(self) -> Dict[str, Any]:
+        """The current document, as written by any worker"""
+
+    @abstractmethod
+    def append_event(self, event_type: str, at: str, **payload: Any) -> Optional[Dict[str, Any]]:
+        """Apply one journal event; None when the latest state no longer allows it"""
+
+    @abstractmethod
+    def save_data(self) -> None:
+        """Persist self.data as a whole"""
+
+
+class StorageConfig:
+    def __init__(self, backend: str = "json") -> None:
+        self.backend = backend
+
+    def configure(self, backend: Optional[str] = None) -> None:
+        if backend is not None:
+            if backend not in STORAGE_BACKENDS:
+                raise ValueError(f"Unknown storage backend '{backend}', expected one of {', '.join(STORAGE_BACKENDS)}")
+            self.backend = backend
+
+
+STORAGE_CONFIG = StorageConfig()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Persistent per-file summary cache for manager analytics
+"""
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from archive import BundleError, open_document, split_member_path, stat_document
+from atomic_file import mkstemp_for
+from blocker_table import HAVE_NUMPY, BlockerTable
+from data_catalog import get_catalog
+from doc_format import epoch_date, format_version
+from metrics import record_read, timer
+
+# Bump when the summary layout changes so stale cache files are discarded
+CACHE_VERSION = 2
+
+# Below this many blockers building arrays costs more than the Python loop
+VECTORIZE_MIN_BLOCKERS = 256
+
+
+def summary_cache_path(base_dir: str) -> str:
+    """Cache file kept next to the data directory, e.g. data/production.summary_cache.json"""
+    base_dir = os.path.normpath(base_dir)
+    return os.path.join(os.path.dirname(base_dir), f"{os.path.basename(base_dir)}.summary_cache.json")
+
+
+def cache_key(file_path: str) -> str:
+    """
+    The document's filename, whether it is a loose file or archived in a bundle: an archived
+    member keeps the mtime/size it had, so its summary stays valid across the archive run
+    """
+    member = split_member_path(file_path)
+    return member[1] if member else os.path.basename(file_path)
+
+
+def empty_day() -> Dict[str, Any]:
+    """Per-day summary numbers; durations and tickets feed the day rollup's sketches"""
+    return {"blocker_count": 0, "total_minutes": 0, "categories": {}, "durations": {}, "tickets": []}
+
+
+def _ticket_numbers(tickets: Any) -> List[str]:
+    """Ticket numbers from v1 ({number, link}) or v2 ([number, link]) tickets"""
+    numbers = []
+    for ticket in tickets if isinstance(tickets, list) else []:
+        if isinstance(ticket, dict):
+            number = ticket.get("number")
+        elif isinstance(ticket, list) and ticket:
+            number = ticket[0]
+        else:
+            number = ticket
+        if number:
+            numbers.append(str(number))
+    return numbers
+
+
+def _add_blocker(days: Dict[str, Dict[str, Any]], date_str: str, minutes: int, category: str,
+                 tickets: Any = None) -> None:
+    day = days.get(date_str)
+    if day is None:
+        day = days[date_str] = empty_day()
+    day["blocker_count"] += 1
+    day["total_minutes"] += minutes
+
+    category_stats = day["categories"].setdefault(category, {"count": 0, "total_minutes": 0})
+    category_stats["count"] += 1
+    category_stats["total_minutes"] += minutes
+    day["durations"].setdefault(category, []).append(minutes)
+    day["tickets"].extend(_ticket_numbers(tickets))
+
+
+def _summarize_v2(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary straight from a v2 document: start dates come from integer epochs, nothing is re-parsed"""
+    days: Dict[str, Dict[str, Any]] = {}
+    categories = data.get("categories", [])
+    date_names: Dict[int, str] = {}
+    for blocker in data.get("blockers", []):
+        if isinstance(blocker, list):
+            day_number = blocker[0] // 86400
+            date_str = date_names.get(day_number)
+            if date_str is None:
+                date_str = date_names[day_number] = epoch_date(blocker[0])
+            _add_blocker(days, date_str, blocker[2], categories[blocker[3]], blocker[5])
+        elif blocker and isinstance(blocker, dict) and blocker.get("start_time"):
+            # Blockers that could not be encoded stay in their v1 form
+            _add_blocker(days, blocker["start_time"][:10], blocker.get("duration_minutes", 0),
+                         blocker.get("category", "other"), blocker.get("tickets"))
+
+    return {
+        "session_info": data.get("session_info"),
+        "days": days
+    }
+
+
+def summarize_document(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a loaded EOD document (v1 or v2 layout) to the per-day numbers the manager view needs"""
+    if format_version(data) == 2:
+        return _summarize_v2(data)
+
+    days: Dict[str, Dict[str, Any]] = {}
+    blockers = data.get("blockers", [])
+    if not isinstance(blockers, list):
+        blockers = []
+
+    # Large documents are reduced column-wise; malformed timestamps fall back to the loop below
+    if HAVE_NUMPY and len(blockers) >= VECTORIZE_MIN_BLOCKERS:
+        try:
+            days = BlockerTable.from_document(data).day_summaries()
+        except (TypeError, ValueError):
+            days = None
+        if days is not None:
+            # Ticket numbers are not columns; they are collected in one plain pass
+            for blocker in blockers:
+                if blocker and isinstance(blocker, dict) and blocker.get("tickets") and blocker.get("start_time"):
+                    days[blocker["start_time"][:10]]["tickets"].extend(_ticket_numbers(blocker["tickets"]))
+            return {
+                "session_info": data.get("session_info"),
+                "days": days
+            }
+
+    for blocker in blockers:
+        if not blocker or not isinstance(blocker, dict):
+            continue
+        start_time = blocker.get("start_time") or ""
+        date_str = start_time[:10]
+        if not date_str:
+            continue
+
+        _add_blocker(days, date_str, blocker.get("duration_minutes", 0), blocker.get("category", "other"),
+                     blocker.get("tickets"))
+
+    return {
+        "session_info": data.get("session_info"),
+        "days": days
+    }
+
+
+def summarize_file(file_path: str) -> Optional[Dict[str, Any]]:
+    """Parse one data file (or archived document) and summarize it; None if it cannot be read"""
+    try:
+        with open_document(file_path) as f:
+            return summarize_document(json.load(f))
+    except (json.JSONDecodeError, BundleError, FileNotFoundError):
+        return None
+
+
+class SummaryCache:
+    """Summaries of the data files in one directory, keyed by (filename, mtime, size)"""
+
+    def __init__(self, base_dir: str, cache_file: Optional[str] = None) -> None:
+        self.base_dir = base_dir
+        self.cache_file = cache_file or summary_cache_path(base_dir)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_file, 'r') as f:
+                stored = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return
+        if isinstance(stored, dict) and stored.get("version") == CACHE_VERSION:
+            self._entries = stored.get("entries", {})
+
+    def _cached(self, key: str, stat: Any) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["summary"]
+        return None
+
+    def _store(self, key: str, stat: os.stat_result, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "summary": summary
+            }
+            self._dirty = True
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Return the summary for file_path, parsing the file only if it changed"""
+        return self.get_many([file_path]).get(file_path)
+
+    def get_many(self, file_paths: Iterable[str],
+                 load_many: Optional[Callable[[List[str]], Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Summaries for every readable file in file_paths. Files whose cache entry is
+        stale are handed to load_many together (e.g. a parallel loader); by default
+        they are summarized one after another.
+        """
+        summaries: Dict[str, Dict[str, Any]] = {}
+        stale: Dict[str, os.stat_result] = {}
+        for file_path in file_paths:
+            try:
+                stat = stat_document(file_path)
+            except FileNotFoundError:
+                continue
+            summary = self._cached(cache_key(file_path), stat)
+            if summary is None:
+                stale[file_path] = stat
+            else:
+                summaries[file_path] = summary
+
+        if stale:
+            # Counted here rather than in summarize_file, which may run in a worker process
+            for stat in stale.values():
+                record_read("summary_source", stat.st_size)
+            with timer("summaries.parse"):
+                if load_many is None:
+                    loaded = {file_path: summarize_file(file_path) for file_path in stale}
+                else:
+                    loaded = load_many(list(stale))
+            for file_path, stat in stale.items():
+                summary = loaded.get(file_path)
+                if summary is not None:
+                    self._store(cache_key(file_path), stat, summary)
+                    summaries[file_path] = summary
+        return summaries
+
+    def save(self) -> None:
+        """Write the cache back to disk if anything changed since the last save"""
+        with self._lock:
+            if not self._dirty:
+                return
+            # Forget files that no longer exist, loose or archived
+            known = {entry.filename for entry in get_catalog(self.base_dir).entries()}
+            self._entries = {key: entry for key, entry in self._entries.items() if key in known}
+            # A copy: other threads keep storing entries while the payload is serialized below
+            payload = {"version": CACHE_VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+
+        cache_dir = os.path.dirname(self.cache_file) or "."
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = mkstemp_for(self.cache_file, prefix=".summary_cache.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+_caches: Dict[str, SummaryCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_summary_cache(base_dir: str) -> SummaryCache:
+    """Process-wide SummaryCache for a data directory"""
+    key = os.path.abspath(base_dir)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = SummaryCache(base_dir)
+        return _caches[key]
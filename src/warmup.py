@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Warm start: compiled templates in an on-disk Jinja bytecode cache, the open-blocker
+registry and analytics state built before a worker takes traffic.
+
+    python src/warmup.py                  # build step: compile every template into the cache
+    python src/warmup.py --analytics      # also build the summary/rollup caches of both data dirs
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from jinja2 import FileSystemBytecodeCache
+
+from active_blockers import seed_active_blockers
+from analytics import build_manager_analytics
+from app import open_storage
+
+
+def install_bytecode_cache(app, directory: str) -> None:
+    """Keep compiled templates in directory (shared by workers and restarts); must run before the first render"""
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def compile_templates(app) -> List[str]:
+    """Load every template once, compiling (or reading from the bytecode cache) as needed"""
+    names = sorted(app.jinja_env.list_templates(extensions=["html"]))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
+
+
+def warm_analytics(app, days: int) -> Dict[str, int]:
+    """Build the per-file summaries and day rollups of the last `days` days for both data directories"""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=max(days, 1))
+    blockers = {}
+    for base_dir in ("data/production", "data/test"):
+        analytics = build_manager_analytics(base_dir, start_date, end_date,
+                                            loader_mode=app.config['ANALYTICS_LOADER_MODE'],
+                                            loader_workers=app.config['ANALYTICS_LOADER_WORKERS'],
+                                            backend=app.config['STORAGE_BACKEND'])
+        blockers[base_dir] = analytics["total_blockers"]
+    return blockers
+
+
+def seed_active_registries(app) -> Dict[str, int]:
+    """Rebuild the open-blocker registry of both data directories from each operator's newest document"""
+    backend = app.config['STORAGE_BACKEND']
+    active = {}
+    for base_dir, test_mode in (("data/production", False), ("data/test", True)):
+        active[base_dir] = seed_active_blockers(
+            base_dir, backend, load_document=lambda doc_key: open_storage(backend, test_mode, filename=doc_key).data)
+    return active
+
+
+def warm_process(app) -> None:
+    """The per-process part of warming up: this process's compiled templates"""
+    started = time.perf_counter()
+    names = compile_templates(app)
+    print(f"Warm-up: {len(names)} templates ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def warm_shared(app, analytics: bool = True) -> None:
+    """
+    The part every process shares through files: the active-blocker registries and the summary/rollup
+    caches. A pre-fork server runs it once per worker generation, not in every worker.
+    """
+    started = time.perf_counter()
+    active = seed_active_registries(app)
+    summary = ", ".join(f"{base_dir}: {count}" for base_dir, count in active.items())
+    print(f"Warm-up: active blocker registry seeded in {(time.perf_counter() - started) * 1000:.0f} ms ({summary})")
+
+    if analytics:
+        started = time.perf_counter()
+        blockers = warm_analytics(app, app.config['WARMUP_ANALYTICS_DAYS'])
+        summary = ", ".join(f"{base_dir}: {count} blockers" for base_dir, count in blockers.items())
+        print(f"Warm-up: analytics for {app.config['WARMUP_ANALYTICS_DAYS']} days built in "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms ({summary})")
+
+
+def warm_up(app, analytics: bool = True) -> None:
+    """Everything a fresh single-process server would otherwise do on its first requests"""
+    warm_process(app)
+    warm_shared(app, analytics=analytics)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Precompile templates (and optionally analytics caches)")
+    parser.add_argument("--analytics", action="store_true", help="Also build the analytics caches")
+    args = parser.parse_args()
+
+    # Data directories are relative to the project root
+    os.chdir(Path(__file__).parent.parent)
+    from flask_app import app
+
+    if not app.config['TEMPLATE_CACHE_DIR']:
+        print("TEMPLATE_CACHE_DIR is empty; templates compile in memory only")
+    warm_up(app, analytics=args.analytics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())